@@ -0,0 +1,106 @@
+"""Общие хелперы для ревизий Alembic.
+
+Модуль лежит рядом с `env.py`; `env.py` добавляет каталог `alembic/` в `sys.path`,
+поэтому в ревизиях достаточно `import _helpers`.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+from alembic import op
+from sqlalchemy import Table, event, text
+
+# Снимок схемы public: {table_name: {column_name, ...}}.
+# Читается лениво — при первой пробе в первой *применяемой* ревизии — и живёт до конца
+# прогона. Если ревизий к применению нет (обычный рестарт), к каталогу не ходим вообще:
+# Alembic сам сверяет alembic_version и ни одна ревизия не выполняется.
+_schema: dict[str, set[str]] | None = None
+
+
+def load_schema_snapshot(connection) -> None:
+    """Прочитать список таблиц/колонок public-схемы одним запросом."""
+    global _schema
+    rows = connection.execute(
+        text(
+            """
+            SELECT table_name::text, array_agg(column_name::text)
+            FROM information_schema.columns
+            WHERE table_schema = 'public'
+            GROUP BY table_name
+            """
+        )
+    ).all()
+    _schema = {name: set(columns or []) for name, columns in rows}
+
+
+def _snapshot() -> dict[str, set[str]]:
+    if _schema is None:
+        if op.get_context().as_sql:
+            # offline-режим (--sql): каталога нет, генерируем полный DDL.
+            return {}
+        load_schema_snapshot(op.get_bind())
+    return _schema or {}
+
+
+def table_exists(name: str) -> bool:
+    """Есть ли таблица в public (по снимку схемы)."""
+    return name in _snapshot()
+
+
+def column_exists(table: str, column: str) -> bool:
+    return column in _snapshot().get(table, ())
+
+
+# Снимок поддерживаем в актуальном состоянии по ходу прогона: op.create_table/op.drop_table
+# диспатчат DDL-события таблиц, так что следующие ревизии видят уже новую схему.
+@event.listens_for(Table, "after_create")
+def _remember_created_table(table: Table, connection, **kw) -> None:
+    if _schema is not None and table.schema in (None, "public"):
+        _schema[table.name] = {c.name for c in table.columns}
+
+
+@event.listens_for(Table, "after_drop")
+def _forget_dropped_table(table: Table, connection, **kw) -> None:
+    if _schema is not None and table.schema in (None, "public"):
+        _schema.pop(table.name, None)
+
+
+def forget_tables(*names: str) -> None:
+    """Отметить в снимке таблицы, удалённые сырым SQL (DDL-события для него не диспатчатся)."""
+    if _schema is not None:
+        for name in names:
+            _schema.pop(name, None)
+
+
+def create_index_concurrently(name: str, table: str, columns: Sequence[str], *, unique: bool = False) -> None:
+    """Создать индекс на уже существующей (возможно, заполненной) таблице без блокировки записи.
+
+    `CREATE INDEX CONCURRENTLY` нельзя выполнять внутри транзакции, поэтому
+    используем autocommit-блок: текущая транзакция миграции фиксируется, индекс строится
+    вне неё, затем транзакция открывается заново. Вызывать стоит в конце `upgrade()`,
+    после всех транзакционных изменений ревизии.
+
+    Для таблиц, создаваемых в той же ревизии, достаточно обычного `op.create_index`.
+    """
+    create_indexes_concurrently([(name, table, columns)], unique=unique)
+
+
+def create_indexes_concurrently(specs: Iterable[tuple[str, str, Sequence[str]]], *, unique: bool = False) -> None:
+    """Пакетный вариант: все индексы в одном autocommit-блоке (один COMMIT/BEGIN на ревизию)."""
+    unique_sql = "UNIQUE " if unique else ""
+    with op.get_context().autocommit_block():
+        for name, table, columns in specs:
+            cols = ", ".join(columns)
+            op.execute(f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING btree ({cols})")
+
+
+def drop_index_concurrently(name: str) -> None:
+    """Удалить индекс без блокировки записи (парный хелпер для downgrade)."""
+    drop_indexes_concurrently([name])
+
+
+def drop_indexes_concurrently(names: Iterable[str]) -> None:
+    with op.get_context().autocommit_block():
+        for name in names:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -19,6 +19,10 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
+# Чтобы ревизии могли делать `import _helpers` (alembic/_helpers.py).
+MIGRATIONS_ROOT = os.path.abspath(os.path.dirname(__file__))
+if MIGRATIONS_ROOT not in sys.path:
+    sys.path.insert(0, MIGRATIONS_ROOT)
 
 from app.db.models import Base
 
@@ -45,6 +49,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
@@ -52,7 +57,14 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata, compare_type=True)
+    # Транзакция на каждую ревизию: `autocommit_block()` (CREATE INDEX CONCURRENTLY)
+    # фиксирует только текущую ревизию, а не весь накопленный апгрейд.
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        transaction_per_migration=True,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -62,10 +74,14 @@ async def run_migrations_online() -> None:
     configuration = config.get_section(config.config_ini_section) or {}
     configuration["sqlalchemy.url"] = _get_database_url()
 
+    # Весь прогон идёт через одно физическое соединение: StaticPool не закрывает/не
+    # переоткрывает его (и asyncpg не повторяет интроспекцию типов), JIT для коротких
+    # DDL/каталожных запросов только добавляет задержку планирования.
     connectable = async_engine_from_config(
         configuration,
         prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
+        poolclass=pool.StaticPool,
+        connect_args={"server_settings": {"jit": "off"}},
     )
 
     async with connectable.connect() as connection:
@@ -10,7 +10,8 @@ from __future__ import annotations
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
-from sqlalchemy import text
+
+import _helpers
 
 
 revision = "0001_init_schema"
@@ -20,9 +21,8 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
     # Если БД уже инициализирована старым create_all — не ломаемся.
-    existing = bind.execute(text("SELECT to_regclass('public.hosts')")).scalar()
+    existing = _helpers.table_exists("hosts")
     if existing:
         return
 
@@ -157,46 +157,24 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     # downgrade для MVP используем редко; best-effort
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.hosts')")).scalar()
+    existing = _helpers.table_exists("hosts")
     if not existing:
         return
 
-    op.drop_index("ix_audit_events_created_at", table_name="audit_events")
-    op.drop_index("ix_audit_events_id", table_name="audit_events")
-    op.drop_table("audit_events")
-
-    op.drop_index("ix_job_runs_id", table_name="job_runs")
-    op.drop_table("job_runs")
-
-    op.drop_index("ix_playbooks_id", table_name="playbooks")
-    op.drop_table("playbooks")
-
-    op.drop_index("ix_dynamic_group_host_cache_host_id", table_name="dynamic_group_host_cache")
-    op.drop_index("ix_dynamic_group_host_cache_group_id", table_name="dynamic_group_host_cache")
-    op.drop_table("dynamic_group_host_cache")
-
-    op.drop_index("ix_group_hosts_host_id", table_name="group_hosts")
-    op.drop_index("ix_group_hosts_group_id", table_name="group_hosts")
-    op.drop_table("group_hosts")
-
-    op.drop_index("ix_groups_id", table_name="groups")
-    op.drop_table("groups")
-
-    op.drop_index("ix_hosts_hostname", table_name="hosts")
-    op.drop_index("ix_hosts_id", table_name="hosts")
-    op.drop_table("hosts")
-
-    op.drop_index("ix_secrets_id", table_name="secrets")
-    op.drop_table("secrets")
-
-    op.drop_index("ix_users_email", table_name="users")
-    op.drop_table("users")
+    # Индексы и FK уходят вместе с таблицами — одним DROP TABLE на всю начальную схему.
+    tables = [
+        "audit_events",
+        "job_runs",
+        "playbooks",
+        "dynamic_group_host_cache",
+        "group_hosts",
+        "groups",
+        "hosts",
+        "secrets",
+        "users",
+    ]
+    op.execute(sa.text(f"DROP TABLE IF EXISTS {', '.join(tables)} CASCADE"))
+    _helpers.forget_tables(*tables)
 
     # enum types drop (best-effort)
-    for enum_name in ["jobstatus", "grouptype", "userrole", "secrettype", "hoststatus"]:
-        try:
-            op.execute(sa.text(f"DROP TYPE IF EXISTS {enum_name}"))
-        except Exception:
-            pass
-
+    op.execute(sa.text("DROP TYPE IF EXISTS jobstatus, grouptype, userrole, secrettype, hoststatus"))
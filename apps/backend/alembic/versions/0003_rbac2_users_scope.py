@@ -7,9 +7,10 @@ from __future__ import annotations
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import text
 from sqlalchemy.dialects import postgresql
 
+import _helpers
+
 
 revision = "0003_rbac2_users_scope"
 down_revision = "0002_host_check_method"
@@ -18,29 +19,37 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.users')")).scalar()
+    existing = _helpers.table_exists("users")
     if not existing:
         return
 
     # Обновляем enum userrole (Postgres не поддерживает DROP VALUE, поэтому downgrade best-effort).
-    for value in ["operator", "viewer", "automation-only"]:
-        op.execute(sa.text(f"ALTER TYPE userrole ADD VALUE IF NOT EXISTS '{value}'"))
-
-    with op.batch_alter_table("users") as batch:
-        batch.add_column(sa.Column("allowed_environments", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
-        batch.add_column(sa.Column("allowed_group_ids", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    # Все значения — одним DO-блоком (один round-trip). На PG >= 12 ADD VALUE допустим
+    # внутри транзакции; новые значения в этой же ревизии не используются.
+    op.execute(
+        sa.text(
+            """
+            DO $$
+            BEGIN
+              ALTER TYPE userrole ADD VALUE IF NOT EXISTS 'operator';
+              ALTER TYPE userrole ADD VALUE IF NOT EXISTS 'viewer';
+              ALTER TYPE userrole ADD VALUE IF NOT EXISTS 'automation-only';
+            END $$;
+            """
+        )
+    )
+
+    op.add_column("users", sa.Column("allowed_environments", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column("users", sa.Column("allowed_group_ids", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.users')")).scalar()
+    existing = _helpers.table_exists("users")
     if not existing:
         return
 
-    with op.batch_alter_table("users") as batch:
-        batch.drop_column("allowed_group_ids")
-        batch.drop_column("allowed_environments")
+    op.drop_column("users", "allowed_group_ids")
+    op.drop_column("users", "allowed_environments")
 
     # Значения enum userrole не удаляем (ограничение Postgres).
 
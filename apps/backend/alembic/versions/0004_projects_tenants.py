@@ -11,33 +11,86 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy import text
 
+import _helpers
+
 
 revision = "0004_projects_tenants"
 down_revision = "0003_rbac2_users_scope"
 branch_labels = None
 depends_on = None
 
+PROJECT_SCOPED_TABLES = ("hosts", "groups", "secrets", "playbooks", "job_runs", "audit_events")
+# project_id остаётся nullable только у аудита.
+NULLABLE_PROJECT_TABLES = ("audit_events",)
+
+
+def _sql_array(items: tuple[str, ...]) -> str:
+    return "ARRAY[" + ", ".join(f"'{x}'" for x in items) + "]::text[]"
+
+
+def _add_project_id_sql(tables: tuple[str, ...]) -> str:
+    return f"""
+DO $$
+DECLARE
+  t text;
+BEGIN
+  FOREACH t IN ARRAY {_sql_array(tables)} LOOP
+    EXECUTE format(
+      'ALTER TABLE %I ADD COLUMN project_id integer DEFAULT 1 CONSTRAINT %I REFERENCES projects (id)',
+      t, 'fk_' || t || '_project_id_projects'
+    );
+    -- Backfill не нужен: ADD COLUMN ... DEFAULT 1 уже проставил 1 всем существующим строкам
+    -- (на PG >= 11 — без перезаписи таблицы). NOT NULL и снятие DEFAULT — одним ALTER.
+    IF NOT (t = ANY ({_sql_array(NULLABLE_PROJECT_TABLES)})) THEN
+      EXECUTE format(
+        'ALTER TABLE %I ALTER COLUMN project_id SET NOT NULL, ALTER COLUMN project_id DROP DEFAULT',
+        t
+      );
+    END IF;
+  END LOOP;
+END $$;
+"""
+
+
+# FK и колонку снимаем одним ALTER TABLE на таблицу; IF EXISTS вместо try/except
+# (ошибка внутри транзакции всё равно прервала бы ревизию).
+_DROP_PROJECT_ID_SQL = f"""
+DO $$
+DECLARE
+  t text;
+BEGIN
+  FOREACH t IN ARRAY {_sql_array(tuple(reversed(PROJECT_SCOPED_TABLES)))} LOOP
+    EXECUTE format(
+      'ALTER TABLE IF EXISTS %I DROP CONSTRAINT IF EXISTS %I, DROP COLUMN IF EXISTS project_id',
+      t, 'fk_' || t || '_project_id_projects'
+    );
+  END LOOP;
+END $$;
+"""
+
 
 def _ensure_default_project(bind) -> None:
+    # Вставка и подтяжка sequence — одним запросом (data-modifying CTE): asyncpg не принимает
+    # несколько команд в одном prepared statement. Основной SELECT видит снимок таблицы
+    # до INSERT, поэтому id из `inserted` учитываем отдельно.
     bind.execute(
         text(
             """
-            INSERT INTO projects (id, name, description, created_at)
-            VALUES (1, 'default', 'Проект по умолчанию (dev)', now())
-            ON CONFLICT (id) DO NOTHING
-            """
-        )
-    )
-    # Подтянем sequence, если она есть.
-    bind.execute(
-        text(
-            """
-            WITH seq AS (
+            WITH inserted AS (
+              INSERT INTO projects (id, name, description, created_at)
+              VALUES (1, 'default', 'Проект по умолчанию (dev)', now())
+              ON CONFLICT (id) DO NOTHING
+              RETURNING id
+            ),
+            seq AS (
               SELECT pg_get_serial_sequence('projects', 'id') AS seqname
             )
             SELECT setval(
               seq.seqname,
-              (SELECT COALESCE(MAX(id), 1) FROM projects)
+              GREATEST(
+                (SELECT COALESCE(MAX(id), 1) FROM projects),
+                (SELECT COALESCE(MAX(id), 1) FROM inserted)
+              )
             )
             FROM seq
             WHERE seq.seqname IS NOT NULL
@@ -50,7 +103,7 @@ def upgrade() -> None:
     bind = op.get_bind()
 
     # Если миграция уже применялась через create_all/ручные изменения — не ломаемся.
-    existing = bind.execute(text("SELECT to_regclass('public.projects')")).scalar()
+    existing = _helpers.table_exists("projects")
     if not existing:
         op.create_table(
             "projects",
@@ -64,66 +117,24 @@ def upgrade() -> None:
 
     _ensure_default_project(bind)
 
-    def _add_project_id(table: str, *, nullable: bool) -> None:
-        # idempotent: добавляем только если колонки нет
-        col_exists = bind.execute(
-            text(
-                """
-                SELECT 1
-                FROM information_schema.columns
-                WHERE table_schema='public' AND table_name=:t AND column_name='project_id'
-                """
-            ),
-            {"t": table},
-        ).scalar()
-        if col_exists:
-            return
-        op.add_column(table, sa.Column("project_id", sa.Integer(), nullable=True, server_default=sa.text("1")))
-        op.create_index(f"ix_{table}_project_id", table, ["project_id"])
-        op.create_foreign_key(f"fk_{table}_project_id_projects", table, "projects", ["project_id"], ["id"])
-        # backfill + NOT NULL для доменных сущностей
-        bind.execute(text(f"UPDATE {table} SET project_id=1 WHERE project_id IS NULL"))
-        if not nullable:
-            op.alter_column(table, "project_id", nullable=False, server_default=None)
-
-    _add_project_id("hosts", nullable=False)
-    _add_project_id("groups", nullable=False)
-    _add_project_id("secrets", nullable=False)
-    _add_project_id("playbooks", nullable=False)
-    _add_project_id("job_runs", nullable=False)
-    _add_project_id("audit_events", nullable=True)
+    # idempotent: таблицы, где колонка уже есть, отсекаем по снимку схемы (без проб к каталогу),
+    # остальные обрабатываем одним серверным DO-блоком (один round-trip).
+    missing = tuple(t for t in PROJECT_SCOPED_TABLES if not _helpers.column_exists(t, "project_id"))
+    if missing:
+        bind.execute(text(_add_project_id_sql(missing)))
 
+    # Индексы строим уже после фиксации DDL и без блокировки записи: таблицы могут быть
+    # заполнены. IF NOT EXISTS — на случай повторного запуска после сбоя.
+    _helpers.create_indexes_concurrently(
+        (f"ix_{t}_project_id", t, ["project_id"]) for t in PROJECT_SCOPED_TABLES
+    )
 
-def downgrade() -> None:
-    bind = op.get_bind()
 
-    def _drop_project_id(table: str) -> None:
-        col_exists = bind.execute(
-            text(
-                """
-                SELECT 1
-                FROM information_schema.columns
-                WHERE table_schema='public' AND table_name=:t AND column_name='project_id'
-                """
-            ),
-            {"t": table},
-        ).scalar()
-        if not col_exists:
-            return
-        try:
-            op.drop_constraint(f"fk_{table}_project_id_projects", table_name=table, type_="foreignkey")
-        except Exception:
-            pass
-        try:
-            op.drop_index(f"ix_{table}_project_id", table_name=table)
-        except Exception:
-            pass
-        op.drop_column(table, "project_id")
-
-    for t in ["audit_events", "job_runs", "playbooks", "secrets", "groups", "hosts"]:
-        _drop_project_id(t)
+def downgrade() -> None:
+    _helpers.drop_indexes_concurrently(f"ix_{t}_project_id" for t in PROJECT_SCOPED_TABLES)
+    op.execute(_DROP_PROJECT_ID_SQL)
 
-    existing = bind.execute(text("SELECT to_regclass('public.projects')")).scalar()
+    existing = _helpers.table_exists("projects")
     if existing:
         try:
             op.drop_index("ix_projects_name", table_name="projects")
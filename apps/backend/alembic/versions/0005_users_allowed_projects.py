@@ -7,9 +7,10 @@
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import text
 from sqlalchemy.dialects import postgresql
 
+import _helpers
+
 revision = "0005_users_allowed_projects"
 down_revision = "0004_projects_tenants"
 branch_labels = None
@@ -17,18 +18,14 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.users')")).scalar()
+    existing = _helpers.table_exists("users")
     if not existing:
         return
-    with op.batch_alter_table("users") as batch:
-        batch.add_column(sa.Column("allowed_project_ids", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column("users", sa.Column("allowed_project_ids", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.users')")).scalar()
+    existing = _helpers.table_exists("users")
     if not existing:
         return
-    with op.batch_alter_table("users") as batch:
-        batch.drop_column("allowed_project_ids")
+    op.drop_column("users", "allowed_project_ids")
@@ -8,6 +8,8 @@ Policy:
 from alembic import op
 from sqlalchemy import text
 
+import _helpers
+
 revision = "0006_secrets_global_scope"
 down_revision = "0005_users_allowed_projects"
 branch_labels = None
@@ -15,21 +17,18 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.secrets')")).scalar()
+    existing = _helpers.table_exists("secrets")
     if not existing:
         return
-    with op.batch_alter_table("secrets") as batch:
-        batch.alter_column("project_id", existing_type=None, nullable=True)
+    op.execute("ALTER TABLE secrets ALTER COLUMN project_id DROP NOT NULL")
 
 
 def downgrade() -> None:
     bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.secrets')")).scalar()
+    existing = _helpers.table_exists("secrets")
     if not existing:
         return
     # Best-effort: assign NULL project_id to default project (1) before making NOT NULL.
     bind.execute(text("UPDATE secrets SET project_id = 1 WHERE project_id IS NULL"))
-    with op.batch_alter_table("secrets") as batch:
-        batch.alter_column("project_id", existing_type=None, nullable=False)
+    op.execute("ALTER TABLE secrets ALTER COLUMN project_id SET NOT NULL")
 
@@ -11,6 +11,8 @@ New policy:
 from alembic import op
 from sqlalchemy import text
 
+import _helpers
+
 revision = "0007_normalize_secret_scope"
 down_revision = "0006_secrets_global_scope"
 branch_labels = None
@@ -19,18 +21,26 @@ depends_on = None
 
 def upgrade() -> None:
     bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.secrets')")).scalar()
+    existing = _helpers.table_exists("secrets")
     if not existing:
         return
-    bind.execute(text("UPDATE secrets SET scope = 'global' WHERE project_id IS NULL"))
-    bind.execute(text("UPDATE secrets SET scope = 'project' WHERE project_id IS NOT NULL"))
+    # Один проход по таблице: строки, где scope уже корректный, не переписываем.
+    bind.execute(
+        text(
+            """
+            UPDATE secrets
+            SET scope = CASE WHEN project_id IS NULL THEN 'global' ELSE 'project' END
+            WHERE scope IS DISTINCT FROM CASE WHEN project_id IS NULL THEN 'global' ELSE 'project' END
+            """
+        )
+    )
 
 
 def downgrade() -> None:
     bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.secrets')")).scalar()
+    existing = _helpers.table_exists("secrets")
     if not existing:
         return
     # Best-effort revert to old default label.
-    bind.execute(text("UPDATE secrets SET scope = 'global'"))
+    bind.execute(text("UPDATE secrets SET scope = 'global' WHERE scope IS DISTINCT FROM 'global'"))
 
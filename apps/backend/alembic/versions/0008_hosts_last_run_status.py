@@ -7,8 +7,8 @@ Adds to hosts:
 """
 
 from alembic import op
-import sqlalchemy as sa
-from sqlalchemy import text
+
+import _helpers
 
 revision = "0008_hosts_last_run_status"
 down_revision = "0007_normalize_secret_scope"
@@ -17,23 +17,30 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.hosts')")).scalar()
+    existing = _helpers.table_exists("hosts")
     if not existing:
         return
-    with op.batch_alter_table("hosts") as batch:
-        batch.add_column(sa.Column("last_run_id", sa.Integer(), nullable=True))
-        batch.add_column(sa.Column("last_run_status", sa.String(), nullable=True))
-        batch.add_column(sa.Column("last_run_at", sa.DateTime(), nullable=True))
+    # Одним ALTER TABLE: одна блокировка hosts и одно обновление каталога.
+    op.execute(
+        """
+        ALTER TABLE hosts
+          ADD COLUMN last_run_id integer,
+          ADD COLUMN last_run_status varchar,
+          ADD COLUMN last_run_at timestamp without time zone
+        """
+    )
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.hosts')")).scalar()
+    existing = _helpers.table_exists("hosts")
     if not existing:
         return
-    with op.batch_alter_table("hosts") as batch:
-        batch.drop_column("last_run_at")
-        batch.drop_column("last_run_status")
-        batch.drop_column("last_run_id")
+    op.execute(
+        """
+        ALTER TABLE hosts
+          DROP COLUMN last_run_at,
+          DROP COLUMN last_run_status,
+          DROP COLUMN last_run_id
+        """
+    )
 
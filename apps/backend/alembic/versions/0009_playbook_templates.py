@@ -2,9 +2,10 @@
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import text
 from sqlalchemy.dialects import postgresql
 
+import _helpers
+
 revision = "0009_playbook_templates"
 down_revision = "0008_hosts_last_run_status"
 branch_labels = None
@@ -12,8 +13,7 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.projects')")).scalar()
+    existing = _helpers.table_exists("projects")
     if not existing:
         return
     op.create_table(
@@ -33,8 +33,7 @@ def upgrade() -> None:
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.playbook_templates')")).scalar()
+    existing = _helpers.table_exists("playbook_templates")
     if not existing:
         return
     op.drop_index("ix_playbook_templates_project_id", table_name="playbook_templates")
@@ -2,7 +2,8 @@
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import text
+
+import _helpers
 
 revision = "0011_approval_requests"
 down_revision = "0010_playbook_instances"
@@ -11,8 +12,7 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.job_runs')")).scalar()
+    existing = _helpers.table_exists("job_runs")
     if not existing:
         return
     op.create_table(
@@ -33,8 +33,7 @@ def upgrade() -> None:
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.approval_requests')")).scalar()
+    existing = _helpers.table_exists("approval_requests")
     if not existing:
         return
     op.drop_index("ix_approval_requests_run_id", table_name="approval_requests")
@@ -2,7 +2,8 @@
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import text
+
+import _helpers
 
 revision = "0012_playbook_webhook_token"
 down_revision = "0011_approval_requests"
@@ -11,16 +12,14 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.playbooks')")).scalar()
+    existing = _helpers.table_exists("playbooks")
     if not existing:
         return
     op.add_column("playbooks", sa.Column("webhook_token", sa.String(), nullable=True))
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.playbooks')")).scalar()
+    existing = _helpers.table_exists("playbooks")
     if not existing:
         return
     op.drop_column("playbooks", "webhook_token")
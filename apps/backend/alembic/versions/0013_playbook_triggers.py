@@ -2,7 +2,9 @@
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+import _helpers
 
 revision = "0013_playbook_triggers"
 down_revision = "0012_playbook_webhook_token"
@@ -11,8 +13,7 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.playbook_triggers')")).scalar()
+    existing = _helpers.table_exists("playbook_triggers")
     if existing:
         return
     op.create_table(
@@ -22,23 +23,20 @@ def upgrade() -> None:
         sa.Column("playbook_id", sa.Integer(), sa.ForeignKey("playbooks.id"), nullable=False),
         sa.Column("type", sa.String(), nullable=False),
         sa.Column("enabled", sa.Boolean(), nullable=False, server_default=sa.text("true")),
-        sa.Column("filters", sa.JSON(), nullable=False, server_default=sa.text("'{}'::json")),
-        sa.Column("extra_vars", sa.JSON(), nullable=False, server_default=sa.text("'{}'::json")),
+        sa.Column("filters", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("extra_vars", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default=sa.text("'{}'::jsonb")),
         sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
-        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()")),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
         sa.Column("updated_at", sa.DateTime(), nullable=True),
     )
-    op.create_index("ix_playbook_triggers_id", "playbook_triggers", ["id"])
     op.create_index("ix_playbook_triggers_project_id", "playbook_triggers", ["project_id"])
     op.create_index("ix_playbook_triggers_playbook_id", "playbook_triggers", ["playbook_id"])
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.playbook_triggers')")).scalar()
+    existing = _helpers.table_exists("playbook_triggers")
     if not existing:
         return
     op.drop_index("ix_playbook_triggers_playbook_id", table_name="playbook_triggers")
     op.drop_index("ix_playbook_triggers_project_id", table_name="playbook_triggers")
-    op.drop_index("ix_playbook_triggers_id", table_name="playbook_triggers")
     op.drop_table("playbook_triggers")
@@ -2,7 +2,9 @@
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+import _helpers
 
 revision = "0015_host_health_history"
 down_revision = "0014_hosts_health_snapshot"
@@ -11,8 +13,7 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.host_health_checks')")).scalar()
+    existing = _helpers.table_exists("host_health_checks")
     if existing:
         return
     op.create_table(
@@ -21,20 +22,17 @@ def upgrade() -> None:
         sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False, server_default="1"),
         sa.Column("host_id", sa.Integer(), sa.ForeignKey("hosts.id"), nullable=False),
         sa.Column("status", sa.String(), nullable=False),
-        sa.Column("snapshot", sa.JSON(), nullable=True),
-        sa.Column("checked_at", sa.DateTime(), server_default=sa.text("now()")),
+        sa.Column("snapshot", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("checked_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
     )
-    op.create_index("ix_host_health_checks_id", "host_health_checks", ["id"])
     op.create_index("ix_host_health_checks_host_id", "host_health_checks", ["host_id"])
     op.create_index("ix_host_health_checks_project_id", "host_health_checks", ["project_id"])
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.host_health_checks')")).scalar()
+    existing = _helpers.table_exists("host_health_checks")
     if not existing:
         return
     op.drop_index("ix_host_health_checks_project_id", table_name="host_health_checks")
     op.drop_index("ix_host_health_checks_host_id", table_name="host_health_checks")
-    op.drop_index("ix_host_health_checks_id", table_name="host_health_checks")
     op.drop_table("host_health_checks")
@@ -1,8 +1,6 @@
 """0017: audit source ip."""
 
 from alembic import op
-import sqlalchemy as sa
-from sqlalchemy import text
 
 revision = "0017_audit_source_ip"
 down_revision = "0016_host_facts_snapshot"
@@ -11,16 +9,8 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.audit_events')")).scalar()
-    if not existing:
-        return
-    op.add_column("audit_events", sa.Column("source_ip", sa.String(), nullable=True))
+    op.execute("ALTER TABLE IF EXISTS audit_events ADD COLUMN IF NOT EXISTS source_ip varchar")
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.audit_events')")).scalar()
-    if not existing:
-        return
-    op.drop_column("audit_events", "source_ip")
+    op.execute("ALTER TABLE IF EXISTS audit_events DROP COLUMN IF EXISTS source_ip")
@@ -1,8 +1,6 @@
 """0018: secrets expires_at."""
 
 from alembic import op
-import sqlalchemy as sa
-from sqlalchemy import text
 
 revision = "0018_secrets_expires_at"
 down_revision = "0017_audit_source_ip"
@@ -11,16 +9,8 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.secrets')")).scalar()
-    if not existing:
-        return
-    op.add_column("secrets", sa.Column("expires_at", sa.DateTime(), nullable=True))
+    op.execute("ALTER TABLE IF EXISTS secrets ADD COLUMN IF NOT EXISTS expires_at timestamp without time zone")
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.secrets')")).scalar()
-    if not existing:
-        return
-    op.drop_column("secrets", "expires_at")
+    op.execute("ALTER TABLE IF EXISTS secrets DROP COLUMN IF EXISTS expires_at")
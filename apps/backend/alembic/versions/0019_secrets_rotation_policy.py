@@ -1,8 +1,6 @@
 """0019: secrets rotation policy."""
 
 from alembic import op
-import sqlalchemy as sa
-from sqlalchemy import text
 
 revision = "0019_secrets_rotation_policy"
 down_revision = "0018_secrets_expires_at"
@@ -11,20 +9,22 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.secrets')")).scalar()
-    if not existing:
-        return
-    op.add_column("secrets", sa.Column("rotation_interval_days", sa.Integer(), nullable=True))
-    op.add_column("secrets", sa.Column("last_rotated_at", sa.DateTime(), nullable=True))
-    op.add_column("secrets", sa.Column("next_rotated_at", sa.DateTime(), nullable=True))
+    op.execute(
+        """
+        ALTER TABLE IF EXISTS secrets
+          ADD COLUMN IF NOT EXISTS rotation_interval_days integer,
+          ADD COLUMN IF NOT EXISTS last_rotated_at timestamp without time zone,
+          ADD COLUMN IF NOT EXISTS next_rotated_at timestamp without time zone
+        """
+    )
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.secrets')")).scalar()
-    if not existing:
-        return
-    op.drop_column("secrets", "next_rotated_at")
-    op.drop_column("secrets", "last_rotated_at")
-    op.drop_column("secrets", "rotation_interval_days")
+    op.execute(
+        """
+        ALTER TABLE IF EXISTS secrets
+          DROP COLUMN IF EXISTS next_rotated_at,
+          DROP COLUMN IF EXISTS last_rotated_at,
+          DROP COLUMN IF EXISTS rotation_interval_days
+        """
+    )
@@ -2,7 +2,9 @@
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+import _helpers
 
 revision = "0020_notification_endpoints"
 down_revision = "0019_secrets_rotation_policy"
@@ -11,8 +13,7 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.notification_endpoints')")).scalar()
+    existing = _helpers.table_exists("notification_endpoints")
     if existing:
         return
     op.create_table(
@@ -23,20 +24,17 @@ def upgrade() -> None:
         sa.Column("type", sa.String(), nullable=False, server_default="webhook"),
         sa.Column("url", sa.String(), nullable=False),
         sa.Column("secret", sa.String(), nullable=True),
-        sa.Column("events", sa.JSON(), nullable=False, server_default=sa.text("'[]'::json")),
+        sa.Column("events", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default=sa.text("'[]'::jsonb")),
         sa.Column("enabled", sa.Boolean(), nullable=False, server_default=sa.text("true")),
-        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()")),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
         sa.Column("updated_at", sa.DateTime(), nullable=True),
     )
-    op.create_index("ix_notification_endpoints_id", "notification_endpoints", ["id"])
     op.create_index("ix_notification_endpoints_project_id", "notification_endpoints", ["project_id"])
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.notification_endpoints')")).scalar()
+    existing = _helpers.table_exists("notification_endpoints")
     if not existing:
         return
     op.drop_index("ix_notification_endpoints_project_id", table_name="notification_endpoints")
-    op.drop_index("ix_notification_endpoints_id", table_name="notification_endpoints")
     op.drop_table("notification_endpoints")
@@ -2,7 +2,8 @@
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import text
+
+import _helpers
 
 revision = "0021_ssh_sessions"
 down_revision = "0020_notification_endpoints"
@@ -11,8 +12,7 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.ssh_sessions')")).scalar()
+    existing = _helpers.table_exists("ssh_sessions")
     if existing:
         return
     op.create_table(
@@ -28,17 +28,14 @@ def upgrade() -> None:
         sa.Column("success", sa.Boolean(), nullable=False, server_default=sa.text("true")),
         sa.Column("error", sa.Text(), nullable=True),
     )
-    op.create_index("ix_ssh_sessions_id", "ssh_sessions", ["id"])
     op.create_index("ix_ssh_sessions_project_id", "ssh_sessions", ["project_id"])
     op.create_index("ix_ssh_sessions_host_id", "ssh_sessions", ["host_id"])
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    existing = bind.execute(text("SELECT to_regclass('public.ssh_sessions')")).scalar()
+    existing = _helpers.table_exists("ssh_sessions")
     if not existing:
         return
     op.drop_index("ix_ssh_sessions_host_id", table_name="ssh_sessions")
     op.drop_index("ix_ssh_sessions_project_id", table_name="ssh_sessions")
-    op.drop_index("ix_ssh_sessions_id", table_name="ssh_sessions")
     op.drop_table("ssh_sessions")
@@ -1,8 +1,6 @@
 """0022: ssh full recording."""
 
 from alembic import op
-import sqlalchemy as sa
-from sqlalchemy import text
 
 revision = "0022_ssh_full_recording"
 down_revision = "0021_ssh_sessions"
@@ -11,22 +9,13 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    hosts = bind.execute(text("SELECT to_regclass('public.hosts')")).scalar()
-    if hosts:
-        op.add_column("hosts", sa.Column("record_ssh", sa.Boolean(), nullable=False, server_default=sa.text("false")))
-    sessions = bind.execute(text("SELECT to_regclass('public.ssh_sessions')")).scalar()
-    if sessions:
-        op.add_column("ssh_sessions", sa.Column("transcript", sa.Text(), nullable=True))
-        op.add_column("ssh_sessions", sa.Column("transcript_truncated", sa.Boolean(), nullable=False, server_default=sa.text("false")))
+    op.execute("ALTER TABLE IF EXISTS hosts ADD COLUMN IF NOT EXISTS record_ssh boolean NOT NULL DEFAULT false")
+    op.execute(
+        "ALTER TABLE IF EXISTS ssh_sessions ADD COLUMN IF NOT EXISTS transcript text, "
+        "ADD COLUMN IF NOT EXISTS transcript_truncated boolean NOT NULL DEFAULT false"
+    )
 
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    sessions = bind.execute(text("SELECT to_regclass('public.ssh_sessions')")).scalar()
-    if sessions:
-        op.drop_column("ssh_sessions", "transcript_truncated")
-        op.drop_column("ssh_sessions", "transcript")
-    hosts = bind.execute(text("SELECT to_regclass('public.hosts')")).scalar()
-    if hosts:
-        op.drop_column("hosts", "record_ssh")
+    op.execute("ALTER TABLE IF EXISTS ssh_sessions DROP COLUMN IF EXISTS transcript_truncated, DROP COLUMN IF EXISTS transcript")
+    op.execute("ALTER TABLE IF EXISTS hosts DROP COLUMN IF EXISTS record_ssh")
@@ -1,8 +1,6 @@
 """0023: playbook git sync metadata."""
 
 from alembic import op
-import sqlalchemy as sa
-from sqlalchemy import text
 
 revision = "0023_playbook_git_sync"
 down_revision = "0022_ssh_full_recording"
@@ -11,31 +9,31 @@ depends_on = None
 
 
 def upgrade() -> None:
-    bind = op.get_bind()
-    playbooks = bind.execute(text("SELECT to_regclass('public.playbooks')")).scalar()
-    if playbooks:
-        op.add_column("playbooks", sa.Column("repo_url", sa.String(), nullable=True))
-        op.add_column("playbooks", sa.Column("repo_ref", sa.String(), nullable=True))
-        op.add_column("playbooks", sa.Column("repo_playbook_path", sa.String(), nullable=True))
-        op.add_column(
-            "playbooks",
-            sa.Column("repo_auto_sync", sa.Boolean(), nullable=False, server_default=sa.text("false")),
-        )
-        op.add_column("playbooks", sa.Column("repo_last_sync_at", sa.DateTime(), nullable=True))
-        op.add_column("playbooks", sa.Column("repo_last_commit", sa.String(), nullable=True))
-        op.add_column("playbooks", sa.Column("repo_sync_status", sa.String(), nullable=True))
-        op.add_column("playbooks", sa.Column("repo_sync_message", sa.Text(), nullable=True))
-
+    op.execute(
+        """
+        ALTER TABLE IF EXISTS playbooks
+          ADD COLUMN IF NOT EXISTS repo_url varchar,
+          ADD COLUMN IF NOT EXISTS repo_ref varchar,
+          ADD COLUMN IF NOT EXISTS repo_playbook_path varchar,
+          ADD COLUMN IF NOT EXISTS repo_auto_sync boolean NOT NULL DEFAULT false,
+          ADD COLUMN IF NOT EXISTS repo_last_sync_at timestamp without time zone,
+          ADD COLUMN IF NOT EXISTS repo_last_commit varchar,
+          ADD COLUMN IF NOT EXISTS repo_sync_status varchar,
+          ADD COLUMN IF NOT EXISTS repo_sync_message text
+        """
+    )
 
 def downgrade() -> None:
-    bind = op.get_bind()
-    playbooks = bind.execute(text("SELECT to_regclass('public.playbooks')")).scalar()
-    if playbooks:
-        op.drop_column("playbooks", "repo_sync_message")
-        op.drop_column("playbooks", "repo_sync_status")
-        op.drop_column("playbooks", "repo_last_commit")
-        op.drop_column("playbooks", "repo_last_sync_at")
-        op.drop_column("playbooks", "repo_auto_sync")
-        op.drop_column("playbooks", "repo_playbook_path")
-        op.drop_column("playbooks", "repo_ref")
-        op.drop_column("playbooks", "repo_url")
+    op.execute(
+        """
+        ALTER TABLE IF EXISTS playbooks
+          DROP COLUMN IF EXISTS repo_sync_message,
+          DROP COLUMN IF EXISTS repo_sync_status,
+          DROP COLUMN IF EXISTS repo_last_commit,
+          DROP COLUMN IF EXISTS repo_last_sync_at,
+          DROP COLUMN IF EXISTS repo_auto_sync,
+          DROP COLUMN IF EXISTS repo_playbook_path,
+          DROP COLUMN IF EXISTS repo_ref,
+          DROP COLUMN IF EXISTS repo_url
+        """
+    )
@@ -11,8 +11,13 @@ depends_on = None
 
 
 def upgrade() -> None:
-    op.add_column("secrets", sa.Column("dynamic_enabled", sa.Boolean(), nullable=False, server_default=sa.text("false")))
-    op.add_column("secrets", sa.Column("dynamic_ttl_seconds", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        ALTER TABLE secrets
+          ADD COLUMN IF NOT EXISTS dynamic_enabled boolean NOT NULL DEFAULT false,
+          ADD COLUMN IF NOT EXISTS dynamic_ttl_seconds integer
+        """
+    )
     op.create_table(
         "secret_leases",
         sa.Column("id", sa.Integer(), primary_key=True),
@@ -32,5 +37,4 @@ def downgrade() -> None:
     op.drop_index("ix_secret_leases_project_id", table_name="secret_leases")
     op.drop_index("ix_secret_leases_secret_id", table_name="secret_leases")
     op.drop_table("secret_leases")
-    op.drop_column("secrets", "dynamic_ttl_seconds")
-    op.drop_column("secrets", "dynamic_enabled")
+    op.execute("ALTER TABLE secrets DROP COLUMN IF EXISTS dynamic_ttl_seconds, DROP COLUMN IF EXISTS dynamic_enabled")
@@ -1,4 +1,8 @@
-"""0026: plugin instances."""
+"""0026: plugin instances.
+
+`type` — varchar + CHECK, а не ENUM: новый тип плагина добавляется заменой CHECK,
+без `ALTER TYPE ... ADD VALUE` (который не выполняется в транзакции).
+"""
 
 from alembic import op
 import sqlalchemy as sa
@@ -11,17 +15,11 @@ depends_on = None
 
 
 def upgrade() -> None:
-    op.execute(
-        "DO $$ BEGIN "
-        "CREATE TYPE plugintype AS ENUM ('inventory', 'secrets', 'automation'); "
-        "EXCEPTION WHEN duplicate_object THEN NULL; "
-        "END $$;"
-    )
     op.create_table(
         "plugin_instances",
         sa.Column("id", sa.Integer(), primary_key=True),
         sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False),
-        sa.Column("type", postgresql.ENUM("inventory", "secrets", "automation", name="plugintype", create_type=False), nullable=False),
+        sa.Column("type", sa.String(32), nullable=False),
         sa.Column("definition_id", sa.String(), nullable=False),
         sa.Column("name", sa.String(), nullable=False),
         sa.Column("enabled", sa.Boolean(), nullable=False, server_default=sa.text("true")),
@@ -29,6 +27,7 @@ def upgrade() -> None:
         sa.Column("config", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default=sa.text("'{}'::jsonb")),
         sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
         sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.CheckConstraint("type IN ('inventory', 'secrets', 'automation')", name="ck_plugin_instances_type"),
     )
     op.create_index("ix_plugin_instances_project_id", "plugin_instances", ["project_id"])
     op.create_index("ix_plugin_instances_type", "plugin_instances", ["type"])
@@ -38,5 +37,3 @@ def downgrade() -> None:
     op.drop_index("ix_plugin_instances_type", table_name="plugin_instances")
     op.drop_index("ix_plugin_instances_project_id", table_name="plugin_instances")
     op.drop_table("plugin_instances")
-    plugin_type = sa.Enum("inventory", "secrets", "automation", name="plugintype")
-    plugin_type.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,22 @@
+"""0027: drop redundant ix_*_id indexes.
+
+PRIMARY KEY уже создаёт уникальный btree по `id`; отдельные `ix_<table>_id`
+на таблицах 0013/0015/0020/0021 только удорожали INSERT.
+"""
+
+import _helpers
+
+revision = "0027_drop_redundant_id_indexes"
+down_revision = "0026_plugin_instances"
+branch_labels = None
+depends_on = None
+
+TABLES = ("playbook_triggers", "host_health_checks", "notification_endpoints", "ssh_sessions")
+
+
+def upgrade() -> None:
+    _helpers.drop_indexes_concurrently(f"ix_{t}_id" for t in TABLES)
+
+
+def downgrade() -> None:
+    _helpers.create_indexes_concurrently((f"ix_{t}_id", t, ["id"]) for t in TABLES)
@@ -0,0 +1,46 @@
+"""0028: composite tenant indexes.
+
+Запросы к этим таблицам фильтруют одновременно по project_id и второму полю;
+вместо двух одноколоночных индексов (BitmapAnd) держим один составной.
+
+Порядок колонок:
+- для FK-колонок (host_id, secret_id) она идёт первой: по равенству обоих полей
+  индекс работает при любом порядке, а так он же обслуживает проверки FK
+  при удалении хоста/секрета;
+- для playbook_triggers реальный фильтр — (project_id, type); индекс по playbook_id
+  остаётся для FK.
+"""
+
+import _helpers
+
+revision = "0028_tenant_composite_indexes"
+down_revision = "0027_drop_redundant_id_indexes"
+branch_labels = None
+depends_on = None
+
+# (новый индекс, таблица, колонки, заменяемые индексы)
+COMPOSITES = (
+    ("ix_host_health_checks_host_project", "host_health_checks", ["host_id", "project_id"],
+     [("ix_host_health_checks_host_id", ["host_id"]), ("ix_host_health_checks_project_id", ["project_id"])]),
+    ("ix_ssh_sessions_host_project", "ssh_sessions", ["host_id", "project_id"],
+     [("ix_ssh_sessions_host_id", ["host_id"]), ("ix_ssh_sessions_project_id", ["project_id"])]),
+    ("ix_secret_leases_secret_project", "secret_leases", ["secret_id", "project_id"],
+     [("ix_secret_leases_secret_id", ["secret_id"]), ("ix_secret_leases_project_id", ["project_id"])]),
+    ("ix_plugin_instances_project_type", "plugin_instances", ["project_id", "type"],
+     [("ix_plugin_instances_project_id", ["project_id"]), ("ix_plugin_instances_type", ["type"])]),
+    ("ix_playbook_triggers_project_type", "playbook_triggers", ["project_id", "type"],
+     [("ix_playbook_triggers_project_id", ["project_id"])]),
+)
+
+
+def upgrade() -> None:
+    # Сначала строим новые индексы, затем снимаем старые — запросы не остаются без индекса.
+    _helpers.create_indexes_concurrently((name, table, cols) for name, table, cols, _ in COMPOSITES)
+    _helpers.drop_indexes_concurrently(old for *_, replaced in COMPOSITES for old, _ in replaced)
+
+
+def downgrade() -> None:
+    _helpers.create_indexes_concurrently(
+        (old, table, cols) for _, table, _, replaced in COMPOSITES for old, cols in replaced
+    )
+    _helpers.drop_indexes_concurrently(name for name, *_ in COMPOSITES)
@@ -0,0 +1,60 @@
+"""0029: json -> jsonb.
+
+Ранние ревизии (0013-0016, 0020) создавали эти колонки как `json`, хотя модели
+объявляют JSONB. Свежие БД уже получают jsonb (ревизии поправлены), существующие
+конвертируем здесь; колонки, которые уже jsonb, не трогаем (без лишней перезаписи таблицы).
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+revision = "0029_json_to_jsonb"
+down_revision = "0028_tenant_composite_indexes"
+branch_labels = None
+depends_on = None
+
+# table -> [(column, server_default | None)]
+JSON_COLUMNS = {
+    "playbook_triggers": [("filters", "'{}'"), ("extra_vars", "'{}'")],
+    "host_health_checks": [("snapshot", None)],
+    "hosts": [("health_snapshot", None), ("facts_snapshot", None)],
+    "notification_endpoints": [("events", "'[]'")],
+}
+
+
+def _convert(target: str) -> None:
+    source = "json" if target == "jsonb" else "jsonb"
+    bind = op.get_bind()
+    rows = bind.execute(
+        text(
+            """
+            SELECT table_name::text, column_name::text
+            FROM information_schema.columns
+            WHERE table_schema = 'public' AND data_type::text = :source AND table_name::text = ANY(:tables)
+            """
+        ),
+        {"source": source, "tables": list(JSON_COLUMNS)},
+    ).all()
+    pending = {(t, c) for t, c in rows}
+    for table, columns in JSON_COLUMNS.items():
+        clauses = []
+        for column, default in columns:
+            if (table, column) not in pending:
+                continue
+            # DEFAULT снимаем/ставим в том же ALTER: json-выражение не приводится к jsonb автоматически.
+            if default is not None:
+                clauses.append(f"ALTER COLUMN {column} DROP DEFAULT")
+            clauses.append(f"ALTER COLUMN {column} TYPE {target} USING {column}::{target}")
+            if default is not None:
+                clauses.append(f"ALTER COLUMN {column} SET DEFAULT {default}::{target}")
+        if clauses:
+            # Одна перезапись таблицы на все её колонки.
+            op.execute(f"ALTER TABLE {table} " + ", ".join(clauses))
+
+
+def upgrade() -> None:
+    _convert("jsonb")
+
+
+def downgrade() -> None:
+    _convert("json")
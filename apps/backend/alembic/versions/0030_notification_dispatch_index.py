@@ -0,0 +1,29 @@
+"""0030: partial covering index for notification dispatch.
+
+`notify_event` выбирает включённые endpoint'ы проекта и читает только
+type/url/secret/events. Частичный индекс по project_id WHERE enabled с этими колонками
+в INCLUDE позволяет обойтись index-only scan, не трогая выключенные записи.
+"""
+
+from alembic import op
+
+import _helpers
+
+revision = "0030_notification_dispatch_index"
+down_revision = "0029_json_to_jsonb"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_notification_endpoints_dispatch"
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} ON notification_endpoints "
+            "USING btree (project_id) INCLUDE (type, url, secret, events) WHERE enabled"
+        )
+
+
+def downgrade() -> None:
+    _helpers.drop_index_concurrently(INDEX_NAME)
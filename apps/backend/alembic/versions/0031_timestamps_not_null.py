@@ -0,0 +1,42 @@
+"""0031: NOT NULL for creation timestamps.
+
+created_at/checked_at во всех вставках заполняются `DEFAULT now()`, но колонки
+оставались nullable. Для существующих БД: дозаполняем NULL, затем SET NOT NULL через
+проверенный CHECK-констрейнт — тогда SET NOT NULL не сканирует таблицу под ACCESS EXCLUSIVE.
+
+Выигрыш есть, только если шаги идут в отдельных транзакциях: иначе ACCESS EXCLUSIVE от
+ADD CONSTRAINT держится до конца транзакции миграции вместе с проверкой. Поэтому
+ADD (NOT VALID, мгновенно), VALIDATE (SHARE UPDATE EXCLUSIVE — запись не блокирует)
+и SET NOT NULL выполняются в autocommit-блоке, каждый своим коммитом.
+"""
+
+from alembic import op
+
+revision = "0031_timestamps_not_null"
+down_revision = "0030_notification_dispatch_index"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ("playbook_triggers", "created_at"),
+    ("host_health_checks", "checked_at"),
+    ("notification_endpoints", "created_at"),
+)
+
+
+def upgrade() -> None:
+    for table, column in COLUMNS:
+        op.execute(f"UPDATE {table} SET {column} = now() WHERE {column} IS NULL")
+    with op.get_context().autocommit_block():
+        for table, column in COLUMNS:
+            check = f"ck_{table}_{column}_not_null"
+            # Повторный прогон после сбоя посередине не должен падать на уже добавленном CHECK.
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {check}")
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {check} CHECK ({column} IS NOT NULL) NOT VALID")
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}")
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL, DROP CONSTRAINT {check}")
+
+
+def downgrade() -> None:
+    for table, column in COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL")
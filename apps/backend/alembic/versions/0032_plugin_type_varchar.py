@@ -0,0 +1,44 @@
+"""0032: plugin_instances.type — ENUM plugintype -> varchar + CHECK.
+
+Для БД, где 0026 уже создала ENUM. Свежие БД получают varchar сразу (0026 поправлена),
+для них ревизия ничего не делает.
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+import _helpers
+
+revision = "0032_plugin_type_varchar"
+down_revision = "0031_timestamps_not_null"
+branch_labels = None
+depends_on = None
+
+PLUGIN_TYPES_CHECK = "type IN ('inventory', 'secrets', 'automation')"
+
+
+def upgrade() -> None:
+    if not _helpers.table_exists("plugin_instances"):
+        return
+    data_type = op.get_bind().execute(
+        text(
+            """
+            SELECT data_type::text
+            FROM information_schema.columns
+            WHERE table_schema = 'public' AND table_name = 'plugin_instances' AND column_name = 'type'
+            """
+        )
+    ).scalar()
+    if data_type != "USER-DEFINED":
+        return
+    op.execute(
+        "ALTER TABLE plugin_instances "
+        "ALTER COLUMN type TYPE varchar(32) USING type::text, "
+        f"ADD CONSTRAINT ck_plugin_instances_type CHECK ({PLUGIN_TYPES_CHECK})"
+    )
+    op.execute("DROP TYPE IF EXISTS plugintype")
+
+
+def downgrade() -> None:
+    # 0026 теперь сама создаёт varchar + CHECK, так что возвращать ENUM незачем.
+    pass
@@ -0,0 +1,123 @@
+"""0033: host_health_checks — помесячные партиции по checked_at.
+
+История health-check'ов — append-only и растёт без ограничений. RANGE-партиции по месяцу:
+- выборки по времени трогают только нужные месяцы;
+- retention — `DROP TABLE host_health_checks_yYYYYmMM` вместо DELETE по куче.
+
+Партиции создаёт SQL-функция `ensure_host_health_check_partitions(since, until)`; её же
+вызывает backend на старте (текущий и следующий месяц). DEFAULT-партиция страхует вставки,
+если очередной месяц ещё не создан.
+
+ssh_sessions не партиционируем: строки сессий обновляются (finished_at, transcript)
+и читаются по id, а PK партиционированной таблицы обязан включать ключ партиции.
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+import _helpers
+
+revision = "0033_partition_host_health_checks"
+down_revision = "0032_plugin_type_varchar"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, project_id, host_id, status, snapshot, checked_at"
+
+CREATE_PARTITION_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION ensure_host_health_check_partitions(since timestamp, until timestamp)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  month_start timestamp := date_trunc('month', since);
+BEGIN
+  WHILE month_start <= until LOOP
+    EXECUTE format(
+      'CREATE TABLE IF NOT EXISTS %I PARTITION OF host_health_checks FOR VALUES FROM (%L) TO (%L)',
+      'host_health_checks_' || to_char(month_start, '"y"YYYY"m"MM'),
+      month_start,
+      month_start + interval '1 month'
+    );
+    month_start := month_start + interval '1 month';
+  END LOOP;
+END
+$$
+"""
+
+
+def _is_partitioned() -> bool:
+    relkind = op.get_bind().execute(
+        text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass('public.host_health_checks')")
+    ).scalar()
+    return relkind == "p"
+
+
+def upgrade() -> None:
+    if not _helpers.table_exists("host_health_checks") or _is_partitioned():
+        return
+
+    # Старую таблицу убираем с дороги вместе с именами её индексов/PK (общее пространство имён).
+    op.execute("ALTER TABLE host_health_checks RENAME TO host_health_checks_old")
+    op.execute("ALTER TABLE host_health_checks_old RENAME CONSTRAINT host_health_checks_pkey TO host_health_checks_old_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_host_health_checks_host_project, ix_host_health_checks_host_id, ix_host_health_checks_project_id")
+
+    op.execute(
+        """
+        CREATE TABLE host_health_checks (
+          id integer NOT NULL DEFAULT nextval('host_health_checks_id_seq'::regclass),
+          project_id integer NOT NULL DEFAULT 1 REFERENCES projects (id),
+          host_id integer NOT NULL REFERENCES hosts (id),
+          status varchar NOT NULL,
+          snapshot jsonb,
+          checked_at timestamp without time zone NOT NULL DEFAULT now(),
+          CONSTRAINT host_health_checks_pkey PRIMARY KEY (id, checked_at)
+        ) PARTITION BY RANGE (checked_at)
+        """
+    )
+    # checked_at в конце: история хоста читается `ORDER BY checked_at DESC LIMIT n`,
+    # по каждой партиции это упорядоченный index scan, которые склеивает Merge Append.
+    op.execute("CREATE INDEX ix_host_health_checks_host_project ON host_health_checks (host_id, project_id, checked_at)")
+    op.execute(CREATE_PARTITION_FUNCTION_SQL)
+    op.execute(
+        """
+        SELECT ensure_host_health_check_partitions(
+          COALESCE((SELECT min(checked_at) FROM host_health_checks_old), now()::timestamp),
+          now()::timestamp + interval '1 month'
+        )
+        """
+    )
+    op.execute("CREATE TABLE host_health_checks_default PARTITION OF host_health_checks DEFAULT")
+
+    op.execute(f"INSERT INTO host_health_checks ({COLUMNS}) SELECT {COLUMNS} FROM host_health_checks_old")
+    # Sequence принадлежала старой таблице и удалилась бы вместе с ней.
+    op.execute("ALTER SEQUENCE host_health_checks_id_seq OWNED BY host_health_checks.id")
+    op.execute("DROP TABLE host_health_checks_old")
+
+
+def downgrade() -> None:
+    if not _helpers.table_exists("host_health_checks") or not _is_partitioned():
+        return
+
+    op.execute("ALTER TABLE host_health_checks RENAME TO host_health_checks_part")
+    op.execute("ALTER TABLE host_health_checks_part RENAME CONSTRAINT host_health_checks_pkey TO host_health_checks_part_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_host_health_checks_host_project")
+    op.execute(
+        """
+        CREATE TABLE host_health_checks (
+          id integer NOT NULL DEFAULT nextval('host_health_checks_id_seq'::regclass),
+          project_id integer NOT NULL DEFAULT 1 REFERENCES projects (id),
+          host_id integer NOT NULL REFERENCES hosts (id),
+          status varchar NOT NULL,
+          snapshot jsonb,
+          checked_at timestamp without time zone NOT NULL DEFAULT now(),
+          CONSTRAINT host_health_checks_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(f"INSERT INTO host_health_checks ({COLUMNS}) SELECT {COLUMNS} FROM host_health_checks_part")
+    op.execute("CREATE INDEX ix_host_health_checks_host_project ON host_health_checks (host_id, project_id)")
+    op.execute("ALTER SEQUENCE host_health_checks_id_seq OWNED BY host_health_checks.id")
+    # Партиции удаляются вместе с родителем.
+    op.execute("DROP TABLE host_health_checks_part")
+    op.execute("DROP FUNCTION IF EXISTS ensure_host_health_check_partitions(timestamp, timestamp)")
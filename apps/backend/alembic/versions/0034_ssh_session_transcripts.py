@@ -0,0 +1,66 @@
+"""0034: ssh_session_transcripts — записи SSH-сессий отдельно от метаданных.
+
+Транскрипт (до 200 КБ) уезжал в TOAST, но жил в строке ssh_sessions, и список сессий
+хоста тянул его целиком. Теперь в ssh_sessions — только метаданные, запись — в side-таблице
+с PK = session_id, читается отдельным запросом при просмотре.
+
+Сжатие — lz4 (PG14+, дешевле pglz на распаковке). Storage оставляем EXTENDED:
+EXTERNAL отключил бы сжатие совсем.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+import _helpers
+
+revision = "0034_ssh_session_transcripts"
+down_revision = "0033_partition_host_health_checks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not _helpers.table_exists("ssh_sessions") or _helpers.table_exists("ssh_session_transcripts"):
+        return
+    op.create_table(
+        "ssh_session_transcripts",
+        sa.Column("session_id", sa.Integer(), sa.ForeignKey("ssh_sessions.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("transcript", sa.Text(), nullable=False),
+        sa.Column("transcript_truncated", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+    )
+    # Сборка Postgres без lz4 (или до 14) — остаёмся на pglz по умолчанию.
+    op.execute(
+        "DO $$ BEGIN "
+        "EXECUTE 'ALTER TABLE ssh_session_transcripts ALTER COLUMN transcript SET COMPRESSION lz4'; "
+        "EXCEPTION WHEN feature_not_supported OR syntax_error THEN NULL; "
+        "END $$;"
+    )
+    # Колонки добавлены сырым ALTER в 0022 (снимок схемы их не видит) — проверяем на сервере.
+    op.execute(
+        """
+        DO $$ BEGIN
+          IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = 'public' AND table_name = 'ssh_sessions' AND column_name = 'transcript'
+          ) THEN
+            INSERT INTO ssh_session_transcripts (session_id, transcript, transcript_truncated)
+            SELECT id, transcript, transcript_truncated FROM ssh_sessions WHERE transcript IS NOT NULL;
+            ALTER TABLE ssh_sessions DROP COLUMN transcript, DROP COLUMN IF EXISTS transcript_truncated;
+          END IF;
+        END $$
+        """
+    )
+
+
+def downgrade() -> None:
+    if not _helpers.table_exists("ssh_session_transcripts"):
+        return
+    op.execute(
+        "ALTER TABLE ssh_sessions ADD COLUMN IF NOT EXISTS transcript text, "
+        "ADD COLUMN IF NOT EXISTS transcript_truncated boolean NOT NULL DEFAULT false"
+    )
+    op.execute(
+        "UPDATE ssh_sessions s SET transcript = t.transcript, transcript_truncated = t.transcript_truncated "
+        "FROM ssh_session_transcripts t WHERE t.session_id = s.id"
+    )
+    op.drop_table("ssh_session_transcripts")
@@ -0,0 +1,58 @@
+"""0035: composite indexes for list queries.
+
+Списки фильтруются по project_id и сортируются по created_at DESC (audit, approvals)
+или по name (groups). Составной индекс в порядке сортировки превращает
+`ORDER BY ... LIMIT n` в ограниченный index scan вместо фильтра и сортировки;
+одноколоночные ix_*_project_id при этом становятся лишними.
+
+Для group_hosts/dynamic_group_host_cache пара (group_id, host_id) уникальна по смыслу —
+фиксируем это уникальным индексом; он же заменяет индекс по group_id.
+Перед построением удаляем дубли, если они успели накопиться.
+"""
+
+from alembic import op
+
+import _helpers
+
+revision = "0035_list_order_indexes"
+down_revision = "0034_ssh_session_transcripts"
+branch_labels = None
+depends_on = None
+
+# (новый индекс, таблица, колонки, заменяемые индексы)
+COMPOSITES = (
+    ("ix_audit_events_project_created", "audit_events", ["project_id", "created_at DESC"],
+     [("ix_audit_events_project_id", ["project_id"])]),
+    ("ix_approval_requests_project_created", "approval_requests", ["project_id", "created_at DESC"],
+     [("ix_approval_requests_project_id", ["project_id"])]),
+    ("ix_groups_project_name", "groups", ["project_id", "name"],
+     [("ix_groups_project_id", ["project_id"])]),
+)
+UNIQUE_PAIRS = (
+    ("uq_group_hosts_group_host", "group_hosts", ["group_id", "host_id"],
+     [("ix_group_hosts_group_id", ["group_id"])]),
+    ("uq_dynamic_group_host_cache_group_host", "dynamic_group_host_cache", ["group_id", "host_id"],
+     [("ix_dynamic_group_host_cache_group_id", ["group_id"])]),
+)
+
+DEDUPLICATE_SQL = """
+DELETE FROM {table} AS t
+USING {table} AS d
+WHERE t.group_id = d.group_id AND t.host_id = d.host_id AND t.id > d.id
+"""
+
+
+def upgrade() -> None:
+    for _, table, _, _ in UNIQUE_PAIRS:
+        op.execute(DEDUPLICATE_SQL.format(table=table))
+    # Сначала строим новые индексы, затем снимаем старые — запросы не остаются без индекса.
+    _helpers.create_indexes_concurrently((name, table, cols) for name, table, cols, _ in COMPOSITES)
+    _helpers.create_indexes_concurrently([(name, table, cols) for name, table, cols, _ in UNIQUE_PAIRS], unique=True)
+    _helpers.drop_indexes_concurrently(old for *_, replaced in COMPOSITES + UNIQUE_PAIRS for old, _ in replaced)
+
+
+def downgrade() -> None:
+    _helpers.create_indexes_concurrently(
+        (old, table, cols) for _, table, _, replaced in COMPOSITES + UNIQUE_PAIRS for old, cols in replaced
+    )
+    _helpers.drop_indexes_concurrently(name for name, *_ in COMPOSITES + UNIQUE_PAIRS)
@@ -0,0 +1,32 @@
+"""0036: trigram indexes for host search.
+
+`list_hosts` ищет подстроку: `name ILIKE '%q%' OR hostname ILIKE '%q%'`. Btree такой
+предикат не обслуживает, поэтому на больших инвентарях это seq scan. GIN-индексы
+pg_trgm обслуживают ILIKE с ведущим `%` (для строк от трёх символов), а OR двух
+колонок планировщик собирает через BitmapOr.
+
+pg_trgm — trusted extension (PG13+), владельцу БД суперпользователь не нужен.
+"""
+
+from alembic import op
+
+import _helpers
+
+revision = "0036_hosts_search_trgm"
+down_revision = "0035_list_order_indexes"
+branch_labels = None
+depends_on = None
+
+INDEXES = (("ix_hosts_name_trgm", "name"), ("ix_hosts_hostname_trgm", "hostname"))
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON hosts USING gin ({column} gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    # Расширение не удаляем: им могут пользоваться объекты вне этой ревизии.
+    _helpers.drop_indexes_concurrently(name for name, _ in INDEXES)
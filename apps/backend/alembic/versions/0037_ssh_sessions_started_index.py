@@ -0,0 +1,30 @@
+"""0037: ssh_sessions — индекс (host_id, project_id, started_at DESC).
+
+Список сессий хоста — `WHERE host_id = ? AND project_id = ? ORDER BY started_at DESC LIMIT n`.
+С индексом только по (host_id, project_id) Postgres читает все сессии хоста и сортирует;
+с started_at в индексе — упорядоченный index scan, останавливающийся на n строках.
+Старый индекс — префикс нового, его снимаем.
+
+host_health_checks такой индекс уже имеет (0033: host_id, project_id, checked_at;
+DESC обслуживается обратным сканом). INCLUDE не добавляем: история читает snapshot (jsonb),
+копировать его в индекс ради index-only scan дороже, чем обращение к heap за n строками.
+"""
+
+import _helpers
+
+revision = "0037_ssh_sessions_started_index"
+down_revision = "0036_hosts_search_trgm"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    _helpers.create_index_concurrently(
+        "ix_ssh_sessions_host_project_started", "ssh_sessions", ["host_id", "project_id", "started_at DESC"]
+    )
+    _helpers.drop_index_concurrently("ix_ssh_sessions_host_project")
+
+
+def downgrade() -> None:
+    _helpers.create_index_concurrently("ix_ssh_sessions_host_project", "ssh_sessions", ["host_id", "project_id"])
+    _helpers.drop_index_concurrently("ix_ssh_sessions_host_project_started")
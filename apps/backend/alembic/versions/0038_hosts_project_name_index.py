@@ -0,0 +1,23 @@
+"""0038: hosts — индекс (project_id, name).
+
+Список хостов фильтруется по project_id и по умолчанию сортируется по name:
+составной индекс даёт упорядоченный scan вместо сортировки всех хостов проекта.
+Одноколоночный ix_hosts_project_id — его префикс, снимаем.
+"""
+
+import _helpers
+
+revision = "0038_hosts_project_name_index"
+down_revision = "0037_ssh_sessions_started_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    _helpers.create_index_concurrently("ix_hosts_project_name", "hosts", ["project_id", "name"])
+    _helpers.drop_index_concurrently("ix_hosts_project_id")
+
+
+def downgrade() -> None:
+    _helpers.create_index_concurrently("ix_hosts_project_id", "hosts", ["project_id"])
+    _helpers.drop_index_concurrently("ix_hosts_project_name")
@@ -0,0 +1,86 @@
+"""0039: ensure_host_health_check_partitions — перенос строк месяца из DEFAULT.
+
+Если месяц не создали заранее, его вставки копятся в `host_health_checks_default`, и
+`CREATE TABLE ... PARTITION OF ... FOR VALUES FROM/TO` для этого месяца падает: в DEFAULT
+уже лежат строки диапазона новой партиции. Функция теперь в той же транзакции выносит их
+во временную таблицу, создаёт партицию и возвращает строки через родителя — они попадают
+уже в новую партицию.
+"""
+
+from alembic import op
+
+revision = "0039_health_check_partitions_default_rows"
+down_revision = "0038_hosts_project_name_index"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, project_id, host_id, status, snapshot, checked_at"
+
+CREATE_PARTITION_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION ensure_host_health_check_partitions(since timestamp, until timestamp)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  month_start timestamp := date_trunc('month', since);
+  partition_name text;
+  has_default boolean := to_regclass('public.host_health_checks_default') IS NOT NULL;
+BEGIN
+  WHILE month_start <= until LOOP
+    partition_name := 'host_health_checks_' || to_char(month_start, '"y"YYYY"m"MM');
+    IF to_regclass('public.' || partition_name) IS NULL THEN
+      IF has_default THEN
+        CREATE TEMP TABLE host_health_checks_moved ON COMMIT DROP AS
+          SELECT {COLUMNS} FROM host_health_checks_default WHERE false;
+        WITH moved AS (
+          DELETE FROM host_health_checks_default
+          WHERE checked_at >= month_start AND checked_at < month_start + interval '1 month'
+          RETURNING {COLUMNS}
+        )
+        INSERT INTO host_health_checks_moved SELECT {COLUMNS} FROM moved;
+      END IF;
+      EXECUTE format(
+        'CREATE TABLE %I PARTITION OF host_health_checks FOR VALUES FROM (%L) TO (%L)',
+        partition_name,
+        month_start,
+        month_start + interval '1 month'
+      );
+      IF has_default THEN
+        INSERT INTO host_health_checks ({COLUMNS}) SELECT {COLUMNS} FROM host_health_checks_moved;
+        DROP TABLE host_health_checks_moved;
+      END IF;
+    END IF;
+    month_start := month_start + interval '1 month';
+  END LOOP;
+END
+$$
+"""
+
+PREVIOUS_PARTITION_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION ensure_host_health_check_partitions(since timestamp, until timestamp)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  month_start timestamp := date_trunc('month', since);
+BEGIN
+  WHILE month_start <= until LOOP
+    EXECUTE format(
+      'CREATE TABLE IF NOT EXISTS %I PARTITION OF host_health_checks FOR VALUES FROM (%L) TO (%L)',
+      'host_health_checks_' || to_char(month_start, '"y"YYYY"m"MM'),
+      month_start,
+      month_start + interval '1 month'
+    );
+    month_start := month_start + interval '1 month';
+  END LOOP;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute(CREATE_PARTITION_FUNCTION_SQL)
+
+
+def downgrade() -> None:
+    op.execute(PREVIOUS_PARTITION_FUNCTION_SQL)
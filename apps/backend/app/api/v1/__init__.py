@@ -1,22 +1,34 @@
-from fastapi import APIRouter
+import importlib
 
-from app.api.v1.endpoints import admin_settings, audit, approvals, auth, groups, hosts, notifications, playbook_instances, playbook_templates, playbook_triggers, playbooks, plugins, projects, runs, secrets, users
+from fastapi import APIRouter, FastAPI
 
-api_router = APIRouter()
+# (модуль в app.api.v1.endpoints, prefix, tag)
+ROUTERS: tuple[tuple[str, str, str], ...] = (
+    ("auth", "/auth", "Auth"),
+    ("projects", "/projects", "Projects"),
+    ("hosts", "/hosts", "Hosts"),
+    ("groups", "/groups", "Groups"),
+    ("playbooks", "/playbooks", "Playbooks"),
+    ("playbook_templates", "/playbook-templates", "PlaybookTemplates"),
+    ("playbook_triggers", "/playbook-triggers", "PlaybookTriggers"),
+    ("playbook_instances", "/playbook-instances", "PlaybookInstances"),
+    ("notifications", "/notifications", "Notifications"),
+    ("runs", "/runs", "Runs"),
+    ("approvals", "/approvals", "Approvals"),
+    ("secrets", "/secrets", "Secrets"),
+    ("audit", "/audit", "Audit"),
+    ("users", "/users", "Users"),
+    ("admin_settings", "/admin/settings", "AdminSettings"),
+    ("plugins", "/plugins", "Plugins"),
+)
 
-api_router.include_router(auth.router, prefix="/auth", tags=["Auth"])
-api_router.include_router(projects.router, prefix="/projects", tags=["Projects"])
-api_router.include_router(hosts.router, prefix="/hosts", tags=["Hosts"])
-api_router.include_router(groups.router, prefix="/groups", tags=["Groups"])
-api_router.include_router(playbooks.router, prefix="/playbooks", tags=["Playbooks"])
-api_router.include_router(playbook_templates.router, prefix="/playbook-templates", tags=["PlaybookTemplates"])
-api_router.include_router(playbook_triggers.router, prefix="/playbook-triggers", tags=["PlaybookTriggers"])
-api_router.include_router(playbook_instances.router, prefix="/playbook-instances", tags=["PlaybookInstances"])
-api_router.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
-api_router.include_router(runs.router, prefix="/runs", tags=["Runs"])
-api_router.include_router(approvals.router, prefix="/approvals", tags=["Approvals"])
-api_router.include_router(secrets.router, prefix="/secrets", tags=["Secrets"])
-api_router.include_router(audit.router, prefix="/audit", tags=["Audit"])
-api_router.include_router(users.router, prefix="/users", tags=["Users"])
-api_router.include_router(admin_settings.router, prefix="/admin/settings", tags=["AdminSettings"])
-api_router.include_router(plugins.router, prefix="/plugins", tags=["Plugins"])
+
+def include_api_routers(target: FastAPI | APIRouter, prefix: str = "") -> None:
+    """Подключить роутеры v1 напрямую к приложению (или роутеру).
+
+    Без промежуточного `api_router`: каждый маршрут копируется один раз, а модули эндпоинтов
+    импортируются только здесь — импорт `app.api.v1.deps` их не тянет.
+    """
+    for module_name, router_prefix, tag in ROUTERS:
+        module = importlib.import_module(f"app.api.v1.endpoints.{module_name}")
+        target.include_router(module.router, prefix=f"{prefix}{router_prefix}", tags=[tag])
@@ -0,0 +1,47 @@
+"""Условные ответы (ETag / Last-Modified) для списков, которые UI опрашивает по таймеру.
+
+Версия списка — дешёвый агрегат по тем же условиям, что и сама выборка (count и max
+времени изменения, покрываются индексами). Если клиент прислал совпадающий
+`If-None-Match`, отвечаем 304 без основной выборки и сериализации.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+
+@dataclass(frozen=True)
+class ListVersion:
+    etag: str
+    last_modified: Optional[datetime]
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            # В БД naive UTC.
+            headers["Last-Modified"] = format_datetime(self.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+        return headers
+
+
+def list_version(*parts: Any, last_modified: Optional[datetime] = None) -> ListVersion:
+    """Слабый ETag по составу выборки: проект/скоуп, count, max(...) и т.п."""
+    digest = hashlib.sha1(repr((*parts, last_modified)).encode(), usedforsecurity=False).hexdigest()
+    return ListVersion(etag=f'W/"{digest}"', last_modified=last_modified)
+
+
+def not_modified(request: Request, version: ListVersion) -> Optional[Response]:
+    """304, если у клиента актуальная версия списка; иначе None."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    if version.etag in tags or "*" in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=version.headers)
+    return None
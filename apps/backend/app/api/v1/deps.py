@@ -1,3 +1,6 @@
+import time
+from dataclasses import dataclass
+from functools import cached_property
 from typing import AsyncGenerator, Dict, Optional
 
 from fastapi import Depends, Header, HTTPException, status
@@ -5,63 +8,141 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.rbac import Permission, has_any_permission, has_permission
+from app.core.rbac import PERM_BIT, Permission, permissions_mask, role_mask
 from app.core.security import verify_token
 from app.db import async_session
-from app.db.models import User
+from app.core.ttl_cache import TTLCache
+from app.db.models import User, UserRole
 from app.services.projects import ProjectAccessDenied, ProjectNotFound, resolve_current_project_id
 
 security_scheme = HTTPBearer()
 
+PRINCIPAL_CACHE_TTL_SECONDS = 30.0
+PRINCIPAL_CACHE_MAXSIZE = 10_000
+TOKEN_CACHE_TTL_SECONDS = 30.0
+TOKEN_CACHE_MAXSIZE = 10_000
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Снимок пользователя для авторизации запроса.
+
+    Не привязан к AsyncSession, поэтому его можно безопасно держать в кэше между запросами.
+    Поля повторяют то, что читают RBAC и фильтры доступа у `User`.
+    """
+
+    id: int
+    email: str
+    role: UserRole
+    role_value: str
+    is_admin: bool
+    allowed_environments: Optional[list]
+    allowed_group_ids: Optional[list]
+    allowed_project_ids: Optional[list]
+
+    @cached_property
+    def permissions_mask(self) -> int:
+        return role_mask(self.role_value)
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            # role — Enum-колонка (не relationship), строку считаем один раз при снимке.
+            role_value=user.role_value,
+            is_admin=user.role == UserRole.admin,
+            allowed_environments=list(user.allowed_environments) if user.allowed_environments is not None else None,
+            allowed_group_ids=list(user.allowed_group_ids) if user.allowed_group_ids is not None else None,
+            allowed_project_ids=list(user.allowed_project_ids) if user.allowed_project_ids is not None else None,
+        )
+
+
+_principal_cache: TTLCache[str, Principal] = TTLCache(maxsize=PRINCIPAL_CACHE_MAXSIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def invalidate_principal(*emails: Optional[str]) -> None:
+    """Сбросить закэшированного principal (после изменения/удаления пользователя)."""
+    for email in emails:
+        if email:
+            _principal_cache.pop(email)
+
+
+# Проверенные payload'ы по исходному токену: UI опрашивает API каждые несколько секунд
+# одним и тем же токеном, повторно декодировать и проверять подпись незачем.
+_token_cache: TTLCache[str, Dict[str, object]] = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
 
 
-def get_current_user(
+def get_token_payload(
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
-) -> Dict[str, str]:
-    try:
-        payload = verify_token(credentials.credentials)
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Неверные учетные данные",
-        ) from exc
+) -> Dict[str, object]:
+    """Проверенный payload JWT.
+
+    Отдельная зависимость: FastAPI кэширует её результат в пределах запроса, поэтому
+    токен проверяется один раз, сколько бы зависимостей (user/principal/permission) его ни читали.
+    Между запросами результат живёт в `_token_cache`; срок действия (`exp`) сверяем и для записи из кэша.
+    """
+    token = credentials.credentials
+    payload = _token_cache.get(token)
+    if payload is None:
+        try:
+            payload = verify_token(token)
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Неверные учетные данные",
+            ) from exc
+        _token_cache.set(token, payload)
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)) and expires_at <= time.time():
+        _token_cache.pop(token)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Неверные учетные данные")
+    return payload
+
+
+def get_current_user(payload: Dict[str, object] = Depends(get_token_payload)) -> Dict[str, str]:
     return {"sub": payload.get("sub"), "role": payload.get("role", "user")}
 
 
 async def get_current_principal(
     db: AsyncSession = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
-) -> User:
+    payload: Dict[str, object] = Depends(get_token_payload),
+) -> Principal:
     """Текущий пользователь из БД.
 
     Используется для RBAC2.0 (роли/пермишены) и ограничений доступа по окружениям/группам.
+    Результат кэшируется по subject на `PRINCIPAL_CACHE_TTL_SECONDS`; изменения пользователя
+    через API сбрасывают запись сразу (`invalidate_principal`).
     """
-    try:
-        payload = verify_token(credentials.credentials)
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Неверные учетные данные",
-        ) from exc
-
     subject = payload.get("sub")
     if not subject:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен без subject")
 
-    res = await db.execute(select(User).where(User.email == str(subject)))
-    principal = res.scalar_one_or_none()
-    if not principal:
+    subject = str(subject)
+    principal = _principal_cache.get(subject)
+    if principal is not None:
+        return principal
+
+    res = await db.execute(select(User).where(User.email == subject))
+    user = res.scalar_one_or_none()
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Пользователь не найден")
+    principal = Principal.from_user(user)
+    _principal_cache.set(subject, principal)
     return principal
 
 
 def require_permission(permission: Permission):
-    def _dependency(principal: User = Depends(get_current_principal)) -> User:
-        if not has_permission(getattr(principal.role, "value", str(principal.role)), permission):
+    needed = PERM_BIT[permission]
+
+    def _dependency(principal: Principal = Depends(get_current_principal)) -> Principal:
+        if not principal.permissions_mask & needed:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостаточно прав")
         return principal
 
@@ -69,9 +150,10 @@ def require_permission(permission: Permission):
 
 
 def require_any_permission(*permissions: Permission):
-    def _dependency(principal: User = Depends(get_current_principal)) -> User:
-        role_value = getattr(principal.role, "value", str(principal.role))
-        if not has_any_permission(role_value, permissions):
+    needed = permissions_mask(permissions)
+
+    def _dependency(principal: Principal = Depends(get_current_principal)) -> Principal:
+        if not principal.permissions_mask & needed:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостаточно прав")
         return principal
 
@@ -80,7 +162,7 @@ def require_any_permission(*permissions: Permission):
 
 async def get_current_project_id(
     db: AsyncSession = Depends(get_db),
-    principal: User = Depends(get_current_principal),
+    principal: Principal = Depends(get_current_principal),
     x_project_id: Optional[int] = Header(default=None, alias="X-Project-Id"),
 ) -> int:
     """Текущий проект (tenant).
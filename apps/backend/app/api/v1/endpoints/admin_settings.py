@@ -1,32 +1,52 @@
+import time
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.deps import get_db, require_permission
 from app.api.v1.schemas.admin_settings import GlobalSettings, GlobalSettingsPublic, GlobalSettingsUpdate
 from app.core.rbac import Permission
 from app.db.models import GlobalSetting
-from app.services.audit import audit_log
+from app.services.audit import enqueue_audit
 
 router = APIRouter()
 
 
 def _require_admin(principal) -> None:
-    if getattr(principal.role, "value", str(principal.role)) != "admin":
+    if not principal.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Требуются права admin")
 
 
 DEFAULT_SETTINGS = GlobalSettings()
+SETTINGS_KEYS = tuple(GlobalSettings.model_fields)
+
+# Настройки меняются редко, а `/public` дёргается фронтом на каждой загрузке страницы:
+# держим их в памяти процесса. PUT сразу обновляет кэш; TTL ограничивает устаревание
+# для других процессов/воркеров, которые об изменении не знают.
+SETTINGS_CACHE_TTL_SECONDS = 5.0
+_settings_cache: GlobalSettings | None = None
+_settings_cache_expires_at = 0.0
+
+
+def _store_settings_cache(current: GlobalSettings) -> None:
+    global _settings_cache, _settings_cache_expires_at  # noqa: PLW0603
+    _settings_cache = current
+    _settings_cache_expires_at = time.monotonic() + SETTINGS_CACHE_TTL_SECONDS
 
 
 async def _load_settings(db: AsyncSession) -> GlobalSettings:
-    rows = await db.execute(select(GlobalSetting))
-    items = {row.key: row.value for row in rows.scalars().all()}
+    if _settings_cache is not None and time.monotonic() < _settings_cache_expires_at:
+        return _settings_cache.model_copy()
+    rows = await db.execute(
+        select(GlobalSetting.key, GlobalSetting.value).where(GlobalSetting.key.in_(SETTINGS_KEYS))
+    )
     data = DEFAULT_SETTINGS.model_dump()
-    for key, value in items.items():
-        if key in data:
-            data[key] = value
-    return GlobalSettings(**data)
+    data.update({key: value for key, value in rows.all()})
+    current = GlobalSettings(**data)
+    _store_settings_cache(current)
+    return current.model_copy()
 
 
 @router.get("/", response_model=GlobalSettings)
@@ -58,20 +78,23 @@ async def update_settings(
 ):
     _require_admin(principal)
     updates = payload.model_dump(exclude_unset=True)
-    for key, value in updates.items():
-        row = await db.get(GlobalSetting, key)
-        if not row:
-            row = GlobalSetting(key=key, value=value)
-            db.add(row)
-        else:
-            row.value = value
-    await db.commit()
-    current = await _load_settings(db)
-    await audit_log(
-        db,
+    previous = await _load_settings(db)
+    if updates:
+        # Один UPSERT на все ключи вместо get + INSERT/UPDATE по каждому.
+        stmt = pg_insert(GlobalSetting).values([{"key": key, "value": value} for key, value in updates.items()])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[GlobalSetting.key],
+            set_={"value": stmt.excluded.value, "updated_at": func.now()},
+        )
+        await db.execute(stmt)
+        await db.commit()
+    # Ответ (и кэш) собираем из прежнего состояния + применённых изменений, без повторного SELECT.
+    current = previous.model_copy(update=updates)
+    _store_settings_cache(current)
+    enqueue_audit(
         project_id=None,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="global_settings.update",
         entity_type="global_settings",
         entity_id=None,
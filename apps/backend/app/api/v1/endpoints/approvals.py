@@ -1,16 +1,19 @@
 import logging
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1.conditional import list_version, not_modified
 from app.api.v1.deps import get_current_project_id, get_db, require_permission
+from app.api.v1.projection import json_list_response, schema_columns
 from app.api.v1.schemas.approvals import ApprovalDecisionRequest, ApprovalRead
 from app.core.rbac import Permission
 from app.db.models import ApprovalRequest, ApprovalStatus, JobRun
-from app.services.audit import audit_log
-from app.services.notifications import notify_event
+from app.services.audit import enqueue_audit
+from app.services.notifications import dispatch_event
 from app.services.queue import enqueue_run
 
 router = APIRouter()
@@ -18,26 +21,46 @@ logger = logging.getLogger(__name__)
 
 
 def _require_admin(principal) -> None:
-    if getattr(principal.role, "value", str(principal.role)) != "admin":
+    if not principal.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Требуются права admin")
 
 
-@router.get("/", response_model=list[ApprovalRead])
+APPROVAL_READ_COLUMNS = schema_columns(ApprovalRequest, ApprovalRead)
+
+
+@router.get("/", response_model=None, responses={200: {"model": list[ApprovalRead]}})
 async def list_approvals(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     principal=Depends(require_permission(Permission.ansible_read)),
     project_id: int = Depends(get_current_project_id),
-):
+) -> Response:
+    # Решение по approval меняет decided_at, новая заявка — count и created_at.
+    total, last_change = (
+        await db.execute(
+            select(func.count(), func.max(func.coalesce(ApprovalRequest.decided_at, ApprovalRequest.created_at))).where(
+                ApprovalRequest.project_id == project_id
+            )
+        )
+    ).one()
+    version = list_version("approvals", project_id, total, last_modified=last_change)
+    if cached := not_modified(request, version):
+        return cached
+
     query = await db.execute(
-        select(ApprovalRequest).where(ApprovalRequest.project_id == project_id).order_by(ApprovalRequest.created_at.desc())
+        select(*APPROVAL_READ_COLUMNS)
+        .where(ApprovalRequest.project_id == project_id)
+        .order_by(ApprovalRequest.created_at.desc())
     )
-    return query.scalars().all()
+    items = [ApprovalRead.model_construct(**{**row, "status": row["status"].value}) for row in query.mappings()]
+    return json_list_response(ApprovalRead, items, headers=version.headers)
 
 
 @router.post("/{approval_id}/decision", status_code=status.HTTP_204_NO_CONTENT)
 async def decide_approval(
     approval_id: int,
     payload: ApprovalDecisionRequest,
+    background: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     principal=Depends(require_permission(Permission.ansible_read)),
     project_id: int = Depends(get_current_project_id),
@@ -54,48 +77,59 @@ async def decide_approval(
     approval.decided_by = principal.id
     approval.decided_at = datetime.utcnow()
 
-    run = await db.get(JobRun, approval.run_id)
-    if not run or run.project_id != project_id:
+    # Решение дописываем в target_snapshot на стороне БД (jsonb ||): документ не читаем
+    # и не перезаписываем целиком, мутация dict'а без MutableDict не потеряется.
+    patch = {"approval_status": approval.status.value, "approval_id": approval.id}
+    query = await db.execute(
+        update(JobRun)
+        .where(JobRun.id == approval.run_id)
+        .where(JobRun.project_id == project_id)
+        .values(
+            target_snapshot=func.coalesce(JobRun.target_snapshot, literal({}, JSONB)).op("||", return_type=JSONB)(
+                literal(patch, JSONB)
+            )
+        )
+        .returning(JobRun.id)
+        .execution_options(synchronize_session=False)
+    )
+    run_id = query.scalar_one_or_none()
+    if run_id is None:
         raise HTTPException(status_code=404, detail="Run не найден")
-    run.target_snapshot = run.target_snapshot or {}
-    run.target_snapshot["approval_status"] = approval.status.value
-    run.target_snapshot["approval_id"] = approval.id
     await db.commit()
 
+    # Аудит и уведомления — после ответа: аудит через очередь, уведомления фоновой задачей.
     if approval.status == ApprovalStatus.approved:
-        await enqueue_run(run.id, project_id=project_id)
-        await audit_log(
-            db,
+        await enqueue_run(run_id, project_id=project_id)
+        enqueue_audit(
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="approval.approve",
             entity_type="approval",
             entity_id=approval.id,
-            meta={"run_id": run.id},
+            meta={"run_id": run_id},
         )
-        await notify_event(
-            db,
+        background.add_task(
+            dispatch_event,
             project_id=project_id,
             event="approval.approved",
-            payload={"approval_id": approval.id, "run_id": run.id},
+            payload={"approval_id": approval.id, "run_id": run_id},
         )
     else:
-        await audit_log(
-            db,
+        enqueue_audit(
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="approval.reject",
             entity_type="approval",
             entity_id=approval.id,
-            meta={"run_id": run.id, "reason": payload.reason},
+            meta={"run_id": run_id, "reason": payload.reason},
         )
-        await notify_event(
-            db,
+        background.add_task(
+            dispatch_event,
             project_id=project_id,
             event="approval.rejected",
-            payload={"approval_id": approval.id, "run_id": run.id, "reason": payload.reason},
+            payload={"approval_id": approval.id, "run_id": run_id, "reason": payload.reason},
         )
 
     return None
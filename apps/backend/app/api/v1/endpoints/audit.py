@@ -1,12 +1,16 @@
 import logging
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import desc, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, Select, cast, desc, func, literal_column, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1.conditional import list_version, not_modified
 from app.api.v1.deps import get_current_project_id, get_current_user, get_db
+from app.api.v1.projection import schema_columns
 from app.api.v1.schemas.audit import AuditEventRead
+from app.db import async_session
 from app.db.models import AuditEvent
 
 logger = logging.getLogger(__name__)
@@ -18,8 +22,33 @@ def _require_admin(user: dict) -> None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Требуются права admin")
 
 
-@router.get("/", response_model=list[AuditEventRead])
+# success хранится как 1/0 (int), а meta может быть NULL: к типам схемы приводим в SQL.
+AUDIT_READ_COLUMNS = tuple(
+    {
+        "success": cast(AuditEvent.success, Boolean).label("success"),
+        "meta": func.coalesce(AuditEvent.meta, literal_column("'{}'::jsonb")).label("meta"),
+    }.get(column.key, column)
+    for column in schema_columns(AuditEvent, AuditEventRead)
+)
+
+
+async def _stream_audit(q: Select) -> AsyncIterator[bytes]:
+    """JSON-массив событий по мере чтения серверного курсора — без буфера на всю страницу.
+
+    Сессия своя: тело ответа отдаётся уже после выхода из зависимостей запроса.
+    """
+    async with async_session() as db:
+        result = await db.stream(q)
+        separator = b"["
+        async for row in result.mappings():
+            yield separator + AuditEventRead.model_construct(**row).model_dump_json().encode()
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
+
+
+@router.get("/", response_model=None, responses={200: {"model": list[AuditEventRead]}})
 async def list_audit(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
     project_id: int = Depends(get_current_project_id),
@@ -28,20 +57,31 @@ async def list_audit(
     entity_type: Optional[str] = None,
     actor: Optional[str] = None,
     source_ip: Optional[str] = None,
-):
+) -> Response:
     _require_admin(user)
-    q = select(AuditEvent).where(AuditEvent.project_id == project_id).order_by(desc(AuditEvent.created_at)).limit(limit)
+    conditions = [AuditEvent.project_id == project_id]
     if action:
-        q = q.where(AuditEvent.action == action)
+        conditions.append(AuditEvent.action == action)
     if entity_type:
-        q = q.where(AuditEvent.entity_type == entity_type)
+        conditions.append(AuditEvent.entity_type == entity_type)
     if actor:
-        q = q.where(AuditEvent.actor == actor)
+        conditions.append(AuditEvent.actor == actor)
     if source_ip:
-        q = q.where(AuditEvent.source_ip == source_ip)
-    query = await db.execute(q)
-    items = query.scalars().all()
-    # success хранится как 1/0 (int); приводим к bool для схемы
-    for it in items:
-        it.success = bool(it.success)
-    return items
+        conditions.append(AuditEvent.source_ip == source_ip)
+
+    # Версия — count и max(id), а не только max(created_at): created_at — начало транзакции,
+    # и событие, закоммиченное пачкой или другим процессом позже, может оказаться «старше»
+    # текущего максимума. Фильтры тоже часть версии: разные выборки — разные ETag.
+    total, last_id, last_created = (
+        await db.execute(
+            select(func.count(), func.max(AuditEvent.id), func.max(AuditEvent.created_at)).where(*conditions)
+        )
+    ).one()
+    version = list_version(
+        "audit", project_id, limit, action, entity_type, actor, source_ip, total, last_id, last_modified=last_created
+    )
+    if cached := not_modified(request, version):
+        return cached
+
+    q = select(*AUDIT_READ_COLUMNS).where(*conditions).order_by(desc(AuditEvent.created_at)).limit(limit)
+    return StreamingResponse(_stream_audit(q), media_type="application/json", headers=version.headers)
@@ -1,25 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.schemas.auth import LoginRequest, TokenResponse
 from app.api.v1.deps import get_current_user, get_db
-from app.core.hash import verify_password
+from app.core.client_ip import client_ip
+from app.core.config import settings
+from app.core.hash import verify_dummy_password, verify_password
+from app.core.rate_limit import TokenBucketLimiter
 from app.core.security import create_access_token
 from app.db.models import User
 
 router = APIRouter()
 
+# Для логина нужны только хэш и роль; statement собран один раз на модуль.
+LOGIN_ACCOUNT_BY_EMAIL = select(User.email, User.password_hash, User.role).where(User.email == bindparam("email")).limit(1)
+
+login_limiter = TokenBucketLimiter(capacity=settings.login_attempts_per_minute, period=60)
+
 
 @router.post("/login", response_model=TokenResponse)
-async def login(form_data: LoginRequest, db: AsyncSession = Depends(get_db)):
+async def login(form_data: LoginRequest, request: Request, db: AsyncSession = Depends(get_db)):
     email = form_data.email.strip().lower()
-    result = await db.execute(select(User).where(User.email == email).limit(1))
-    account = result.scalar_one_or_none()
-    if not account or not verify_password(form_data.password, account.password_hash):
+    # Лимит до проверки пароля: перебор не должен занимать CPU хэшированием.
+    # IP — адрес соединения (или запись доверенного прокси), не произвольный X-Forwarded-For;
+    # без адреса общий на всех bucket не заводим.
+    source_ip = client_ip(request)
+    ip_allowed = login_limiter.hit(("ip", source_ip)) if source_ip else True
+    if not login_limiter.hit(("email", email)) or not ip_allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Слишком много попыток входа, повторите позже",
+            headers={"Retry-After": "60"},
+        )
+
+    result = await db.execute(LOGIN_ACCOUNT_BY_EMAIL, {"email": email})
+    account = result.one_or_none()
+    if not account:
+        verify_dummy_password(form_data.password)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Неверные учетные данные")
+    if not verify_password(form_data.password, account.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Неверные учетные данные")
 
-    token = create_access_token(subject=account.email, extra={"role": str(account.role.value)})
+    token = create_access_token(subject=account.email, extra={"role": account.role.value})
     return TokenResponse(access_token=token)
 
 
@@ -1,32 +1,81 @@
 import logging
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import delete, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import and_, delete, func, insert, literal, literal_column, select, true, union_all, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1.conditional import list_version, not_modified
 from app.api.v1.deps import get_current_project_id, get_db, require_permission
+from app.api.v1.projection import construct_all, dump_json_list, json_list_response, schema_columns
 from app.api.v1.schemas.groups import GroupCreate, GroupHostsUpdate, GroupRead, GroupUpdate
 from app.api.v1.schemas.hosts import HostRead
 from app.core.rbac import Permission
 from app.db.models import DynamicGroupHostCache, GroupHost, GroupType, Host, HostGroup
-from app.services.access import apply_group_scope, apply_host_scope
-from app.services.audit import audit_log
+from app.services.access import apply_group_scope, apply_host_scope, host_access_clause
+from app.services.audit import enqueue_audit
+from app.services import group_hosts_cache
 from app.services.group_rules import build_host_filter
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-@router.get("/", response_model=list[GroupRead])
+GROUP_READ_COLUMNS = schema_columns(HostGroup, GroupRead)
+HOST_READ_COLUMNS = schema_columns(Host, HostRead)
+
+
+def _group_type_error(group_type: GroupType, data: dict) -> str | None:
+    """Почему изменение `data` неприменимо к группе такого типа (None — применимо)."""
+    if group_type == GroupType.static and data.get("rule") is not None:
+        return "Для static группы правило не используется"
+    if group_type == GroupType.dynamic and data.get("host_ids") is not None:
+        return "Для dynamic группы состав задаётся правилом"
+    return None
+
+
+async def _raise_group_change_error(db: AsyncSession, group_id: int, principal, *, project_id: int, data: dict):
+    """UPDATE/DELETE ... RETURNING не вернул строку: различаем «нет группы» и неподходящий тип.
+
+    Отдельный SELECT только на этом (ошибочном) пути; успешный путь — один запрос.
+    """
+    group_type = await db.scalar(
+        apply_group_scope(
+            select(HostGroup.type).where(HostGroup.id == group_id).where(HostGroup.project_id == project_id), principal
+        )
+    )
+    error = _group_type_error(group_type, data) if group_type is not None else None
+    if error is None:
+        raise HTTPException(status_code=404, detail="Группа не найдена")
+    raise HTTPException(status_code=400, detail=error)
+
+
+@router.get("/", response_model=None, responses={200: {"model": list[GroupRead]}})
 async def list_groups(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     principal=Depends(require_permission(Permission.hosts_read)),
     project_id: int = Depends(get_current_project_id),
-):
+) -> Response:
+    total, last_change = (
+        await db.execute(
+            apply_group_scope(
+                select(func.count(), func.max(func.coalesce(HostGroup.updated_at, HostGroup.created_at))).where(
+                    HostGroup.project_id == project_id
+                ),
+                principal,
+            )
+        )
+    ).one()
+    version = list_version("groups", project_id, principal.id, total, last_modified=last_change)
+    if cached := not_modified(request, version):
+        return cached
+
     query = await db.execute(
-        apply_group_scope(select(HostGroup).where(HostGroup.project_id == project_id).order_by(HostGroup.name), principal)
+        apply_group_scope(
+            select(*GROUP_READ_COLUMNS).where(HostGroup.project_id == project_id).order_by(HostGroup.name), principal
+        )
     )
-    return query.scalars().all()
+    return json_list_response(GroupRead, construct_all(GroupRead, query.mappings()), headers=version.headers)
 
 
 @router.post("/", response_model=GroupRead, status_code=status.HTTP_201_CREATED)
@@ -42,21 +91,24 @@ async def create_group(
     if payload.type == GroupType.dynamic and payload.host_ids:
         raise HTTPException(status_code=400, detail="Для dynamic группы состав задаётся правилом")
 
-    group = HostGroup(
-        name=payload.name,
-        type=payload.type,
-        description=payload.description,
-        rule=payload.rule,
-        project_id=project_id,
+    # RETURNING отдаёт строку вместе с серверными значениями (id, created_at) — refresh не нужен.
+    query = await db.execute(
+        insert(HostGroup)
+        .values(
+            name=payload.name,
+            type=payload.type,
+            description=payload.description,
+            rule=payload.rule,
+            project_id=project_id,
+        )
+        .returning(HostGroup)
     )
-    db.add(group)
+    group = query.scalar_one()
     await db.commit()
-    await db.refresh(group)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="group.create",
         entity_type="group",
         entity_id=group.id,
@@ -68,7 +120,6 @@ async def create_group(
 
     if payload.type == GroupType.dynamic:
         await recompute_dynamic_group(group.id, db, principal, project_id=project_id)
-        await db.refresh(group)
 
     return group
 
@@ -99,32 +150,31 @@ async def update_group(
     principal=Depends(require_permission(Permission.hosts_write)),
     project_id: int = Depends(get_current_project_id),
 ):
+    data = payload.model_dump(exclude_unset=True)
+    values = {field: data[field] for field in ("name", "description", "rule") if field in data}
+    # Проверка существования, доступа и типа группы — условия того же UPDATE.
+    allowed_types = [group_type for group_type in GroupType if _group_type_error(group_type, data) is None]
     query = await db.execute(
         apply_group_scope(
-            select(HostGroup).where(HostGroup.id == group_id).where(HostGroup.project_id == project_id), principal
+            update(HostGroup)
+            .where(HostGroup.id == group_id)
+            .where(HostGroup.project_id == project_id)
+            .where(HostGroup.type.in_(allowed_types))
+            .values(**values, updated_at=datetime.utcnow())
+            .returning(HostGroup),
+            principal,
         )
     )
     group = query.scalar_one_or_none()
     if not group:
-        raise HTTPException(status_code=404, detail="Группа не найдена")
-
-    data = payload.model_dump(exclude_unset=True)
-    if group.type == GroupType.static and "rule" in data and data["rule"] is not None:
-        raise HTTPException(status_code=400, detail="Для static группы правило не используется")
-    if group.type == GroupType.dynamic and "host_ids" in data and data["host_ids"] is not None:
-        raise HTTPException(status_code=400, detail="Для dynamic группы состав задаётся правилом")
-
-    for field in ("name", "description", "rule"):
-        if field in data:
-            setattr(group, field, data[field])
+        await _raise_group_change_error(db, group_id, principal, project_id=project_id, data=data)
 
     await db.commit()
-    await db.refresh(group)
-    await audit_log(
-        db,
+    await group_hosts_cache.invalidate_group_hosts([group_id])
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="group.update",
         entity_type="group",
         entity_id=group.id,
@@ -133,11 +183,9 @@ async def update_group(
 
     if group.type == GroupType.static and data.get("host_ids") is not None:
         await _set_static_group_hosts(db, group.id, data["host_ids"], project_id=project_id)
-        await db.refresh(group)
 
     if group.type == GroupType.dynamic and "rule" in data:
         await recompute_dynamic_group(group.id, db, principal, project_id=project_id)
-        await db.refresh(group)
 
     return group
 
@@ -149,21 +197,25 @@ async def delete_group(
     principal=Depends(require_permission(Permission.hosts_write)),
     project_id: int = Depends(get_current_project_id),
 ):
+    # group_hosts и dynamic_group_host_cache удаляются каскадом по FK.
     query = await db.execute(
         apply_group_scope(
-            select(HostGroup).where(HostGroup.id == group_id).where(HostGroup.project_id == project_id), principal
+            delete(HostGroup)
+            .where(HostGroup.id == group_id)
+            .where(HostGroup.project_id == project_id)
+            .returning(HostGroup.name, HostGroup.type),
+            principal,
         )
     )
-    group = query.scalar_one_or_none()
+    group = query.one_or_none()
     if not group:
         raise HTTPException(status_code=404, detail="Группа не найдена")
-    await db.delete(group)
     await db.commit()
-    await audit_log(
-        db,
+    await group_hosts_cache.invalidate_group_hosts([group_id])
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="group.delete",
         entity_type="group",
         entity_id=group_id,
@@ -172,55 +224,66 @@ async def delete_group(
     return None
 
 
-@router.get("/{group_id}/hosts", response_model=list[HostRead])
+@router.get("/{group_id}/hosts", response_model=None, responses={200: {"model": list[HostRead]}})
 async def list_group_hosts(
     group_id: int,
     db: AsyncSession = Depends(get_db),
     principal=Depends(require_permission(Permission.hosts_read)),
     project_id: int = Depends(get_current_project_id),
-):
+) -> Response:
+    # В Redis попадают только dynamic-группы; поле учитывает проект и скоуп пользователя,
+    # поэтому попадание в кэш уже означает, что доступ к группе проверен.
+    cache_field = group_hosts_cache.scope_field(principal, project_id)
+    cached_body = await group_hosts_cache.get_group_hosts(group_id, cache_field)
+    if cached_body is not None:
+        return Response(cached_body, media_type="application/json")
+
+    # Группа и её хосты — одним запросом: строка группы всегда есть (если группа доступна),
+    # хосты присоединяются LEFT JOIN'ом из состава static-группы или кэша dynamic-группы.
+    members = union_all(
+        select(GroupHost.host_id).where(GroupHost.group_id == group_id),
+        select(DynamicGroupHostCache.host_id).where(DynamicGroupHostCache.group_id == group_id),
+    ).subquery()
     query = await db.execute(
         apply_group_scope(
-            select(HostGroup).where(HostGroup.id == group_id).where(HostGroup.project_id == project_id), principal
+            select(HostGroup.type.label("group_type"), HostGroup.rule.label("group_rule"), *HOST_READ_COLUMNS)
+            .select_from(HostGroup)
+            .outerjoin(members, true())
+            .outerjoin(
+                Host,
+                and_(Host.id == members.c.host_id, Host.project_id == project_id, host_access_clause(principal)),
+            )
+            .where(HostGroup.id == group_id)
+            .where(HostGroup.project_id == project_id)
+            .order_by(Host.name),
+            principal,
         )
     )
-    group = query.scalar_one_or_none()
-    if not group:
+    rows = query.mappings().all()
+    if not rows:
         raise HTTPException(status_code=404, detail="Группа не найдена")
-
-    if group.type == GroupType.static:
+    group_type, group_rule = rows[0]["group_type"], rows[0]["group_rule"]
+    hosts = [
+        HostRead.model_construct(**{column.key: row[column.key] for column in HOST_READ_COLUMNS})
+        for row in rows
+        if row["id"] is not None
+    ]
+    if group_type == GroupType.static:
+        return json_list_response(HostRead, hosts)
+
+    # dynamic: кэш состава пуст — считаем "на лету"
+    if not hosts:
+        expr = build_host_filter(group_rule)
         query = await db.execute(
             apply_host_scope(
-                select(Host)
-            .join(GroupHost, GroupHost.host_id == Host.id)
-            .where(GroupHost.group_id == group_id)
-            .where(Host.project_id == project_id)
-            .order_by(Host.name),
+                select(*HOST_READ_COLUMNS).where(Host.project_id == project_id).where(expr).order_by(Host.name),
                 principal,
             )
         )
-        return query.scalars().all()
-
-    # dynamic: используем кэш; если кэша нет — считаем "на лету"
-    cached = await db.execute(
-        apply_host_scope(
-            select(Host)
-            .join(DynamicGroupHostCache, DynamicGroupHostCache.host_id == Host.id)
-            .where(DynamicGroupHostCache.group_id == group_id)
-            .where(Host.project_id == project_id)
-            .order_by(Host.name),
-            principal,
-        )
-    )
-    hosts = cached.scalars().all()
-    if hosts:
-        return hosts
-
-    expr = build_host_filter(group.rule)
-    query = await db.execute(
-        apply_host_scope(select(Host).where(Host.project_id == project_id).where(expr).order_by(Host.name), principal)
-    )
-    return query.scalars().all()
+        hosts = construct_all(HostRead, query.mappings())
+    body = dump_json_list(HostRead, hosts)
+    await group_hosts_cache.set_group_hosts(group_id, cache_field, body.decode())
+    return Response(body, media_type="application/json")
 
 
 @router.put("/{group_id}/hosts", status_code=status.HTTP_204_NO_CONTENT)
@@ -231,22 +294,32 @@ async def set_group_hosts(
     principal=Depends(require_permission(Permission.hosts_write)),
     project_id: int = Depends(get_current_project_id),
 ):
+    # Существование, доступ и тип проверяет сам UPDATE (заодно отмечает изменение группы).
     query = await db.execute(
         apply_group_scope(
-            select(HostGroup).where(HostGroup.id == group_id).where(HostGroup.project_id == project_id), principal
+            update(HostGroup)
+            .where(HostGroup.id == group_id)
+            .where(HostGroup.project_id == project_id)
+            .where(HostGroup.type == GroupType.static)
+            .values(updated_at=datetime.utcnow())
+            .returning(HostGroup.id),
+            principal,
         )
     )
-    group = query.scalar_one_or_none()
-    if not group:
-        raise HTTPException(status_code=404, detail="Группа не найдена")
-    if group.type != GroupType.static:
+    if query.scalar_one_or_none() is None:
+        exists = await db.scalar(
+            apply_group_scope(
+                select(HostGroup.id).where(HostGroup.id == group_id).where(HostGroup.project_id == project_id), principal
+            )
+        )
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Группа не найдена")
         raise HTTPException(status_code=400, detail="Состав можно задавать только для static групп")
     await _set_static_group_hosts(db, group_id, payload.host_ids, project_id=project_id)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="group.set_hosts",
         entity_type="group",
         entity_id=group_id,
@@ -256,15 +329,59 @@ async def set_group_hosts(
 
 
 async def _set_static_group_hosts(db: AsyncSession, group_id: int, host_ids: list[int], *, project_id: int) -> None:
-    # чистим и записываем заново (простая и надёжная стратегия для MVP)
-    await db.execute(delete(GroupHost).where(GroupHost.group_id == group_id))
+    # Дифф с текущим составом считаем на стороне БД: удаляем лишние связи и одним
+    # INSERT ... SELECT добавляем недостающие хосты проекта, id в Python не гоняем.
+    unlink = delete(GroupHost).where(GroupHost.group_id == group_id)
+    if host_ids:
+        unlink = unlink.where(GroupHost.host_id.not_in(host_ids))
+    await db.execute(unlink)
     if host_ids:
-        query = await db.execute(select(Host.id).where(Host.project_id == project_id).where(Host.id.in_(host_ids)))
-        existing_ids = {row[0] for row in query.all()}
-        for host_id in host_ids:
-            if host_id in existing_ids:
-                db.add(GroupHost(group_id=group_id, host_id=host_id))
+        already_linked = (
+            select(GroupHost.host_id).where(GroupHost.group_id == group_id).where(GroupHost.host_id == Host.id).exists()
+        )
+        await db.execute(
+            insert(GroupHost).from_select(
+                ["group_id", "host_id"],
+                select(literal(group_id), Host.id)
+                .where(Host.project_id == project_id)
+                .where(Host.id.in_(host_ids))
+                .where(~already_linked),
+            )
+        )
     await db.commit()
+    await group_hosts_cache.invalidate_group_hosts([group_id])
+
+
+async def _compute_dynamic_groups(db: AsyncSession, rules: dict[int, dict | None], *, project_id: int) -> dict[int, list[int]]:
+    """Состав динамических групп по их правилам — одним запросом (UNION ALL по группам)."""
+    members: dict[int, list[int]] = {group_id: [] for group_id in rules}
+    if not rules:
+        return members
+    parts = [
+        select(literal_column(str(int(group_id))).label("group_id"), Host.id.label("host_id"))
+        .where(Host.project_id == project_id)
+        .where(build_host_filter(rule))
+        for group_id, rule in rules.items()
+    ]
+    query = await db.execute(union_all(*parts) if len(parts) > 1 else parts[0])
+    for group_id, host_id in query.all():
+        members[group_id].append(host_id)
+    return members
+
+
+async def _replace_dynamic_cache(db: AsyncSession, members: dict[int, list[int]]) -> None:
+    """Перезаписать кэш составов групп (без коммита): один DELETE и один многострочный INSERT."""
+    if not members:
+        return
+    await db.execute(delete(DynamicGroupHostCache).where(DynamicGroupHostCache.group_id.in_(list(members))))
+    now = datetime.utcnow()
+    rows = [
+        {"group_id": group_id, "host_id": host_id, "computed_at": now}
+        for group_id, host_ids in members.items()
+        for host_id in host_ids
+    ]
+    if rows:
+        await db.execute(insert(DynamicGroupHostCache), rows)
 
 
 @router.post("/recompute-dynamic", status_code=status.HTTP_204_NO_CONTENT)
@@ -275,23 +392,26 @@ async def recompute_all_dynamic_groups(
 ):
     query = await db.execute(
         apply_group_scope(
-            select(HostGroup.id)
+            select(HostGroup.id, HostGroup.rule)
             .where(HostGroup.project_id == project_id)
             .where(HostGroup.type == GroupType.dynamic),
             principal,
         )
     )
-    ids = [row[0] for row in query.all()]
-    for group_id in ids:
-        await recompute_dynamic_group(group_id, db, principal, project_id=project_id)
-    await audit_log(
-        db,
+    rules = {group_id: rule for group_id, rule in query.all()}
+    members = await _compute_dynamic_groups(db, rules, project_id=project_id)
+    await _replace_dynamic_cache(db, members)
+    await db.commit()
+    await group_hosts_cache.invalidate_group_hosts(members)
+
+    logger.info("Dynamic groups recomputed project_id=%s groups=%s", project_id, len(members))
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="group.recompute_all_dynamic",
         entity_type="group",
-        meta={"count": len(ids)},
+        meta={"count": len(members), "hosts": {str(group_id): len(host_ids) for group_id, host_ids in members.items()}},
     )
     return None
 
@@ -315,22 +435,17 @@ async def recompute_dynamic_group(
     if group.type != GroupType.dynamic:
         raise HTTPException(status_code=400, detail="Пересчёт доступен только для dynamic групп")
 
-    expr = build_host_filter(group.rule)
-    query = await db.execute(select(Host.id).where(Host.project_id == project_id).where(expr))
-    host_ids = [row[0] for row in query.all()]
-
-    await db.execute(delete(DynamicGroupHostCache).where(DynamicGroupHostCache.group_id == group_id))
-    now = datetime.utcnow()
-    for host_id in host_ids:
-        db.add(DynamicGroupHostCache(group_id=group_id, host_id=host_id, computed_at=now))
+    members = await _compute_dynamic_groups(db, {group_id: group.rule}, project_id=project_id)
+    await _replace_dynamic_cache(db, members)
     await db.commit()
+    await group_hosts_cache.invalidate_group_hosts([group_id])
+    host_ids = members[group_id]
 
     logger.info("Dynamic group recomputed group_id=%s hosts=%s", group_id, len(host_ids))
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="group.recompute_dynamic",
         entity_type="group",
         entity_id=group_id,
@@ -1,27 +1,37 @@
 import asyncio
 import logging
-import subprocess
 from datetime import datetime
 import json
-from typing import Optional
+import time
+from typing import Literal, Optional
 
 import asyncssh
-from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
-from sqlalchemy import asc, desc, or_, select
+import icmplib
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
+from sqlalchemy import asc, bindparam, delete, desc, func, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from app.api.v1.deps import get_current_project_id, get_db, require_permission
-from app.api.v1.schemas.hosts import HostActionRequest, HostCreate, HostFactsUpdate, HostHealthHistoryRead, HostRead, HostStatusCheckResponse, HostUpdate, SshSessionRead
+from app.api.v1.projection import construct_all, json_list_response, schema_columns
+from app.api.v1.schemas.hosts import HostActionRequest, HostBulkStatusCheckRequest, HostCreate, HostFactsUpdate, HostHealthHistoryRead, HostRead, HostStatusCheckResponse, HostUpdate, SshSessionRead, SshSessionTranscriptRead
 from app.api.v1.schemas.runs import RunRead
+from app.core.clock import utcnow
+from app.core.config import settings
 from app.core.rbac import Permission, has_permission
-from app.db.models import ApprovalRequest, ApprovalStatus, Host, HostCheckMethod, HostHealthCheck, HostStatus, JobRun, JobStatus, Playbook, Secret, SecretType, SshSession, User
-from app.services.access import apply_host_scope, host_access_clause
-from app.services.audit import audit_log
-from app.services.encryption import decrypt_value
+from app.db import async_session
+from app.db.models import ApprovalRequest, ApprovalStatus, Host, HostCheckMethod, HostHealthCheck, HostStatus, JobRun, JobStatus, Secret, SshSession, SshSessionTranscript, User
+from app.services.access import AccessPrincipal, apply_host_scope, host_access_clause
+from app.services import ssh_pool
+from app.services.audit import enqueue_audit
+from app.services.credentials import ssh_credentials
+from app.services.health_snapshot import HEALTH_SNAPSHOT_COMMAND, parse_health_snapshot
+from app.services.ssh_sessions import enqueue_session_close
 from app.services.projects import ProjectAccessDenied, ProjectNotFound, resolve_current_project_id
-from app.services.triggers import dispatch_host_triggers
+from app.services.triggers import dispatch_host_triggers_task
 from app.services.queue import enqueue_run
-from app.services.notifications import notify_event
+from app.services.notifications import dispatch_event, notify_event
+from app.services.system_playbooks import get_system_playbook_id
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -71,25 +81,24 @@ REMOTE_ACTIONS_PLAYBOOK_CONTENT = """---
 """
 
 
+# Unprivileged ICMP (SOCK_DGRAM) зависит от net.ipv4.ping_group_range контейнера.
+# Если сокет не разрешён, узнаём это на первой пробе и дальше сразу идём в TCP.
+_icmp_available = True
+
+
 async def _probe_ping(host: Host) -> HostStatus:
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            "ping",
-            "-c",
-            "1",
-            "-W",
-            "1",
-            host.hostname,
-            stdout=asyncio.subprocess.DEVNULL,
-            stderr=asyncio.subprocess.DEVNULL,
-        )
-        rc = await proc.wait()
-        return HostStatus.online if rc == 0 else HostStatus.offline
-    except FileNotFoundError:
-        logger.warning("ping не установлен в контейнере backend; fallback на tcp")
-        return await _probe_tcp(host)
-    except Exception:
-        return HostStatus.offline
+    """ICMP echo из event loop, без fork/exec `ping` на каждую пробу."""
+    global _icmp_available  # noqa: PLW0603
+    if _icmp_available:
+        try:
+            result = await icmplib.async_ping(host.hostname, count=1, timeout=1, privileged=False)
+            return HostStatus.online if result.is_alive else HostStatus.offline
+        except icmplib.SocketPermissionError:
+            _icmp_available = False
+            logger.warning("ICMP-сокеты недоступны в контейнере backend; ping-проверки идут через tcp")
+        except Exception:
+            return HostStatus.offline
+    return await _probe_tcp(host)
 
 
 async def _probe_tcp(host: Host) -> HostStatus:
@@ -104,108 +113,125 @@ async def _probe_tcp(host: Host) -> HostStatus:
         return HostStatus.offline
 
 
-def _get_ssh_credentials(host: Host) -> tuple[Optional[str], Optional[str], Optional[str]]:
-    password: Optional[str] = None
-    private_key: Optional[str] = None
-    passphrase: Optional[str] = None
-
-    if not host.credential:
-        return password, private_key, passphrase
-
-    decrypted = decrypt_value(host.credential.encrypted_value)
-    if host.credential.type == SecretType.password:
-        password = decrypted
-    elif host.credential.type == SecretType.private_key:
-        private_key = decrypted
-        if host.credential.encrypted_passphrase:
-            passphrase = decrypt_value(host.credential.encrypted_passphrase)
-    return password, private_key, passphrase
-
-
-def _parse_health_snapshot(output: str) -> dict[str, float | int]:
-    lines = [line.strip() for line in output.splitlines() if line.strip()]
-    snapshot: dict[str, float | int] = {}
-    if not lines:
-        return snapshot
-    try:
-        uptime_parts = lines[0].split()
-        snapshot["uptime_seconds"] = float(uptime_parts[0])
-    except Exception:
-        pass
-    if len(lines) > 1:
-        try:
-            load_parts = lines[1].split()
-            snapshot["load1"] = float(load_parts[0])
-            snapshot["load5"] = float(load_parts[1])
-            snapshot["load15"] = float(load_parts[2])
-        except Exception:
-            pass
-    mem_total = None
-    mem_available = None
-    for line in lines:
-        if line.startswith("MemTotal:"):
-            mem_total = int(line.split()[1])
-        if line.startswith("MemAvailable:"):
-            mem_available = int(line.split()[1])
-    if mem_total is not None:
-        snapshot["mem_total_kb"] = mem_total
-        if mem_available is not None:
-            snapshot["mem_used_kb"] = mem_total - mem_available
-    df_line = None
-    for line in lines:
-        parts = line.split()
-        if len(parts) >= 6 and parts[-1] == "/":
-            df_line = line
-            break
-    if df_line:
-        parts = df_line.split()
-        snapshot["disk_total_kb"] = int(parts[1])
-        snapshot["disk_used_kb"] = int(parts[2])
-        percent = parts[4].rstrip("%")
-        if percent.isdigit():
-            snapshot["disk_used_percent"] = int(percent)
-    return snapshot
-
-
 async def _probe_ssh_health(host: Host) -> tuple[HostStatus, Optional[dict[str, float | int]]]:
     """Проверка SSH и сбор метрик (uptime/load/mem/disk)."""
     try:
-        password, private_key, passphrase = _get_ssh_credentials(host)
+        password, client_key = ssh_credentials(host.credential)
     except Exception:
         return HostStatus.offline, None
 
-    try:
-        conn = await asyncssh.connect(
+    def _connect():
+        return asyncssh.connect(
             host.hostname,
             port=host.port,
             username=host.username,
             password=password,
-            client_keys=[private_key] if private_key else None,
-            passphrase=passphrase,
+            client_keys=[client_key] if client_key else None,
             known_hosts=None,
             server_host_key_algs=["ssh-ed25519", "ssh-rsa"],
         )
-    except Exception:
-        return HostStatus.offline, None
 
+    # Версия credential в ключе: после ротации секрета старое соединение не переиспользуется.
+    credential = host.credential
+    pool_key = (
+        host.hostname,
+        host.port,
+        host.username,
+        host.credential_id,
+        credential.updated_at if credential else None,
+    )
     try:
-        result = await conn.run(
-            "cat /proc/uptime; cat /proc/loadavg; cat /proc/meminfo; df -kP /",
-            check=False,
-        )
-        conn.close()
-        await conn.wait_closed()
+        # Общий таймаут — в _probe_host; зависшая команда закрывает соединение пула.
+        exit_status, output = await ssh_pool.run_command(pool_key, _connect, HEALTH_SNAPSHOT_COMMAND)
     except Exception:
-        conn.close()
-        await conn.wait_closed()
         return HostStatus.offline, None
 
-    if result.exit_status != 0:
+    if exit_status != 0:
         return HostStatus.online, None
-    return HostStatus.online, _parse_health_snapshot(result.stdout or "")
+    return HostStatus.online, parse_health_snapshot(output)
+
+
+async def _probe_host(host: Host) -> tuple[HostStatus, Optional[dict[str, float | int]]]:
+    """Проба выбранным методом с общим таймаутом: зависший sshd/TCP не держит запрос."""
+    method = host.check_method or HostCheckMethod.tcp
+    try:
+        async with asyncio.timeout(settings.host_check_timeout_seconds):
+            if method == HostCheckMethod.ping:
+                return await _probe_ping(host), None
+            if method == HostCheckMethod.ssh:
+                return await _probe_ssh_health(host)
+            return await _probe_tcp(host), None
+    except TimeoutError:
+        return HostStatus.offline, None
+
+
+def _apply_check_result(
+    host: Host, status_result: HostStatus, snapshot: Optional[dict[str, float | int]], checked_at: datetime
+) -> dict:
+    """Записать результат пробы в хост; вернуть строку истории health-check'ов."""
+    if snapshot:
+        host.health_snapshot = snapshot
+        host.health_checked_at = checked_at
+    host.status = status_result
+    host.last_checked_at = checked_at
+    return {
+        "project_id": host.project_id,
+        "host_id": host.id,
+        "status": status_result.value,
+        "snapshot": snapshot,
+        "checked_at": checked_at,
+    }
+
+
+# Выборка хоста по id строится один раз; на запрос добавляется только условие скоупа.
+HOST_BY_ID = select(Host).where(Host.id == bindparam("host_id")).where(Host.project_id == bindparam("project_id"))
+HOST_WITH_CREDENTIAL_BY_ID = HOST_BY_ID.options(joinedload(Host.credential))
+
+
+async def _find_host(
+    db: AsyncSession, principal: AccessPrincipal, host_id: int, project_id: int, *, with_credential: bool = False
+) -> Optional[Host]:
+    """Хост проекта, доступный пользователю (None — нет или вне скоупа)."""
+    stmt = HOST_WITH_CREDENTIAL_BY_ID if with_credential else HOST_BY_ID
+    res = await db.execute(stmt.where(host_access_clause(principal)), {"host_id": host_id, "project_id": project_id})
+    return res.scalar_one_or_none()
+
+
+async def _get_host_or_404(
+    db: AsyncSession, principal: AccessPrincipal, host_id: int, project_id: int, *, with_credential: bool = False
+) -> Host:
+    host = await _find_host(db, principal, host_id, project_id, with_credential=with_credential)
+    if not host:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Хост не найден")
+    return host
+
+
+HEALTH_HISTORY_BATCH_SIZE = 1000
+
+
+async def _record_health_checks(db: AsyncSession, rows: list[dict]) -> None:
+    """Записать точки истории health-check'ов (append-only) без коммита.
+
+    Core `insert()` со списком параметров: SQLAlchemy собирает многострочный
+    INSERT ... VALUES (insertmanyvalues) без ORM-flush и RETURNING id на каждую строку.
+    """
+    for start in range(0, len(rows), HEALTH_HISTORY_BATCH_SIZE):
+        await db.execute(insert(HostHealthCheck), rows[start : start + HEALTH_HISTORY_BATCH_SIZE])
 
 
-@router.get("/", response_model=list[HostRead])
+HOST_READ_COLUMNS = schema_columns(Host, HostRead)
+HostSortField = Literal["id", "name", "hostname", "status", "environment", "os_type"]
+HOST_SORT_COLUMNS = {
+    "id": Host.id,
+    "name": Host.name,
+    "hostname": Host.hostname,
+    "status": Host.status,
+    "environment": Host.environment,
+    "os_type": Host.os_type,
+}
+
+
+@router.get("/", response_model=None, responses={200: {"model": list[HostRead]}})
 async def list_hosts(
     db: AsyncSession = Depends(get_db),
     principal=Depends(require_permission(Permission.hosts_read)),
@@ -216,16 +242,19 @@ async def list_hosts(
     os_type: Optional[str] = Query(default=None, description="Фильтр по os_type"),
     tag_key: Optional[str] = Query(default=None, description="Фильтр по tags.<key>"),
     tag_value: Optional[str] = Query(default=None, description="Значение для tag_key"),
-    sort_by: str = Query(default="name", description="Поле сортировки: name|hostname|status|environment|os_type|id"),
-    sort_dir: str = Query(default="asc", description="asc|desc"),
+    sort_by: HostSortField = Query(default="name", description="Поле сортировки"),
+    sort_dir: Literal["asc", "desc"] = Query(default="asc"),
     limit: int = Query(default=200, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
-):
-    stmt = select(Host)
+) -> Response:
+    # До 500 строк: колонки HostRead без ORM-объектов, JSON собирает pydantic-core.
+    # Общее число строк под фильтром — оконной функцией в том же запросе (X-Total-Count).
+    stmt = select(*HOST_READ_COLUMNS, func.count().over().label("total_count"))
     stmt = stmt.where(Host.project_id == project_id)
     stmt = apply_host_scope(stmt, principal)
 
-    if search:
+    if search and search.strip():
+        # Подстрока с ведущим % — обслуживается trigram-индексами ix_hosts_*_trgm.
         q = f"%{search.strip()}%"
         stmt = stmt.where(or_(Host.name.ilike(q), Host.hostname.ilike(q)))
     if status_filter:
@@ -238,26 +267,24 @@ async def list_hosts(
         # JSONB tags: {"env":"prod"} => tags->>'env' = 'prod'
         stmt = stmt.where(Host.tags[tag_key].astext == tag_value)
 
-    sort_map = {
-        "id": Host.id,
-        "name": Host.name,
-        "hostname": Host.hostname,
-        "status": Host.status,
-        "environment": Host.environment,
-        "os_type": Host.os_type,
-    }
-    sort_col = sort_map.get(sort_by, Host.name)
-    order_fn = desc if sort_dir.lower() == "desc" else asc
-    stmt = stmt.order_by(order_fn(sort_col)).limit(limit).offset(offset)
+    order_fn = desc if sort_dir == "desc" else asc
+    stmt = stmt.order_by(order_fn(HOST_SORT_COLUMNS[sort_by])).limit(limit).offset(offset)
 
     query = await db.execute(stmt)
-    hosts = query.scalars().all()
-    return hosts
+    rows = query.mappings().all()
+    headers = {}
+    if rows:
+        headers["X-Total-Count"] = str(rows[0]["total_count"])
+    elif offset == 0:
+        headers["X-Total-Count"] = "0"
+    # Лишний ключ total_count model_construct отбрасывает (extra не разрешены).
+    return json_list_response(HostRead, construct_all(HostRead, rows), headers=headers)
 
 
 @router.post("/", response_model=HostRead, status_code=status.HTTP_201_CREATED)
 async def create_host(
     payload: HostCreate,
+    background: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     principal=Depends(require_permission(Permission.hosts_write)),
     project_id: int = Depends(get_current_project_id),
@@ -271,17 +298,16 @@ async def create_host(
     db.add(new_host)
     await db.commit()
     await db.refresh(new_host)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="host.create",
         entity_type="host",
         entity_id=new_host.id,
         meta={"name": new_host.name, "hostname": new_host.hostname, "port": new_host.port},
     )
-    await dispatch_host_triggers(db, new_host, "host_created")
+    background.add_task(dispatch_host_triggers_task, new_host.id, "host_created")
     return new_host
 
 
@@ -292,12 +318,7 @@ async def get_host(
     principal=Depends(require_permission(Permission.hosts_read)),
     project_id: int = Depends(get_current_project_id),
 ):
-    res = await db.execute(
-        select(Host).where(Host.id == host_id).where(Host.project_id == project_id).where(host_access_clause(principal))
-    )
-    host = res.scalar_one_or_none()
-    if not host:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Хост не найден")
+    host = await _get_host_or_404(db, principal, host_id, project_id)
     return host
 
 
@@ -305,45 +326,42 @@ async def get_host(
 async def update_host(
     host_id: int,
     payload: HostUpdate,
+    background: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     principal=Depends(require_permission(Permission.hosts_write)),
     project_id: int = Depends(get_current_project_id),
 ):
-    res = await db.execute(
-        select(Host).where(Host.id == host_id).where(Host.project_id == project_id).where(host_access_clause(principal))
-    )
-    existing = res.scalar_one_or_none()
-    if not existing:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Хост не найден")
+    existing = await _get_host_or_404(db, principal, host_id, project_id)
 
-    updates = payload.model_dump(exclude_unset=True)
-    previous_tags = dict(existing.tags or {})
-    before = {}
-    after = {}
-    for key, value in updates.items():
-        before[key] = getattr(existing, key, None)
-        after[key] = value
-    if "credential_id" in updates and updates["credential_id"]:
-        secret = await db.get(Secret, int(updates["credential_id"]))
+    changed = payload.model_fields_set
+    if "credential_id" in changed and payload.credential_id:
+        secret = await db.get(Secret, int(payload.credential_id))
         if not secret or (secret.project_id is not None and secret.project_id != project_id):
             raise HTTPException(status_code=400, detail="Credential должен быть из текущего проекта или global")
+    # Сравниваем до присваивания: новое значение с текущим, без копий словаря тегов.
+    tags_changed = payload.tags is not None and payload.tags != (existing.tags or {})
 
-    for field, value in updates.items():
+    # Один проход по переданным полям: значения берём из модели, без промежуточного model_dump.
+    before = {}
+    after = {}
+    for field in changed:
+        value = getattr(payload, field)
+        before[field] = getattr(existing, field, None)
+        after[field] = value
         setattr(existing, field, value)
     await db.commit()
     await db.refresh(existing)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="host.update",
         entity_type="host",
         entity_id=existing.id,
         meta={"name": existing.name, "hostname": existing.hostname, "port": existing.port, "before": before, "after": after},
     )
-    if updates.get("tags") is not None and dict(existing.tags or {}) != previous_tags:
-        await dispatch_host_triggers(db, existing, "host_tags_changed")
+    if tags_changed:
+        background.add_task(dispatch_host_triggers_task, existing.id, "host_tags_changed")
     return existing
 
 
@@ -355,18 +373,20 @@ async def delete_host(
     project_id: int = Depends(get_current_project_id),
 ):
     res = await db.execute(
-        select(Host).where(Host.id == host_id).where(Host.project_id == project_id).where(host_access_clause(principal))
+        delete(Host)
+        .where(Host.id == host_id)
+        .where(Host.project_id == project_id)
+        .where(host_access_clause(principal))
+        .returning(Host.name, Host.hostname)
     )
-    existing = res.scalar_one_or_none()
+    existing = res.one_or_none()
     if not existing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Хост не найден")
-    await db.delete(existing)
     await db.commit()
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="host.delete",
         entity_type="host",
         entity_id=host_id,
@@ -378,55 +398,33 @@ async def delete_host(
 @router.post("/{host_id}/status-check", response_model=HostStatusCheckResponse)
 async def check_status(
     host_id: int,
+    background: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     principal=Depends(require_permission(Permission.hosts_check)),
     project_id: int = Depends(get_current_project_id),
 ):
-    res = await db.execute(
-        select(Host).where(Host.id == host_id).where(Host.project_id == project_id).where(host_access_clause(principal))
-    )
-    host = res.scalar_one_or_none()
-    if not host:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Хост не найден")
+    host = await _get_host_or_404(db, principal, host_id, project_id, with_credential=True)
 
     method = host.check_method or HostCheckMethod.tcp
-    snapshot: Optional[dict[str, float | int]] = None
-    if method == HostCheckMethod.ping:
-        status_result = await _probe_ping(host)
-    elif method == HostCheckMethod.ssh:
-        status_result, snapshot = await _probe_ssh_health(host)
-        if snapshot:
-            host.health_snapshot = snapshot
-            host.health_checked_at = datetime.utcnow()
-    else:
-        status_result = await _probe_tcp(host)
-    host.status = status_result
-    host.last_checked_at = datetime.utcnow()
+    await db.commit()  # не держим транзакцию открытой на время пробы (см. check_status_bulk)
+    status_result, snapshot = await _probe_host(host)
+    # Обновление хоста и точка истории — в одной транзакции.
+    await _record_health_checks(db, [_apply_check_result(host, status_result, snapshot, utcnow())])
     await db.commit()
     await db.refresh(host)
-    db.add(
-        HostHealthCheck(
-            project_id=project_id,
-            host_id=host.id,
-            status=str(status_result.value if hasattr(status_result, "value") else status_result),
-            snapshot=snapshot,
-            checked_at=host.last_checked_at,
-        )
-    )
-    await db.commit()
-    await audit_log(
-        db,
+    # Аудит — через очередь: второй COMMIT (и fsync WAL) на горячем эндпоинте не нужен.
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="host.status_check",
         entity_type="host",
         entity_id=host.id,
         meta={"status": host.status, "method": str(method.value)},
     )
     if status_result == HostStatus.offline:
-        await notify_event(
-            db,
+        background.add_task(
+            dispatch_event,
             project_id=project_id,
             event="host.offline",
             payload={"host_id": host.id, "hostname": host.hostname},
@@ -434,40 +432,82 @@ async def check_status(
     return host
 
 
-@router.post("/{host_id}/facts-refresh", response_model=RunRead, status_code=status.HTTP_201_CREATED)
-async def refresh_facts(
-    host_id: int,
+@router.post("/status-check-bulk", response_model=list[HostStatusCheckResponse])
+async def check_status_bulk(
+    payload: HostBulkStatusCheckRequest,
+    background: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
-    principal=Depends(require_permission(Permission.ansible_run)),
+    principal=Depends(require_permission(Permission.hosts_check)),
     project_id: int = Depends(get_current_project_id),
 ):
+    """Проверка нескольких хостов параллельно (не более `host_check_concurrency` проб одновременно).
+
+    Хосты вне проекта/скоупа пропускаются; результат — одной транзакцией.
+    """
     res = await db.execute(
         select(Host)
-        .where(Host.id == host_id)
+        .options(joinedload(Host.credential))
+        .where(Host.id.in_(set(payload.host_ids)))
         .where(Host.project_id == project_id)
         .where(host_access_clause(principal))
+        .order_by(Host.id)
     )
-    host = res.scalar_one_or_none()
-    if not host:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Хост не найден")
-
-    query = await db.execute(
-        select(Playbook).where(Playbook.project_id == project_id).where(Playbook.name == FACTS_PLAYBOOK_NAME)
+    hosts = res.scalars().all()
+    # Закрываем читающую транзакцию до проб: иначе соединение из пула висит idle in transaction
+    # всё время gather. Объекты остаются (expire_on_commit=False), запись — новой транзакцией.
+    await db.commit()
+    semaphore = asyncio.Semaphore(settings.host_check_concurrency)
+
+    async def _limited(host: Host) -> tuple[HostStatus, Optional[dict[str, float | int]]]:
+        async with semaphore:
+            return await _probe_host(host)
+
+    results = await asyncio.gather(*(_limited(host) for host in hosts), return_exceptions=True)
+    checked_at = utcnow()
+    history = []
+    offline_hosts = []
+    for host, result in zip(hosts, results):
+        status_result, snapshot = (HostStatus.offline, None) if isinstance(result, BaseException) else result
+        history.append(_apply_check_result(host, status_result, snapshot, checked_at))
+        if status_result == HostStatus.offline:
+            offline_hosts.append(host)
+    await _record_health_checks(db, history)
+    await db.commit()
+    enqueue_audit(
+        project_id=project_id,
+        actor=principal.email,
+        actor_role=principal.role_value,
+        action="host.status_check_bulk",
+        entity_type="host",
+        meta={"hosts": len(hosts), "offline": [host.id for host in offline_hosts]},
     )
-    playbook = query.scalar_one_or_none()
-    if not playbook:
-        playbook = Playbook(
+    for host in offline_hosts:
+        background.add_task(
+            dispatch_event,
             project_id=project_id,
-            name=FACTS_PLAYBOOK_NAME,
-            description="System playbook: facts collection",
-            stored_content=FACTS_PLAYBOOK_CONTENT,
-            variables={},
-            inventory_scope=[],
-            created_by=principal.id,
+            event="host.offline",
+            payload={"host_id": host.id, "hostname": host.hostname},
         )
-        db.add(playbook)
-        await db.commit()
-        await db.refresh(playbook)
+    return hosts
+
+
+@router.post("/{host_id}/facts-refresh", response_model=RunRead, status_code=status.HTTP_201_CREATED)
+async def refresh_facts(
+    host_id: int,
+    db: AsyncSession = Depends(get_db),
+    principal=Depends(require_permission(Permission.ansible_run)),
+    project_id: int = Depends(get_current_project_id),
+):
+    host = await _get_host_or_404(db, principal, host_id, project_id)
+
+    playbook_id = await get_system_playbook_id(
+        db,
+        project_id=project_id,
+        name=FACTS_PLAYBOOK_NAME,
+        content=FACTS_PLAYBOOK_CONTENT,
+        description="System playbook: facts collection",
+        created_by=principal.id,
+    )
 
     snapshot_hosts = [
         {
@@ -481,7 +521,7 @@ async def refresh_facts(
     ]
     run = JobRun(
         project_id=project_id,
-        playbook_id=playbook.id,
+        playbook_id=playbook_id,
         triggered_by=principal.email or "user",
         status=JobStatus.pending,
         target_snapshot={
@@ -500,11 +540,10 @@ async def refresh_facts(
     await db.commit()
     await db.refresh(run)
     await enqueue_run(run.id, project_id=project_id)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="host.facts_refresh",
         entity_type="host",
         entity_id=host.id,
@@ -521,33 +560,16 @@ async def run_remote_action(
     principal=Depends(require_permission(Permission.ansible_run)),
     project_id: int = Depends(get_current_project_id),
 ):
-    res = await db.execute(
-        select(Host)
-        .where(Host.id == host_id)
-        .where(Host.project_id == project_id)
-        .where(host_access_clause(principal))
-    )
-    host = res.scalar_one_or_none()
-    if not host:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Хост не найден")
+    host = await _get_host_or_404(db, principal, host_id, project_id)
 
-    query = await db.execute(
-        select(Playbook).where(Playbook.project_id == project_id).where(Playbook.name == REMOTE_ACTIONS_PLAYBOOK_NAME)
+    playbook_id = await get_system_playbook_id(
+        db,
+        project_id=project_id,
+        name=REMOTE_ACTIONS_PLAYBOOK_NAME,
+        content=REMOTE_ACTIONS_PLAYBOOK_CONTENT,
+        description="System playbook: remote actions",
+        created_by=principal.id,
     )
-    playbook = query.scalar_one_or_none()
-    if not playbook:
-        playbook = Playbook(
-            project_id=project_id,
-            name=REMOTE_ACTIONS_PLAYBOOK_NAME,
-            description="System playbook: remote actions",
-            stored_content=REMOTE_ACTIONS_PLAYBOOK_CONTENT,
-            variables={},
-            inventory_scope=[],
-            created_by=principal.id,
-        )
-        db.add(playbook)
-        await db.commit()
-        await db.refresh(playbook)
 
     if payload.action_type == "restart_service" and not payload.service_name:
         raise HTTPException(status_code=400, detail="service_name обязателен для restart_service")
@@ -578,7 +600,7 @@ async def run_remote_action(
     requires_approval = host.environment == "prod"
     run = JobRun(
         project_id=project_id,
-        playbook_id=playbook.id,
+        playbook_id=playbook_id,
         triggered_by=principal.email or "user",
         status=JobStatus.pending,
         target_snapshot={
@@ -610,11 +632,10 @@ async def run_remote_action(
         await db.refresh(approval)
         run.target_snapshot["approval_id"] = approval.id
         await db.commit()
-        await audit_log(
-            db,
+        enqueue_audit(
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="host.remote_action_requires_approval",
             entity_type="run",
             entity_id=run.id,
@@ -628,11 +649,10 @@ async def run_remote_action(
         )
     else:
         await enqueue_run(run.id, project_id=project_id)
-        await audit_log(
-            db,
+        enqueue_audit(
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="host.remote_action",
             entity_type="run",
             entity_id=run.id,
@@ -649,27 +669,25 @@ async def update_facts(
     principal=Depends(require_permission(Permission.ansible_run)),
     project_id: int = Depends(get_current_project_id),
 ):
+    # Один UPDATE ... RETURNING: проверка доступа, запись и признак «хост найден» за один запрос.
     res = await db.execute(
-        select(Host)
+        update(Host)
         .where(Host.id == host_id)
         .where(Host.project_id == project_id)
         .where(host_access_clause(principal))
+        .values(facts_snapshot=payload.facts, facts_checked_at=utcnow())
+        .returning(Host.id)
     )
-    host = res.scalar_one_or_none()
-    if not host:
+    if res.scalar_one_or_none() is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Хост не найден")
-    host.facts_snapshot = payload.facts
-    host.facts_checked_at = datetime.utcnow()
     await db.commit()
-    await db.refresh(host)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="host.facts_update",
         entity_type="host",
-        entity_id=host.id,
+        entity_id=host_id,
         meta={"facts_keys": len(payload.facts)},
     )
     return None
@@ -683,15 +701,7 @@ async def health_history(
     project_id: int = Depends(get_current_project_id),
     limit: int = Query(default=20, ge=1, le=200),
 ):
-    res = await db.execute(
-        select(Host)
-        .where(Host.id == host_id)
-        .where(Host.project_id == project_id)
-        .where(host_access_clause(principal))
-    )
-    host = res.scalar_one_or_none()
-    if not host:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Хост не найден")
+    await _get_host_or_404(db, principal, host_id, project_id)
     query = await db.execute(
         select(HostHealthCheck)
         .where(HostHealthCheck.host_id == host_id)
@@ -710,33 +720,100 @@ async def list_ssh_sessions(
     project_id: int = Depends(get_current_project_id),
     limit: int = Query(default=20, ge=1, le=200),
 ):
-    res = await db.execute(
-        select(Host)
-        .where(Host.id == host_id)
-        .where(Host.project_id == project_id)
-        .where(host_access_clause(principal))
-    )
-    host = res.scalar_one_or_none()
-    if not host:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Хост не найден")
+    await _get_host_or_404(db, principal, host_id, project_id)
+    # Сам транскрипт не читаем: только признак наличия (строка в side-таблице) и truncated.
     query = await db.execute(
-        select(SshSession)
+        select(SshSession, SshSessionTranscript.transcript_truncated)
+        .outerjoin(SshSessionTranscript, SshSessionTranscript.session_id == SshSession.id)
         .where(SshSession.host_id == host_id)
         .where(SshSession.project_id == project_id)
         .order_by(SshSession.started_at.desc())
         .limit(limit)
     )
-    return query.scalars().all()
+    sessions = []
+    for session, transcript_truncated in query.all():
+        item = SshSessionRead.model_validate(session)
+        item.has_transcript = transcript_truncated is not None
+        item.transcript_truncated = bool(transcript_truncated)
+        sessions.append(item)
+    return sessions
+
+
+@router.get("/{host_id}/ssh-sessions/{session_id}/transcript", response_model=SshSessionTranscriptRead)
+async def get_ssh_session_transcript(
+    host_id: int,
+    session_id: int,
+    db: AsyncSession = Depends(get_db),
+    principal=Depends(require_permission(Permission.hosts_read)),
+    project_id: int = Depends(get_current_project_id),
+):
+    res = await db.execute(
+        select(SshSessionTranscript)
+        .join(SshSession, SshSession.id == SshSessionTranscript.session_id)
+        .join(Host, Host.id == SshSession.host_id)
+        .where(SshSessionTranscript.session_id == session_id)
+        .where(SshSession.host_id == host_id)
+        .where(SshSession.project_id == project_id)
+        .where(Host.project_id == project_id)
+        .where(host_access_clause(principal))
+    )
+    transcript = res.scalar_one_or_none()
+    if not transcript:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Запись сессии не найдена")
+    return transcript
+
+
+TERMINAL_BATCH_MAX_BYTES = 64 * 1024
+# Читаем сразу до размера пачки: на объёмном выводе меньше await/фреймов на мегабайт.
+TERMINAL_READ_SIZE = TERMINAL_BATCH_MAX_BYTES
+TERMINAL_BATCH_WINDOW_SECONDS = 0.004
+TERMINAL_TRANSCRIPT_MAX_BYTES = 2 * 1024 * 1024
+# Управляющее сообщение клиента — `JSON.stringify({type: "resize", ...})`. Ввод (в т.ч. вставка
+# кода, начинающегося с `{`) через json.loads не гоняем: сперва дешёвая проверка префикса.
+TERMINAL_RESIZE_PREFIX = '{"type":"resize"'
+
+
+class _TerminalSessionDone(Exception):
+    """Клиент закрыл WS или shell завершился — сигнал TaskGroup терминала свернуть остальные задачи."""
+
+
+async def _coalesce_output(stream, chunks: list[bytes]) -> bool:
+    """Дочитать в `chunks` вывод, пришедший за короткое окно после первого куска.
+
+    Быстрый вывод (cat большого файла, сборка) иначе уходит десятками мелких WS-фреймов.
+    Пачка ограничена по размеру и по времени. Возвращает True, если поток закончился.
+    Отмена `read` по таймауту безопасна: непрочитанные данные остаются в буфере asyncssh.
+    """
+    size = sum(len(chunk) for chunk in chunks)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + TERMINAL_BATCH_WINDOW_SECONDS
+    while size < TERMINAL_BATCH_MAX_BYTES:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return False
+        try:
+            async with asyncio.timeout(remaining):
+                more = await stream.read(TERMINAL_BATCH_MAX_BYTES - size)
+        except TimeoutError:
+            return False
+        if not more:
+            return True
+        chunks.append(more)
+        size += len(more)
+    return False
 
 
 @router.websocket("/{host_id}/terminal")
 async def host_terminal(
     websocket: WebSocket,
     host_id: int,
-    db: AsyncSession = Depends(get_db),
 ):
     """WebSocket -> SSH (PTY) терминал.
 
+    Сессия БД здесь не берётся через Depends(get_db): она жила бы, пока открыт терминал
+    (часами), и держала соединение из пула. Вместо этого — короткие сессии на проверку
+    доступа/открытие записи ssh_sessions и на её закрытие.
+
     Протокол сообщений:
     - по умолчанию: текстовые данные (как есть) — отправляются в stdin SSH процесса
     - опционально: JSON-команды
@@ -774,33 +851,39 @@ async def host_terminal(
     else:
         requested_project_id = None
 
-    res = await db.execute(select(User).where(User.email == str(subject)))
-    principal = res.scalar_one_or_none()
-    if not principal:
-        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-        return
+    async with async_session() as db:
+        res = await db.execute(select(User).where(User.email == str(subject)))
+        principal = res.scalar_one_or_none()
+        if not principal:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
 
-    try:
-        current_project_id = await resolve_current_project_id(db, principal, requested_project_id)
-    except (ProjectNotFound, ProjectAccessDenied):
-        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-        return
+        try:
+            current_project_id = await resolve_current_project_id(db, principal, requested_project_id)
+        except (ProjectNotFound, ProjectAccessDenied):
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
 
-    res = await db.execute(
-        select(Host)
-        .where(Host.id == host_id)
-        .where(Host.project_id == current_project_id)
-        .where(host_access_clause(principal))
-    )
-    host = res.scalar_one_or_none()
-    if not host:
-        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-        return
+        host = await _find_host(db, principal, host_id, current_project_id, with_credential=True)
+        if not host:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
 
-    await websocket.accept()
-    logger.info("WS terminal start host_id=%s user=%s", host_id, payload.get("sub"))
-    await audit_log(
-        db,
+        await websocket.accept()
+        logger.info("WS terminal start host_id=%s user=%s", host_id, payload.get("sub"))
+        started_monotonic = time.monotonic()
+        session = SshSession(
+            project_id=current_project_id,
+            host_id=host_id,
+            actor=str(payload.get("sub")),
+            source_ip=websocket.client.host if websocket.client else None,
+            started_at=utcnow(),
+            success=True,
+        )
+        db.add(session)
+        await db.commit()
+        session_id = session.id
+    enqueue_audit(
         project_id=current_project_id,
         actor=payload.get("sub"),
         actor_role=payload.get("role"),
@@ -809,55 +892,41 @@ async def host_terminal(
         entity_id=host_id,
         meta={"hostname": host.hostname, "port": host.port, "username": host.username},
     )
-    session = SshSession(
-        project_id=current_project_id,
-        host_id=host_id,
-        actor=str(payload.get("sub")),
-        source_ip=websocket.client.host if websocket.client else None,
-        started_at=datetime.utcnow(),
-        success=True,
-    )
-    db.add(session)
-    await db.commit()
-    await db.refresh(session)
     recording_enabled = bool(getattr(host, "record_ssh", False))
-    transcript_parts: list[str] = []
-    transcript_len = 0
+    # Запись — сырой поток вывода PTY (как у script(1)): ввод в нём уже есть эхом терминала,
+    # а не отображаемый ввод (пароли) в запись не попадает. Байты дописываются как есть.
+    transcript_buf = bytearray()
     transcript_truncated = False
-    max_transcript = 200_000
 
-    def _append_transcript(prefix: str, text: str) -> None:
-        nonlocal transcript_len, transcript_truncated
+    def _append_transcript(data: bytes) -> None:
+        nonlocal transcript_truncated
         if not recording_enabled or transcript_truncated:
             return
-        chunk = f"{prefix} {text}"
-        available = max_transcript - transcript_len
-        if available <= 0:
+        available = TERMINAL_TRANSCRIPT_MAX_BYTES - len(transcript_buf)
+        if len(data) > available:
+            data = data[:available]
             transcript_truncated = True
-            return
-        if len(chunk) > available:
-            chunk = chunk[:available]
-            transcript_truncated = True
-        transcript_parts.append(chunk)
-        transcript_len += len(chunk)
-    password: Optional[str] = None
-    private_key: Optional[str] = None
-    passphrase: Optional[str] = None
+        transcript_buf.extend(data)
+
+    def _finish_session(error: Optional[str]) -> None:
+        """Поставить итог сессии (и запись терминала) в очередь: клиента не держим на записи в БД."""
+        # Длительность — по монотонным часам: коррекция системного времени (NTP) её не искажает.
+        enqueue_session_close(
+            session_id=session_id,
+            finished_at=utcnow(),
+            duration_seconds=int(time.monotonic() - started_monotonic),
+            error=error,
+            transcript=transcript_buf.decode("utf-8", errors="replace") if recording_enabled else None,
+            transcript_truncated=transcript_truncated,
+        )
 
-    if host.credential:
-        try:
-            decrypted = decrypt_value(host.credential.encrypted_value)
-            if host.credential.type == SecretType.password:
-                password = decrypted
-            elif host.credential.type == SecretType.private_key:
-                private_key = decrypted
-                if host.credential.encrypted_passphrase:
-                    passphrase = decrypt_value(host.credential.encrypted_passphrase)
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("Не удалось расшифровать credential для host_id=%s: %s", host_id, exc)
-            await websocket.send_text("Ошибка: не удалось расшифровать секрет для подключения.\n")
-            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
-            return
+    try:
+        password, client_key = ssh_credentials(host.credential)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Не удалось расшифровать/загрузить credential для host_id=%s: %s", host_id, exc)
+        await websocket.send_text("Ошибка: не удалось расшифровать секрет для подключения.\n")
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
 
     try:
         conn = await asyncssh.connect(
@@ -865,7 +934,7 @@ async def host_terminal(
             port=host.port,
             username=host.username,
             password=password,
-            client_keys=[asyncssh.import_private_key(private_key, passphrase=passphrase)] if private_key else None,
+            client_keys=[client_key] if client_key else None,
             known_hosts=None,
             connect_timeout=10,
             keepalive_interval=30,
@@ -874,17 +943,9 @@ async def host_terminal(
         )
     except Exception as exc:
         logger.exception("SSH connect error host_id=%s: %s", host_id, exc)
-        session.success = False
-        session.error = str(exc)
-        session.finished_at = datetime.utcnow()
-        session.duration_seconds = int((session.finished_at - session.started_at).total_seconds())
-        if recording_enabled:
-            session.transcript = "".join(transcript_parts)
-            session.transcript_truncated = transcript_truncated
-        await db.commit()
+        _finish_session(str(exc))
         await websocket.send_text(f"SSH ошибка: {exc}\n")
-        await audit_log(
-            db,
+        enqueue_audit(
             project_id=current_project_id,
             actor=payload.get("sub"),
             actor_role=payload.get("role"),
@@ -903,34 +964,27 @@ async def host_terminal(
         await process.stdin.drain()
     except Exception as exc:  # noqa: BLE001
         logger.exception("Не удалось открыть shell host_id=%s: %s", host_id, exc)
-        session.success = False
-        session.error = str(exc)
-        session.finished_at = datetime.utcnow()
-        session.duration_seconds = int((session.finished_at - session.started_at).total_seconds())
-        if recording_enabled:
-            session.transcript = "".join(transcript_parts)
-            session.transcript_truncated = transcript_truncated
-        await db.commit()
+        _finish_session(str(exc))
         await websocket.send_text(f"Не удалось открыть shell: {exc}\n")
         await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
         conn.close()
         return
 
     async def _forward_stream(stream):
+        # Вывод уходит бинарными фреймами как есть: без decode/UTF-8-проверки на сервере,
+        # символы на границе чтения собирает декодер xterm.js на клиенте.
         try:
-            while True:
-                data = await stream.read(1024)
+            eof = False
+            while not eof:
+                # encoding=None => bytes
+                data = await stream.read(TERMINAL_READ_SIZE)
                 if not data:
                     break
-                # encoding=None => bytes
-                if isinstance(data, (bytes, bytearray)):
-                    text = bytes(data).decode(errors="ignore")
-                    _append_transcript("OUT:", text)
-                    await websocket.send_text(text)
-                else:
-                    text = str(data)
-                    _append_transcript("OUT:", text)
-                    await websocket.send_text(text)
+                chunks = [data]
+                eof = await _coalesce_output(stream, chunks)
+                batch = b"".join(chunks)
+                _append_transcript(batch)
+                await websocket.send_bytes(batch)
         except Exception as exc:  # noqa: BLE001
             logger.debug("stdout/stderr stream closed: %s", exc)
 
@@ -940,23 +994,20 @@ async def host_terminal(
         nonlocal session_error
         try:
             async for message in websocket.iter_text():
-                if message and message[0] == "{":
+                if message.startswith(TERMINAL_RESIZE_PREFIX):
                     try:
                         obj = json.loads(message)
                     except Exception:
                         obj = None
-                    if isinstance(obj, dict):
-                        message_type = obj.get("type")
-                        if message_type == "resize":
-                            cols = int(obj.get("cols", 80))
-                            rows = int(obj.get("rows", 24))
-                            cols = max(20, min(cols, 500))
-                            rows = max(5, min(rows, 200))
-                            process.change_terminal_size(cols, rows)
-                            continue
+                    if isinstance(obj, dict) and obj.get("type") == "resize":
+                        cols = int(obj.get("cols", 80))
+                        rows = int(obj.get("rows", 24))
+                        cols = max(20, min(cols, 500))
+                        rows = max(5, min(rows, 200))
+                        process.change_terminal_size(cols, rows)
+                        continue
                 # обычные данные терминала
                 data = message.encode("utf-8", errors="ignore")
-                _append_transcript("IN:", message)
                 process.stdin.write(data)
                 await process.stdin.drain()
         except WebSocketDisconnect:
@@ -965,17 +1016,23 @@ async def host_terminal(
             logger.exception("Ошибка чтения WS host_id=%s: %s", host_id, exc)
             session_error = str(exc)
 
-    stdout_task = asyncio.create_task(_forward_stream(process.stdout))
-    stderr_task = asyncio.create_task(_forward_stream(process.stderr))
-    ws_task = asyncio.create_task(_forward_ws())
-    exit_task = asyncio.create_task(process.wait())
-
-    # Держим сессию пока клиент не закроет WS или пока не завершится shell.
-    done, pending = await asyncio.wait({ws_task, exit_task}, return_when=asyncio.FIRST_COMPLETED)
+    async def _end_session_after(awaitable) -> None:
+        try:
+            await awaitable
+        except Exception:  # noqa: BLE001
+            pass
+        raise _TerminalSessionDone
 
-    for task in (stdout_task, stderr_task, ws_task, exit_task):
-        if task not in done:
-            task.cancel()
+    # Держим сессию пока клиент не закроет WS или пока не завершится shell. TaskGroup отменяет
+    # остальные задачи и дожидается их отмены до выхода: kill/close ниже не гоняются с записью.
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(_forward_stream(process.stdout))
+            tg.create_task(_forward_stream(process.stderr))
+            tg.create_task(_end_session_after(_forward_ws()))
+            tg.create_task(_end_session_after(process.wait()))
+    except* _TerminalSessionDone:
+        pass
 
     try:
         process.stdin.write_eof()
@@ -987,17 +1044,8 @@ async def host_terminal(
     except Exception:
         pass
     conn.close()
-    session.finished_at = datetime.utcnow()
-    session.duration_seconds = int((session.finished_at - session.started_at).total_seconds())
-    if session_error:
-        session.success = False
-        session.error = session_error
-    if recording_enabled:
-        session.transcript = "".join(transcript_parts)
-        session.transcript_truncated = transcript_truncated
-    await db.commit()
-    await audit_log(
-        db,
+    _finish_session(session_error)
+    enqueue_audit(
         project_id=current_project_id,
         actor=payload.get("sub"),
         actor_role=payload.get("role"),
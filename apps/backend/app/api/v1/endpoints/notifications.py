@@ -12,7 +12,7 @@ from app.api.v1.schemas.notifications import (
     NotificationEndpointUpdate,
 )
 from app.db.models import NotificationEndpoint
-from app.services.audit import audit_log
+from app.services.audit import enqueue_audit
 from app.services.notifications import notify_event
 
 router = APIRouter()
@@ -51,8 +51,7 @@ async def create_endpoint(
     db.add(endpoint)
     await db.commit()
     await db.refresh(endpoint)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=user.get("sub"),
         actor_role=user.get("role"),
@@ -82,8 +81,7 @@ async def update_endpoint(
         setattr(endpoint, field, value)
     await db.commit()
     await db.refresh(endpoint)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=user.get("sub"),
         actor_role=user.get("role"),
@@ -108,8 +106,7 @@ async def delete_endpoint(
         raise HTTPException(status_code=404, detail="Endpoint не найден")
     await db.delete(endpoint)
     await db.commit()
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=user.get("sub"),
         actor_role=user.get("role"),
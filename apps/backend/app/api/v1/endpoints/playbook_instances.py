@@ -89,7 +89,7 @@ async def create_instance(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="playbook_instance.create",
         entity_type="playbook_instance",
         entity_id=instance.id,
@@ -135,7 +135,7 @@ async def update_instance(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="playbook_instance.update",
         entity_type="playbook_instance",
         entity_id=instance.id,
@@ -160,7 +160,7 @@ async def delete_instance(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="playbook_instance.delete",
         entity_type="playbook_instance",
         entity_id=instance.id,
@@ -275,7 +275,7 @@ async def run_instance(
             db,
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="run.create_from_instance_requires_approval",
             entity_type="run",
             entity_id=run.id,
@@ -293,7 +293,7 @@ async def run_instance(
             db,
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="run.create_from_instance",
             entity_type="run",
             entity_id=run.id,
@@ -12,7 +12,7 @@ from app.api.v1.schemas.playbook_templates import (
 )
 from app.core.rbac import Permission
 from app.db.models import PlaybookTemplate
-from app.services.audit import audit_log
+from app.services.audit import enqueue_audit
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -41,11 +41,10 @@ async def create_template(
     db.add(template)
     await db.commit()
     await db.refresh(template)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="playbook_template.create",
         entity_type="playbook_template",
         entity_id=template.id,
@@ -83,11 +82,10 @@ async def update_template(
         setattr(template, field, value)
     await db.commit()
     await db.refresh(template)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="playbook_template.update",
         entity_type="playbook_template",
         entity_id=template.id,
@@ -108,11 +106,10 @@ async def delete_template(
         raise HTTPException(status_code=404, detail="Шаблон не найден")
     await db.delete(template)
     await db.commit()
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="playbook_template.delete",
         entity_type="playbook_template",
         entity_id=template.id,
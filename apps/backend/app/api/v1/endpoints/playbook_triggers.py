@@ -8,14 +8,14 @@ from app.api.v1.deps import get_current_project_id, get_db, require_permission
 from app.api.v1.schemas.playbook_triggers import PlaybookTriggerCreate, PlaybookTriggerRead, PlaybookTriggerUpdate
 from app.core.rbac import Permission
 from app.db.models import Playbook, PlaybookTrigger
-from app.services.audit import audit_log
+from app.services.audit import enqueue_audit
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 def _require_admin(principal) -> None:
-    if getattr(principal.role, "value", str(principal.role)) != "admin":
+    if not principal.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Требуются права admin")
 
 
@@ -47,11 +47,10 @@ async def create_trigger(
     db.add(trigger)
     await db.commit()
     await db.refresh(trigger)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="trigger.create",
         entity_type="trigger",
         entity_id=trigger.id,
@@ -83,11 +82,10 @@ async def update_trigger(
         setattr(trigger, field, value)
     await db.commit()
     await db.refresh(trigger)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="trigger.update",
         entity_type="trigger",
         entity_id=trigger.id,
@@ -109,11 +107,10 @@ async def delete_trigger(
         raise HTTPException(status_code=404, detail="Триггер не найден")
     await db.delete(trigger)
     await db.commit()
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="trigger.delete",
         entity_type="trigger",
         entity_id=trigger_id,
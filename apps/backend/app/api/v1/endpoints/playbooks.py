@@ -17,12 +17,13 @@ from app.services.audit import audit_log
 from app.services.git_sync import GitSyncError, sync_playbook_repo
 from app.services.notifications import notify_event
 from app.services.queue import enqueue_run
+from app.services.system_playbooks import forget_playbook
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 def _require_admin(principal) -> None:
-    if getattr(principal.role, "value", str(principal.role)) != "admin":
+    if not principal.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Требуются права admin")
 
 
@@ -147,7 +148,7 @@ async def create_playbook(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="playbook.create",
         entity_type="playbook",
         entity_id=playbook.id,
@@ -236,7 +237,7 @@ async def sync_playbook(
             db,
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="playbook.sync",
             entity_type="playbook",
             entity_id=playbook.id,
@@ -450,7 +451,7 @@ async def run_playbook(
             db,
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="run.create_requires_approval",
             entity_type="run",
             entity_id=run.id,
@@ -468,7 +469,7 @@ async def run_playbook(
             db,
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="run.create",
             entity_type="run",
             entity_id=run.id,
@@ -512,13 +513,15 @@ async def update_playbook(
         playbook.variables = variables
 
     await db.commit()
+    if "name" in updates:
+        forget_playbook(playbook.id)
     await db.refresh(playbook)
     playbook.schedule = _extract_schedule(playbook.variables)
     await audit_log(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="playbook.update",
         entity_type="playbook",
         entity_id=playbook.id,
@@ -541,12 +544,13 @@ async def delete_playbook(
         raise HTTPException(status_code=404, detail="Плейбук не найден")
     await db.delete(playbook)
     await db.commit()
+    forget_playbook(playbook_id)
     logger.info("Playbook deleted playbook_id=%s", playbook_id)
     await audit_log(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="playbook.delete",
         entity_type="playbook",
         entity_id=playbook_id,
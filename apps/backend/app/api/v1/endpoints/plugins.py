@@ -6,14 +6,14 @@ from app.api.v1.deps import get_current_project_id, get_db, require_permission
 from app.api.v1.schemas.plugins import PluginDefinition, PluginInstanceCreate, PluginInstanceRead, PluginInstanceUpdate
 from app.core.rbac import Permission
 from app.db.models import PluginInstance
-from app.services.audit import audit_log
+from app.services.audit import enqueue_audit
 from app.services.plugins import list_definitions, validate_definition
 
 router = APIRouter()
 
 
 def _require_admin(principal) -> None:
-    if getattr(principal.role, "value", str(principal.role)) != "admin":
+    if not principal.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Требуются права admin")
 
 
@@ -66,11 +66,10 @@ async def create_instance(
     db.add(instance)
     await db.commit()
     await db.refresh(instance)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="plugin_instance.create",
         entity_type="plugin_instance",
         entity_id=instance.id,
@@ -107,11 +106,10 @@ async def update_instance(
         setattr(instance, field, value)
     await db.commit()
     await db.refresh(instance)
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="plugin_instance.update",
         entity_type="plugin_instance",
         entity_id=instance.id,
@@ -133,11 +131,10 @@ async def delete_instance(
         raise HTTPException(status_code=404, detail="Plugin instance не найден")
     await db.delete(instance)
     await db.commit()
-    await audit_log(
-        db,
+    enqueue_audit(
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="plugin_instance.delete",
         entity_type="plugin_instance",
         entity_id=instance_id,
@@ -9,7 +9,7 @@ from app.api.v1.deps import get_db, require_permission
 from app.api.v1.schemas.projects import ProjectCreate, ProjectRead, ProjectUpdate
 from app.core.rbac import Permission
 from app.db.models import Project
-from app.services.audit import audit_log
+from app.services.audit import enqueue_audit
 from app.services.access import is_project_allowed
 
 logger = logging.getLogger(__name__)
@@ -37,10 +37,9 @@ async def create_project(
         await db.rollback()
         raise HTTPException(status_code=400, detail="Проект с таким именем уже существует")
     await db.refresh(project)
-    await audit_log(
-        db,
+    enqueue_audit(
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="project.create",
         entity_type="project",
         entity_id=project.id,
@@ -70,10 +69,9 @@ async def update_project(
         await db.rollback()
         raise HTTPException(status_code=400, detail="Проект с таким именем уже существует")
     await db.refresh(project)
-    await audit_log(
-        db,
+    enqueue_audit(
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="project.update",
         entity_type="project",
         entity_id=project.id,
@@ -101,10 +99,9 @@ async def delete_project(
         await db.rollback()
         logger.error("Cannot delete project %s: %s", project_id, exc)
         raise HTTPException(status_code=400, detail="Нельзя удалить проект: есть связанные сущности")
-    await audit_log(
-        db,
+    enqueue_audit(
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="project.delete",
         entity_type="project",
         entity_id=project_id,
@@ -25,6 +25,7 @@ from app.api.v1.schemas.secrets import (
 from app.core.rbac import Permission
 from app.db.models import ApprovalRequest, ApprovalStatus, Host, JobRun, JobStatus, Playbook, Secret, SecretLease, SecretType
 from app.services.audit import audit_log
+from app.services.credentials import forget_credential
 from app.services.encryption import decrypt_value, encrypt_value
 from app.services.notifications import notify_event
 from app.services.queue import enqueue_run
@@ -58,7 +59,7 @@ def _compute_next_rotation(last_rotated_at: datetime | None, interval_days: int
 
 
 def _require_admin(principal) -> None:
-    if getattr(principal.role, "value", str(principal.role)) != "admin":
+    if not principal.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Требуются права admin")
 
 
@@ -150,7 +151,7 @@ async def create_secret(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="secret.create",
         entity_type="secret",
         entity_id=secret.id,
@@ -201,6 +202,7 @@ async def update_secret(
         secret.last_rotated_at = datetime.utcnow()
     secret.next_rotated_at = _compute_next_rotation(secret.last_rotated_at, secret.rotation_interval_days)
     await db.commit()
+    forget_credential(secret.id)
     await db.refresh(secret)
     after = {
         "name": secret.name,
@@ -217,7 +219,7 @@ async def update_secret(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="secret.update",
         entity_type="secret",
         entity_id=secret.id,
@@ -247,12 +249,13 @@ async def rotate_secret(
     secret.last_rotated_at = datetime.utcnow()
     secret.next_rotated_at = _compute_next_rotation(secret.last_rotated_at, secret.rotation_interval_days)
     await db.commit()
+    forget_credential(secret.id)
     await db.refresh(secret)
     await audit_log(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="secret.rotate",
         entity_type="secret",
         entity_id=secret.id,
@@ -368,7 +371,7 @@ async def rotate_secret_apply(
             db,
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="secret.rotate_apply_requires_approval",
             entity_type="run",
             entity_id=run.id,
@@ -386,7 +389,7 @@ async def rotate_secret_apply(
             db,
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="secret.rotate_apply",
             entity_type="run",
             entity_id=run.id,
@@ -413,7 +416,7 @@ async def reveal_secret(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="secret.reveal",
         entity_type="secret",
         entity_id=secret.id,
@@ -445,7 +448,7 @@ async def reveal_secret_internal(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="secret.reveal_internal",
         entity_type="secret",
         entity_id=secret.id,
@@ -481,11 +484,12 @@ async def delete_secret(
     try:
         await db.delete(secret)
         await db.commit()
+        forget_credential(secret_id)
         await audit_log(
             db,
             project_id=project_id,
             actor=principal.email,
-            actor_role=str(principal.role.value),
+            actor_role=principal.role_value,
             action="secret.delete",
             entity_type="secret",
             entity_id=secret_id,
@@ -543,7 +547,7 @@ async def issue_secret_lease(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="secret.lease.issue",
         entity_type="secret",
         entity_id=secret.id,
@@ -601,7 +605,7 @@ async def revoke_secret_lease(
         db,
         project_id=project_id,
         actor=principal.email,
-        actor_role=str(principal.role.value),
+        actor_role=principal.role_value,
         action="secret.lease.revoke",
         entity_type="secret",
         entity_id=lease.secret_id,
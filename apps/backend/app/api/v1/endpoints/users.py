@@ -5,11 +5,11 @@ from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.v1.deps import get_current_user, get_db
+from app.api.v1.deps import get_current_user, get_db, invalidate_principal
 from app.api.v1.schemas.users import UserCreate, UserRead, UserUpdate
 from app.core.hash import get_password_hash
 from app.db.models import User, UserRole
-from app.services.audit import audit_log
+from app.services.audit import enqueue_audit
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -51,14 +51,13 @@ async def create_user(payload: UserCreate, db: AsyncSession = Depends(get_db), u
         await db.rollback()
         raise HTTPException(status_code=409, detail="Пользователь с таким email уже существует")
     await db.refresh(new_user)
-    await audit_log(
-        db,
+    enqueue_audit(
         actor=user.get("sub"),
         actor_role=user.get("role"),
         action="user.create",
         entity_type="user",
         entity_id=new_user.id,
-        meta={"email": new_user.email, "role": str(new_user.role.value)},
+        meta={"email": new_user.email, "role": new_user.role_value},
     )
     return new_user
 
@@ -74,6 +73,7 @@ async def update_user(user_id: int, payload: UserUpdate, db: AsyncSession = Depe
         if await _admin_count(db) <= 1:
             raise HTTPException(status_code=400, detail="Нельзя снять роль admin с последнего администратора")
 
+    previous_email = target.email
     if payload.email is not None:
         target.email = payload.email.strip().lower()
     if payload.role is not None:
@@ -92,15 +92,15 @@ async def update_user(user_id: int, payload: UserUpdate, db: AsyncSession = Depe
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=409, detail="Пользователь с таким email уже существует")
+    invalidate_principal(previous_email, target.email)
     await db.refresh(target)
-    await audit_log(
-        db,
+    enqueue_audit(
         actor=user.get("sub"),
         actor_role=user.get("role"),
         action="user.update",
         entity_type="user",
         entity_id=target.id,
-        meta={"email": target.email, "role": str(target.role.value)},
+        meta={"email": target.email, "role": target.role_value},
     )
     return target
 
@@ -116,8 +116,8 @@ async def delete_user(user_id: int, db: AsyncSession = Depends(get_db), user=Dep
             raise HTTPException(status_code=400, detail="Нельзя удалить последнего администратора")
     await db.delete(target)
     await db.commit()
-    await audit_log(
-        db,
+    invalidate_principal(target.email)
+    enqueue_audit(
         actor=user.get("sub"),
         actor_role=user.get("role"),
         action="user.delete",
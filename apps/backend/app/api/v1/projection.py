@@ -0,0 +1,47 @@
+"""Списки без ORM-гидрации.
+
+Для больших выборок (audit, approvals, хосты и хосты группы) грузить ORM-объекты дорого: identity map,
+инструментированные атрибуты, а затем повторная валидация response_model. Вместо этого
+выбираем ровно колонки схемы ответа и собираем её через `model_construct` — данные из БД
+уже нужных типов, валидаторы им не нужны. Эндпоинты с такими списками объявляют
+`response_model=None` и отдают готовый JSON (`json_list_response`): сериализация идёт
+одним проходом pydantic-core, минуя повторную валидацию, jsonable_encoder и json.dumps.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Optional, Sequence, TypeVar
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def schema_columns(model: Any, schema: type[BaseModel]) -> tuple:
+    """Колонки ORM-модели, которые отдаёт схема (порядок полей схемы)."""
+    columns = model.__table__.columns
+    return tuple(getattr(model, name) for name in schema.model_fields if name in columns)
+
+
+def construct_all(schema: type[SchemaT], rows: Iterable[Mapping[str, Any]]) -> list[SchemaT]:
+    """Собрать схемы из строк `result.mappings()` без валидации."""
+    return [schema.model_construct(**row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+def dump_json_list(schema: type[SchemaT], items: Sequence[SchemaT]) -> bytes:
+    """Список схем в JSON одним проходом pydantic-core."""
+    return _list_adapter(schema).dump_json(items)
+
+
+def json_list_response(
+    schema: type[SchemaT], items: Sequence[SchemaT], *, headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """JSON-ответ со списком схем, сериализованный целиком в pydantic-core."""
+    return Response(dump_json_list(schema, items), media_type="application/json", headers=headers)
@@ -80,6 +80,10 @@ class HostStatusCheckResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class HostBulkStatusCheckRequest(BaseModel):
+    host_ids: list[int] = Field(..., min_length=1, max_length=500)
+
+
 class HostRead(HostBase):
     id: int
     project_id: int
@@ -120,7 +124,15 @@ class SshSessionRead(BaseModel):
     duration_seconds: Optional[int] = None
     success: bool
     error: Optional[str] = None
-    transcript: Optional[str] = None
+    has_transcript: bool = False
+    transcript_truncated: bool = False
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SshSessionTranscriptRead(BaseModel):
+    session_id: int
+    transcript: str
     transcript_truncated: bool = False
 
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,50 @@
+"""Адрес клиента запроса (аудит, лимиты логина).
+
+`X-Forwarded-For` задаёт клиент, верить ему можно только в записях, которые дописал наш
+прокси. Поэтому заголовок читаем, лишь если соединение пришло от доверенного прокси
+(`settings.trusted_proxies`), и идём по нему справа налево: первый адрес, который сам не
+является доверенным прокси, — клиент. Без доверенных прокси — адрес TCP-соединения.
+"""
+
+from __future__ import annotations
+
+import ipaddress
+from functools import lru_cache
+from typing import Optional
+
+from starlette.requests import HTTPConnection
+
+from app.core.config import settings
+
+IPNetwork = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+@lru_cache(maxsize=1)
+def _trusted_networks(raw: str) -> tuple[IPNetwork, ...]:
+    return tuple(ipaddress.ip_network(item.strip(), strict=False) for item in raw.split(",") if item.strip())
+
+
+def _is_trusted(address: str, networks: tuple[IPNetwork, ...]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def resolve_client_ip(peer: Optional[str], forwarded_for: Optional[str], trusted: str) -> Optional[str]:
+    """Адрес клиента по адресу соединения `peer` и заголовку `X-Forwarded-For`."""
+    networks = _trusted_networks(trusted)
+    if not peer or not forwarded_for or not _is_trusted(peer, networks):
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, networks):
+            return hop
+    return hops[0] if hops else peer
+
+
+def client_ip(connection: HTTPConnection) -> Optional[str]:
+    """Адрес клиента запроса/WebSocket с учётом доверенных прокси."""
+    peer = connection.client.host if connection.client else None
+    return resolve_client_ip(peer, connection.headers.get("x-forwarded-for"), settings.trusted_proxies)
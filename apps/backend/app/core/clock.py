@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+
+def utcnow() -> datetime:
+    """Текущее время UTC без tzinfo.
+
+    Колонки в БД — `timestamp without time zone` с UTC-значениями, asyncpg не принимает
+    в них aware-datetime. `datetime.utcnow()` deprecated с Python 3.12, поэтому берём
+    aware-время и снимаем tzinfo.
+    """
+    return datetime.now(UTC).replace(tzinfo=None)
@@ -25,6 +25,14 @@ class Settings(BaseSettings):
     smtp_password: str | None = None
     smtp_from: str | None = None
     smtp_tls: bool = True
+    # Попыток входа в минуту на IP и на email (bcrypt дорог — ограничиваем перебор).
+    login_attempts_per_minute: int = 10
+    # Адреса/сети (CSV, например "10.0.0.5,172.18.0.0/16") обратных прокси, которым доверяем
+    # X-Forwarded-For. Пусто — адрес клиента берётся из TCP-соединения.
+    trusted_proxies: str = ""
+    # Проверки доступности хостов: таймаут одной пробы и параллелизм массовой проверки.
+    host_check_timeout_seconds: float = 5.0
+    host_check_concurrency: int = 32
 
     @property
     def frontend_cors_origins_list(self) -> List[str]:
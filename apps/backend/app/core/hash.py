@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -9,3 +11,13 @@ def get_password_hash(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    return pwd_context.hash("itmgr-dummy-password")
+
+
+def verify_dummy_password(plain_password: str) -> None:
+    """Проверка против фиктивного хэша: ответ для несуществующего аккаунта занимает столько же."""
+    pwd_context.verify(plain_password, _dummy_password_hash())
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class TokenBucketLimiter:
+    """Token bucket на ключ (IP, email и т.п.) в памяти процесса.
+
+    Каждому ключу даётся `capacity` попыток, которые восполняются равномерно —
+    `capacity` штук за `period` секунд. Процесс backend один, поэтому общего
+    хранилища не нужно; число отслеживаемых ключей ограничено `maxsize`
+    (вытесняются давно не использованные).
+    """
+
+    def __init__(self, capacity: int, period: float, maxsize: int = 10_000) -> None:
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[Hashable, tuple[float, float]]" = OrderedDict()
+
+    def hit(self, key: Hashable) -> bool:
+        """Списать попытку. False — лимит для ключа исчерпан."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (float(self.capacity), now))
+        tokens = min(float(self.capacity), tokens + (now - updated_at) * self.rate)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return allowed
+
+    def clear(self) -> None:
+        self._buckets.clear()
@@ -77,19 +77,30 @@ ROLE_PERMISSIONS: dict[str, set[Permission]] = {
 }
 
 
-def has_permission(role: str | None, permission: Permission) -> bool:
+# Битовые маски: у каждого пермишена свой бит (по порядку объявления в enum),
+# у роли — OR битов её прав. Проверка на запрос сводится к одному `&`.
+PERM_BIT: dict[Permission, int] = {perm: 1 << index for index, perm in enumerate(Permission)}
+
+
+def permissions_mask(permissions: Iterable[Permission]) -> int:
+    mask = 0
+    for permission in permissions:
+        mask |= PERM_BIT[permission]
+    return mask
+
+
+ROLE_MASK: dict[str, int] = {role: permissions_mask(perms) for role, perms in ROLE_PERMISSIONS.items()}
+
+
+def role_mask(role: str | None) -> int:
     if not role:
-        return False
-    perms = ROLE_PERMISSIONS.get(role)
-    if perms is None:
-        return False
-    return permission in perms
+        return 0
+    return ROLE_MASK.get(role, 0)
+
+
+def has_permission(role: str | None, permission: Permission) -> bool:
+    return bool(role_mask(role) & PERM_BIT[permission])
 
 
 def has_any_permission(role: str | None, permissions: Iterable[Permission]) -> bool:
-    if not role:
-        return False
-    perms = ROLE_PERMISSIONS.get(role)
-    if perms is None:
-        return False
-    return any(p in perms for p in permissions)
+    return bool(role_mask(role) & permissions_mask(permissions))
@@ -3,7 +3,7 @@
 from datetime import datetime
 import enum
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, Text, func
+from sqlalchemy import Boolean, CheckConstraint, Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import relationship
@@ -76,6 +76,11 @@ class User(Base):
     allowed_project_ids = Column(JSONB, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
 
+    @property
+    def role_value(self) -> str:
+        """Строковое значение роли (то же, что у `Principal.role_value`)."""
+        return getattr(self.role, "value", str(self.role))
+
 
 class Secret(Base):
     __tablename__ = "secrets"
@@ -97,29 +102,46 @@ class Secret(Base):
     dynamic_ttl_seconds = Column(Integer, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=datetime.utcnow())
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
 
 
 class PluginInstance(Base):
     __tablename__ = "plugin_instances"
+    __table_args__ = (
+        Index("ix_plugin_instances_project_type", "project_id", "type"),
+        CheckConstraint("type IN ('inventory', 'secrets', 'automation')", name="ck_plugin_instances_type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1, index=True)
-    type = Column(Enum(PluginType), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1)
+    # varchar + CHECK (см. 0026/0032), не нативный ENUM.
+    type = Column(Enum(PluginType, native_enum=False, length=32), nullable=False)
     definition_id = Column(String, nullable=False)
     name = Column(String, nullable=False)
     enabled = Column(Boolean, default=True, nullable=False)
     is_default = Column(Boolean, default=False, nullable=False)
     config = Column(JSONB, default=dict)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=datetime.utcnow())
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
 
 
 class Host(Base):
     __tablename__ = "hosts"
+    __table_args__ = (
+        # Поиск подстроки (ILIKE '%q%') в list_hosts.
+        Index("ix_hosts_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index(
+            "ix_hosts_hostname_trgm",
+            "hostname",
+            postgresql_using="gin",
+            postgresql_ops={"hostname": "gin_trgm_ops"},
+        ),
+        # Список хостов проекта по умолчанию отсортирован по name.
+        Index("ix_hosts_project_name", "project_id", "name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1)
     name = Column(String, nullable=False)
     hostname = Column(String, nullable=False, index=True)
     port = Column(Integer, default=22, nullable=False)
@@ -141,17 +163,20 @@ class Host(Base):
     record_ssh = Column(Boolean, default=False, nullable=False)
     credential_id = Column(Integer, ForeignKey("secrets.id"), nullable=True)
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=datetime.utcnow())
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
 
-    credential = relationship("Secret", lazy="joined")
+    # Секрет нужен только SSH-пробе и терминалу — они подгружают его явно (`joinedload`).
+    # Остальные выборки хостов (списки, группы, инвентори) не тянут JOIN на secrets.
+    credential = relationship("Secret", lazy="raise")
 
 
 class SecretLease(Base):
     __tablename__ = "secret_leases"
+    __table_args__ = (Index("ix_secret_leases_secret_project", "secret_id", "project_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1, index=True)
-    secret_id = Column(Integer, ForeignKey("secrets.id"), nullable=False, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1)
+    secret_id = Column(Integer, ForeignKey("secrets.id"), nullable=False)
     issued_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     issued_at = Column(DateTime, server_default=func.now(), nullable=False)
     expires_at = Column(DateTime, nullable=False)
@@ -160,22 +185,30 @@ class SecretLease(Base):
 
 
 class HostHealthCheck(Base):
-    __tablename__ = "host_health_checks"
+    """История health-check'ов. В БД — партиции по месяцу checked_at (см. 0033)."""
 
-    id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1, index=True)
-    host_id = Column(Integer, ForeignKey("hosts.id"), nullable=False, index=True)
+    __tablename__ = "host_health_checks"
+    __table_args__ = (
+        Index("ix_host_health_checks_host_project", "host_id", "project_id", "checked_at"),
+        {"postgresql_partition_by": "RANGE (checked_at)"},
+    )
+
+    # PK партиционированной таблицы обязан включать ключ партиции.
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1)
+    host_id = Column(Integer, ForeignKey("hosts.id"), nullable=False)
     status = Column(String, nullable=False)
     snapshot = Column(JSONB, nullable=True)
-    checked_at = Column(DateTime, server_default=func.now())
+    checked_at = Column(DateTime, primary_key=True, server_default=func.now(), nullable=False)
 
 
 class SshSession(Base):
     __tablename__ = "ssh_sessions"
+    __table_args__ = (Index("ix_ssh_sessions_host_project_started", "host_id", "project_id", text("started_at DESC")),)
 
-    id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1, index=True)
-    host_id = Column(Integer, ForeignKey("hosts.id"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1)
+    host_id = Column(Integer, ForeignKey("hosts.id"), nullable=False)
     actor = Column(String, nullable=False)
     source_ip = Column(String, nullable=True)
     started_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -183,7 +216,15 @@ class SshSession(Base):
     duration_seconds = Column(Integer, nullable=True)
     success = Column(Boolean, default=True, nullable=False)
     error = Column(Text, nullable=True)
-    transcript = Column(Text, nullable=True)
+
+
+class SshSessionTranscript(Base):
+    """Запись SSH-сессии (record_ssh). Отдельно от ssh_sessions, чтобы списки сессий её не читали."""
+
+    __tablename__ = "ssh_session_transcripts"
+
+    session_id = Column(Integer, ForeignKey("ssh_sessions.id", ondelete="CASCADE"), primary_key=True)
+    transcript = Column(Text, nullable=False)
     transcript_truncated = Column(Boolean, default=False, nullable=False)
 
 
@@ -194,15 +235,16 @@ class GroupType(str, enum.Enum):
 
 class HostGroup(Base):
     __tablename__ = "groups"
+    __table_args__ = (Index("ix_groups_project_name", "project_id", "name"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1)
     name = Column(String, nullable=False)
     type = Column(Enum(GroupType), nullable=False)
     rule = Column(JSONB, nullable=True)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=datetime.utcnow())
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
 
     hosts = relationship("GroupHost", cascade="all, delete-orphan", back_populates="group")
 
@@ -215,9 +257,10 @@ class GroupHost(Base):
     """
 
     __tablename__ = "group_hosts"
+    __table_args__ = (Index("uq_group_hosts_group_host", "group_id", "host_id", unique=True),)
 
     id = Column(Integer, primary_key=True)
-    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), index=True, nullable=False)
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
     host_id = Column(Integer, ForeignKey("hosts.id", ondelete="CASCADE"), index=True, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
 
@@ -232,9 +275,10 @@ class DynamicGroupHostCache(Base):
     """
 
     __tablename__ = "dynamic_group_host_cache"
+    __table_args__ = (Index("uq_dynamic_group_host_cache_group_host", "group_id", "host_id", unique=True),)
 
     id = Column(Integer, primary_key=True)
-    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), index=True, nullable=False)
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
     host_id = Column(Integer, ForeignKey("hosts.id", ondelete="CASCADE"), index=True, nullable=False)
     computed_at = Column(DateTime, server_default=func.now(), nullable=False)
 
@@ -263,7 +307,7 @@ class Playbook(Base):
     webhook_token = Column(String, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=datetime.utcnow())
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
 
 
 class PlaybookTemplate(Base):
@@ -277,7 +321,7 @@ class PlaybookTemplate(Base):
     vars_defaults = Column(JSONB, default=dict)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=datetime.utcnow())
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
 
 
 class PlaybookInstance(Base):
@@ -293,22 +337,26 @@ class PlaybookInstance(Base):
     group_ids = Column(JSONB, default=list)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=datetime.utcnow())
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
 
 
 class PlaybookTrigger(Base):
     __tablename__ = "playbook_triggers"
+    __table_args__ = (
+        Index("ix_playbook_triggers_project_type", "project_id", "type"),
+        Index("ix_playbook_triggers_playbook_id", "playbook_id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1, index=True)
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1)
     playbook_id = Column(Integer, ForeignKey("playbooks.id"), nullable=False)
     type = Column(String, nullable=False)
     enabled = Column(Boolean, default=True)
     filters = Column(JSONB, default=dict)
     extra_vars = Column(JSONB, default=dict)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=datetime.utcnow())
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
 
 
 class JobStatus(str, enum.Enum):
@@ -341,9 +389,10 @@ class ApprovalStatus(str, enum.Enum):
 
 class ApprovalRequest(Base):
     __tablename__ = "approval_requests"
+    __table_args__ = (Index("ix_approval_requests_project_created", "project_id", text("created_at DESC")),)
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1)
     run_id = Column(Integer, ForeignKey("job_runs.id"), nullable=False, index=True)
     requested_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     decided_by = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -360,9 +409,10 @@ class AuditEvent(Base):
     """
 
     __tablename__ = "audit_events"
+    __table_args__ = (Index("ix_audit_events_project_created", "project_id", text("created_at DESC")),)
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
     actor = Column(String, nullable=False)  # email/subject
     actor_role = Column(String, nullable=True)
     action = Column(String, nullable=False)  # например: host.create, ssh.connect
@@ -376,8 +426,16 @@ class AuditEvent(Base):
 
 class NotificationEndpoint(Base):
     __tablename__ = "notification_endpoints"
+    __table_args__ = (
+        Index(
+            "ix_notification_endpoints_dispatch",
+            "project_id",
+            postgresql_include=["type", "url", "secret", "events"],
+            postgresql_where=text("enabled"),
+        ),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, default=1, index=True)
     name = Column(String, nullable=False)
     type = Column(String, nullable=False, default="webhook")
@@ -385,7 +443,7 @@ class NotificationEndpoint(Base):
     secret = Column(String, nullable=True)
     events = Column(JSONB, default=list)
     enabled = Column(Boolean, default=True)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
 
 class GlobalSetting(Base):
@@ -1,17 +1,23 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1 import api_router
+from app.api.v1 import include_api_routers
 from app.core.config import settings
 from app.core.audit_context import set_source_ip
+from app.core.client_ip import client_ip
 from app.core.logging import setup_logging
 from app.core.request_id import new_request_id, set_request_id
 from app.db import engine
 from app.db import async_session
-from app.services.bootstrap import ensure_bootstrap_admin, ensure_default_project, ensure_worker_user
+from app.services.audit import drain_audit_queue
+from app.services.ssh_sessions import drain_session_queue
+from app.services.notifications import close_http_client
+from app.services.ssh_pool import close_pool as close_ssh_pool
+from app.services.bootstrap import ensure_bootstrap_admin, ensure_default_project, ensure_worker_user, maintain_health_check_partitions
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -30,7 +36,15 @@ async def lifespan(app: FastAPI):
             await ensure_worker_user(db)
         except Exception as exc:  # noqa: BLE001
             logging.getLogger(__name__).warning("Bootstrap admin failed: %s", exc)
+    partitions_task = asyncio.create_task(maintain_health_check_partitions())
     yield
+    partitions_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await partitions_task
+    await drain_session_queue()
+    await drain_audit_queue()
+    await close_http_client()
+    await close_ssh_pool()
 
 app = FastAPI(
     title="IT Manager API",
@@ -48,9 +62,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
-app.include_router(api_router, prefix="/api/v1")
+include_api_routers(app, prefix="/api/v1")
 
 @app.middleware("http")
 async def request_id_middleware(request, call_next):
@@ -61,12 +76,7 @@ async def request_id_middleware(request, call_next):
     - Возвращаем значение обратно в заголовке ответа `X-Request-Id`.
     """
     incoming = request.headers.get("x-request-id")
-    forwarded = request.headers.get("x-forwarded-for")
-    source_ip = None
-    if forwarded:
-        source_ip = forwarded.split(",")[0].strip() or None
-    if not source_ip:
-        source_ip = request.client.host if request.client else None
+    source_ip = client_ip(request)
     rid = (incoming or "").strip() or new_request_id()
     set_request_id(rid)
     set_source_ip(source_ip)
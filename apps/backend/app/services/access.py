@@ -5,11 +5,24 @@ MVP: ограничения задаются в users.allowed_environments / use
 
 from __future__ import annotations
 
-from typing import Sequence
+from typing import Optional, Protocol, Sequence
 
-from sqlalchemy import Select, and_, literal, select
+from sqlalchemy import Delete, Select, Update, and_, literal, select
 
-from app.db.models import DynamicGroupHostCache, GroupHost, Host, HostGroup, User
+from app.db.models import DynamicGroupHostCache, GroupHost, Host, HostGroup
+
+
+class AccessPrincipal(Protocol):
+    """То, что фильтры доступа читают у субъекта: `User` или кэшируемый `Principal` (deps)."""
+
+    @property
+    def allowed_environments(self) -> Optional[list]: ...
+
+    @property
+    def allowed_group_ids(self) -> Optional[list]: ...
+
+    @property
+    def allowed_project_ids(self) -> Optional[list]: ...
 
 
 def _normalize_list(value) -> list:
@@ -20,7 +33,7 @@ def _normalize_list(value) -> list:
     return []
 
 
-def host_access_clause(principal: User):
+def host_access_clause(principal: AccessPrincipal):
     """SQLA-условие для доступа к host.
 
     Правила:
@@ -54,12 +67,12 @@ def host_access_clause(principal: User):
     return and_(*clauses)
 
 
-def apply_host_scope(stmt: Select, principal: User) -> Select:
+def apply_host_scope(stmt: Select, principal: AccessPrincipal) -> Select:
     """Применяет ограничения доступа к выборке hosts."""
     return stmt.where(host_access_clause(principal))
 
 
-def is_project_allowed(principal: User, project_id: int) -> bool:
+def is_project_allowed(principal: AccessPrincipal, project_id: int) -> bool:
     """Проверка доступа пользователя к проекту.
 
     Правила:
@@ -73,7 +86,7 @@ def is_project_allowed(principal: User, project_id: int) -> bool:
     return int(project_id) in ids
 
 
-def project_access_clause(principal: User, project_id_col):
+def project_access_clause(principal: AccessPrincipal, project_id_col):
     """SQLA-условие для проектного скоупа.
 
     Применяется к таблицам с колонкой project_id.
@@ -87,7 +100,7 @@ def project_access_clause(principal: User, project_id_col):
     return project_id_col.in_(ids)
 
 
-def group_access_clause(principal: User):
+def group_access_clause(principal: AccessPrincipal):
     """SQLA-условие для доступа к группе.
 
     Пока используем allowed_group_ids как список доступных group_id.
@@ -102,5 +115,6 @@ def group_access_clause(principal: User):
     return HostGroup.id.in_(group_ids)
 
 
-def apply_group_scope(stmt: Select, principal: User) -> Select:
+def apply_group_scope(stmt: Select | Update | Delete, principal: AccessPrincipal) -> Select | Update | Delete:
+    """Ограничение по группам; подходит и для UPDATE/DELETE по groups (проверка доступа в том же запросе)."""
     return stmt.where(group_access_clause(principal))
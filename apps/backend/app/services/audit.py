@@ -1,20 +1,63 @@
 """Сервис аудита.
 
 Цель: централизованно писать события в БД, не мешая основному флоу.
+
+Два способа записи:
+- `audit_log(db, ...)` — синхронно в сессии запроса (и коммитит её);
+- `enqueue_audit(...)` — fire-and-forget: событие кладётся в очередь процесса,
+  фоновая задача пишет накопившиеся события пачками в отдельной сессии.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any, Optional
 
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit_context import get_source_ip
+from app.db import async_session
 from app.db.models import AuditEvent
 
 logger = logging.getLogger(__name__)
 
+AUDIT_QUEUE_MAXSIZE = 10_000
+AUDIT_BATCH_SIZE = 100
+# Сколько ждать добора пачки после первого события: под нагрузкой события пишутся
+# одним INSERT на окно, а не по одному.
+AUDIT_FLUSH_INTERVAL_SECONDS = 0.1
+
+_audit_queue: asyncio.Queue[dict[str, Any]] | None = None
+_audit_flusher: asyncio.Task | None = None
+_audit_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _audit_row(
+    *,
+    project_id: int | None,
+    actor: str,
+    actor_role: str | None,
+    action: str,
+    entity_type: str | None,
+    entity_id: int | None,
+    success: bool,
+    meta: Optional[dict[str, Any]],
+    source_ip: str | None,
+) -> dict[str, Any]:
+    return {
+        "project_id": project_id,
+        "actor": actor,
+        "actor_role": actor_role,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "success": 1 if success else 0,
+        "meta": meta or {},
+        "source_ip": source_ip or get_source_ip(),
+    }
+
 
 async def audit_log(
     db: AsyncSession,
@@ -36,15 +79,17 @@ async def audit_log(
 
     try:
         event = AuditEvent(
-            project_id=project_id,
-            actor=actor,
-            actor_role=actor_role,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            success=1 if success else 0,
-            meta=meta or {},
-            source_ip=source_ip or get_source_ip(),
+            **_audit_row(
+                project_id=project_id,
+                actor=actor,
+                actor_role=actor_role,
+                action=action,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                success=success,
+                meta=meta,
+                source_ip=source_ip,
+            )
         )
         db.add(event)
         await db.commit()
@@ -54,3 +99,89 @@ async def audit_log(
         except Exception:
             pass
         logger.debug("Не удалось записать audit event %s: %s", action, exc)
+
+
+def enqueue_audit(
+    *,
+    project_id: int | None = None,
+    actor: str,
+    actor_role: str | None,
+    action: str,
+    entity_type: str | None = None,
+    entity_id: int | None = None,
+    success: bool = True,
+    meta: Optional[dict[str, Any]] = None,
+    source_ip: str | None = None,
+) -> None:
+    """Поставить событие аудита в очередь на запись, не дожидаясь БД.
+
+    source_ip берётся из контекста запроса сейчас, а не в фоновой задаче.
+    Если очередь переполнена (БД недоступна долгое время), событие отбрасывается с warning.
+    """
+
+    row = _audit_row(
+        project_id=project_id,
+        actor=actor,
+        actor_role=actor_role,
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        success=success,
+        meta=meta,
+        source_ip=source_ip,
+    )
+    try:
+        _ensure_audit_flusher().put_nowait(row)
+    except asyncio.QueueFull:
+        logger.warning("Очередь аудита переполнена, событие %s отброшено", action)
+
+
+def _ensure_audit_flusher() -> asyncio.Queue[dict[str, Any]]:
+    global _audit_queue, _audit_flusher, _audit_loop
+    loop = asyncio.get_running_loop()
+    if _audit_queue is None or _audit_loop is not loop:
+        # Очередь привязана к event loop; при смене loop (тесты) начинаем заново.
+        _audit_queue = asyncio.Queue(maxsize=AUDIT_QUEUE_MAXSIZE)
+        _audit_flusher = None
+        _audit_loop = loop
+    if _audit_flusher is None or _audit_flusher.done():
+        _audit_flusher = loop.create_task(_flush_audit_queue(_audit_queue))
+    return _audit_queue
+
+
+async def _flush_audit_queue(queue: asyncio.Queue[dict[str, Any]]) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + AUDIT_FLUSH_INTERVAL_SECONDS
+        while len(batch) < AUDIT_BATCH_SIZE:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        try:
+            async with async_session() as db:
+                await db.execute(insert(AuditEvent), batch)
+                await db.commit()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Не удалось записать %s audit events: %s", len(batch), exc)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def drain_audit_queue() -> None:
+    """Дописать накопившиеся события и остановить фоновую задачу (shutdown приложения)."""
+    global _audit_flusher
+    if _audit_queue is None or _audit_flusher is None:
+        return
+    if not _audit_flusher.done():
+        await _audit_queue.join()
+        _audit_flusher.cancel()
+    _audit_flusher = None
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import secrets
 
 from app.core.hash import get_password_hash
+from app.db import async_session
 from app.db.models import Project, User, UserRole
 
 logger = logging.getLogger(__name__)
 
+# Процесс живёт неделями: партиции досоздаются периодически, а не только на старте.
+HEALTH_CHECK_PARTITIONS_INTERVAL_SECONDS = 6 * 3600
+
 
 async def ensure_bootstrap_admin(db: AsyncSession, email: str, password: str) -> None:
     """Создаёт admin-пользователя при первом старте (best-effort).
@@ -71,3 +76,30 @@ async def ensure_worker_user(db: AsyncSession, *, email: str = "worker@it.local"
     db.add(user)
     await db.commit()
     logger.info("Создан worker user email=%s", email)
+
+
+async def ensure_health_check_partitions(db: AsyncSession) -> None:
+    """Создаёт партиции host_health_checks на текущий и следующий месяц (best-effort).
+
+    Функцию `ensure_host_health_check_partitions` создаёт миграция 0033 (0039 — перенос строк
+    из DEFAULT); вставки в ещё не созданный месяц попадают в DEFAULT-партицию.
+    """
+    await db.execute(
+        text("SELECT ensure_host_health_check_partitions(now()::timestamp, now()::timestamp + interval '1 month')")
+    )
+    await db.commit()
+
+
+async def maintain_health_check_partitions() -> None:
+    """Фоновая задача lifespan: партиции текущего и следующего месяца.
+
+    Запускается на старте и повторяется каждые `HEALTH_CHECK_PARTITIONS_INTERVAL_SECONDS`,
+    так что следующий месяц создан задолго до его начала и без рестарта процесса.
+    """
+    while True:
+        async with async_session() as db:
+            try:
+                await ensure_health_check_partitions(db)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Health check partitions maintenance failed: %s", exc)
+        await asyncio.sleep(HEALTH_CHECK_PARTITIONS_INTERVAL_SECONDS)
@@ -0,0 +1,58 @@
+"""Готовые к подключению SSH-креды хостов (password / загруженный private key).
+
+Health-check и терминал на каждую проверку и каждое подключение расшифровывают credential
+хоста, а ключ ещё и разбирают (PEM/OpenSSH, KDF passphrase — для защищённого ключа это
+десятки миллисекунд); сам секрет при этом меняется редко. Результат держим в памяти
+процесса недолго (`CREDENTIAL_CACHE_TTL_SECONDS`): ключ — (id секрета, updated_at), так что
+изменённый секрет сразу даёт промах. Изменение/ротация/удаление через API вдобавок
+сбрасывают запись (`forget_credential`), чтобы расшифрованный секрет не жил в памяти
+дольше нужного.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+import asyncssh
+
+from app.core.ttl_cache import TTLCache
+from app.db.models import Secret, SecretType
+from app.services.encryption import decrypt_value
+
+CREDENTIAL_CACHE_TTL_SECONDS = 60.0
+CREDENTIAL_CACHE_MAXSIZE = 1024
+
+SshCredentials = tuple[Optional[str], Optional[asyncssh.SSHKey]]
+
+_credentials: TTLCache[tuple[int, Optional[datetime]], SshCredentials] = TTLCache(
+    maxsize=CREDENTIAL_CACHE_MAXSIZE, ttl=CREDENTIAL_CACHE_TTL_SECONDS
+)
+
+
+def ssh_credentials(secret: Optional[Secret]) -> SshCredentials:
+    """(password, client_key) для `asyncssh.connect`; ошибки расшифровки/разбора ключа пробрасываются."""
+    if secret is None:
+        return None, None
+    key = (secret.id, secret.updated_at)
+    cached = _credentials.get(key)
+    if cached is not None:
+        return cached
+
+    password: Optional[str] = None
+    client_key: Optional[asyncssh.SSHKey] = None
+    decrypted = decrypt_value(secret.encrypted_value)
+    if secret.type == SecretType.password:
+        password = decrypted
+    elif secret.type == SecretType.private_key:
+        passphrase = decrypt_value(secret.encrypted_passphrase) if secret.encrypted_passphrase else None
+        client_key = asyncssh.import_private_key(decrypted, passphrase=passphrase)
+    result = (password, client_key)
+    _credentials.set(key, result)
+    return result
+
+
+def forget_credential(secret_id: int) -> None:
+    """Сбросить кэш секрета (изменение, ротация, удаление)."""
+    for key in [key for key, _ in _credentials.items() if key[0] == secret_id]:
+        _credentials.pop(key)
@@ -0,0 +1,63 @@
+"""Кэш ответа `GET /groups/{id}/hosts` для динамических групп в Redis.
+
+Дашборды опрашивают состав групп постоянно, а меняется он только при пересчёте
+(воркер раз в WORKER_RECOMPUTE_INTERVAL_SECONDS) и при правке/удалении группы.
+Храним готовый JSON: hash `itmgr:group:{id}:hosts`, поле — скоуп пользователя
+(проект + ограничения по окружениям/группам), так что пользователи с разными правами
+не видят чужую выборку, а инвалидация группы — один DEL. Правки самих хостов
+(имя, статус) попадают в ответ с задержкой до TTL.
+
+Redis здесь — оптимизация: при его недоступности просто идём в БД.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Iterable, Optional
+
+from app.services.queue import get_redis
+
+logger = logging.getLogger(__name__)
+
+GROUP_HOSTS_CACHE_TTL_SECONDS = 60
+
+
+def _key(group_id: int) -> str:
+    return f"itmgr:group:{int(group_id)}:hosts"
+
+
+def scope_field(principal, project_id: int) -> str:
+    """Поле hash'а: всё, от чего зависит выборка хостов для пользователя."""
+    scope = [int(project_id), principal.allowed_environments, principal.allowed_group_ids]
+    return hashlib.sha1(json.dumps(scope, sort_keys=True, default=str).encode(), usedforsecurity=False).hexdigest()
+
+
+async def get_group_hosts(group_id: int, field: str) -> Optional[str]:
+    try:
+        return await get_redis().hget(_key(group_id), field)
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Group hosts cache read failed group_id=%s error=%s", group_id, exc)
+        return None
+
+
+async def set_group_hosts(group_id: int, field: str, body: str) -> None:
+    key = _key(group_id)
+    try:
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.hset(key, field, body)
+            pipe.expire(key, GROUP_HOSTS_CACHE_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Group hosts cache write failed group_id=%s error=%s", group_id, exc)
+
+
+async def invalidate_group_hosts(group_ids: Iterable[int]) -> None:
+    keys = [_key(group_id) for group_id in group_ids]
+    if not keys:
+        return
+    try:
+        await get_redis().delete(*keys)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Group hosts cache invalidation failed groups=%s error=%s", len(keys), exc)
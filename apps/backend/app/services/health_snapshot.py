@@ -0,0 +1,52 @@
+"""Снимок состояния хоста по SSH: одна команда и разбор её вывода.
+
+Разбор — чистая функция без обращения к сети/БД, вызывается из health-check хостов.
+"""
+
+from __future__ import annotations
+
+import re
+
+HEALTH_SNAPSHOT_COMMAND = "cat /proc/uptime; cat /proc/loadavg; cat /proc/meminfo; df -kP /"
+
+_MEMINFO_RE = re.compile(r"^(MemTotal|MemAvailable):\s+(\d+)", re.M)
+# Строка `df -kP /`: Filesystem 1024-blocks Used Available Capacity Mounted-on
+_DF_ROOT_RE = re.compile(r"^[ \t]*\S+[ \t]+(\d+)[ \t]+(\d+)[ \t]+\S+[ \t]+(\S+)[ \t]+/[ \t]*$", re.M)
+
+
+def parse_health_snapshot(output: str) -> dict[str, float | int]:
+    """Разобрать вывод `/proc/uptime; /proc/loadavg; /proc/meminfo; df -kP /`.
+
+    uptime и loadavg — первые две строки; meminfo и df ищутся скомпилированными regex
+    по всему выводу, без разбиения остальных строк.
+    """
+    snapshot: dict[str, float | int] = {}
+    head = output.lstrip().split("\n", 2)
+    try:
+        snapshot["uptime_seconds"] = float(head[0].split(None, 1)[0])
+    except (IndexError, ValueError):
+        pass
+    if len(head) > 1:
+        try:
+            load1, load5, load15 = head[1].split(None, 3)[:3]
+            snapshot["load1"] = float(load1)
+            snapshot["load5"] = float(load5)
+            snapshot["load15"] = float(load15)
+        except ValueError:
+            pass
+    meminfo = {name: int(value) for name, value in _MEMINFO_RE.findall(output)}
+    mem_total = meminfo.get("MemTotal")
+    if mem_total is not None:
+        snapshot["mem_total_kb"] = mem_total
+        mem_available = meminfo.get("MemAvailable")
+        if mem_available is not None:
+            snapshot["mem_used_kb"] = mem_total - mem_available
+    df_root = _DF_ROOT_RE.search(output)
+    if df_root:
+        total, used, capacity = df_root.groups()
+        snapshot["disk_total_kb"] = int(total)
+        snapshot["disk_used_kb"] = int(used)
+        percent = capacity.rstrip("%")
+        if percent.isdigit():
+            snapshot["disk_used_percent"] = int(percent)
+    return snapshot
@@ -8,14 +8,32 @@ from email.message import EmailMessage
 from typing import Any
 
 import httpx
-from sqlalchemy import select
+from sqlalchemy import or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.db import async_session
 from app.db.models import NotificationEndpoint
 
 logger = logging.getLogger(__name__)
 
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Общий HTTP-клиент для webhook'ов: keep-alive соединения переиспользуются между событиями."""
+    global _http_client  # noqa: PLW0603
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=8.0, limits=httpx.Limits(max_keepalive_connections=100))
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client  # noqa: PLW0603
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 def _format_message(event: str, payload: dict[str, Any]) -> str:
     return f"Event: {event}\nPayload: {payload}"
@@ -48,12 +66,25 @@ async def notify_event(
     event: str,
     payload: dict[str, Any],
 ) -> None:
+    # Пустой список events означает подписку на все события.
     query = await db.execute(
-        select(NotificationEndpoint)
+        select(
+            NotificationEndpoint.type,
+            NotificationEndpoint.url,
+            NotificationEndpoint.secret,
+        )
         .where(NotificationEndpoint.project_id == project_id)
-        .where(NotificationEndpoint.enabled.is_(True))
+        # Голый `enabled` совпадает с предикатом частичного индекса ix_notification_endpoints_dispatch.
+        .where(NotificationEndpoint.enabled)
+        .where(
+            or_(
+                NotificationEndpoint.events.is_(None),
+                NotificationEndpoint.events == text("'[]'::jsonb"),
+                NotificationEndpoint.events.contains([event]),
+            )
+        )
     )
-    endpoints = query.scalars().all()
+    endpoints = query.all()
     if not endpoints:
         return
 
@@ -64,30 +95,37 @@ async def notify_event(
         "sent_at": datetime.utcnow().isoformat(),
     }
 
-    async with httpx.AsyncClient(timeout=8.0) as client:
-        for endpoint in endpoints:
-            if endpoint.events and event not in (endpoint.events or []):
-                continue
-            try:
-                if endpoint.type == "email":
-                    to_addr = endpoint.url.replace("mailto:", "").strip()
-                    if not to_addr:
-                        continue
-                    await _send_email(
-                        to_addr=to_addr,
-                        subject=f"IT Manager: {event}",
-                        body=_format_message(event, payload),
-                    )
+    client = get_http_client()
+    for endpoint in endpoints:
+        try:
+            if endpoint.type == "email":
+                to_addr = endpoint.url.replace("mailto:", "").strip()
+                if not to_addr:
                     continue
+                await _send_email(
+                    to_addr=to_addr,
+                    subject=f"IT Manager: {event}",
+                    body=_format_message(event, payload),
+                )
+                continue
+
+            headers = {"Content-Type": "application/json"}
+            if endpoint.secret:
+                headers["X-Webhook-Secret"] = endpoint.secret
+            if endpoint.type == "slack":
+                await client.post(endpoint.url, json={"text": _format_message(event, payload)}, headers=headers)
+            elif endpoint.type == "telegram":
+                await client.post(endpoint.url, json={"text": _format_message(event, payload)}, headers=headers)
+            else:
+                await client.post(endpoint.url, json=body, headers=headers)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Notification failed url=%s event=%s type=%s error=%s", endpoint.url, event, endpoint.type, exc)
+
 
-                headers = {"Content-Type": "application/json"}
-                if endpoint.secret:
-                    headers["X-Webhook-Secret"] = endpoint.secret
-                if endpoint.type == "slack":
-                    await client.post(endpoint.url, json={"text": _format_message(event, payload)}, headers=headers)
-                elif endpoint.type == "telegram":
-                    await client.post(endpoint.url, json={"text": _format_message(event, payload)}, headers=headers)
-                else:
-                    await client.post(endpoint.url, json=body, headers=headers)
-            except Exception as exc:  # noqa: BLE001
-                logger.warning("Notification failed url=%s event=%s type=%s error=%s", endpoint.url, event, endpoint.type, exc)
+async def dispatch_event(*, project_id: int, event: str, payload: dict[str, Any]) -> None:
+    """`notify_event` в собственной сессии — для BackgroundTasks (сессия запроса к этому моменту закрыта)."""
+    try:
+        async with async_session() as db:
+            await notify_event(db, project_id=project_id, event=event, payload=payload)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Notification dispatch failed event=%s error=%s", event, exc)
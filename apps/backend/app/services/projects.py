@@ -5,8 +5,8 @@ from dataclasses import dataclass
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Project, User
-from app.services.access import is_project_allowed
+from app.db.models import Project
+from app.services.access import AccessPrincipal, is_project_allowed
 
 
 class ProjectResolutionError(Exception):
@@ -31,7 +31,7 @@ def _normalize_int_list(value) -> list[int]:
 
 async def resolve_current_project_id(
     db: AsyncSession,
-    principal: User,
+    principal: AccessPrincipal,
     requested_project_id: int | None,
     *,
     default_project_name: str = "default",
@@ -53,31 +53,22 @@ async def resolve_current_project_id(
             raise ProjectAccessDenied(project_id=project.id)
         return int(project.id)
 
+    # Предпочитаем default-проект, иначе — проект с минимальным id; одним запросом.
+    preferred_order = ((Project.name == default_project_name).desc(), Project.id.asc())
+
     allowed = principal.allowed_project_ids
     if allowed is not None:
         ids = _normalize_int_list(allowed)
         if not ids:
             raise ProjectAccessDenied(project_id=None)
 
-        res = await db.execute(select(Project.id).where(Project.name == default_project_name).limit(1))
-        default_id = res.scalar_one_or_none()
-        if default_id is not None and int(default_id) in ids:
-            return int(default_id)
-
-        res = await db.execute(select(Project.id).where(Project.id.in_(ids)).order_by(Project.id.asc()).limit(1))
+        res = await db.execute(select(Project.id).where(Project.id.in_(ids)).order_by(*preferred_order).limit(1))
         pid = res.scalar_one_or_none()
         if pid is None:
             raise ProjectAccessDenied(project_id=None)
         return int(pid)
 
-    res = await db.execute(select(Project.id).where(Project.name == default_project_name).limit(1))
-    pid = res.scalar_one_or_none()
-    if pid is not None:
-        if not is_project_allowed(principal, int(pid)):
-            raise ProjectAccessDenied(project_id=int(pid))
-        return int(pid)
-
-    res = await db.execute(select(Project.id).order_by(Project.id.asc()).limit(1))
+    res = await db.execute(select(Project.id).order_by(*preferred_order).limit(1))
     pid = res.scalar_one_or_none()
     if pid is not None:
         if not is_project_allowed(principal, int(pid)):
@@ -87,4 +78,3 @@ async def resolve_current_project_id(
     if not is_project_allowed(principal, 1):
         raise ProjectAccessDenied(project_id=1)
     return 1
-
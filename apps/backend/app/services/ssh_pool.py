@@ -0,0 +1,167 @@
+"""Пул SSH-соединений для коротких команд (health-check и т.п.).
+
+Каждое `asyncssh.connect` — это TCP + key exchange + аутентификация; sshd к тому же
+ограничивает одновременные незавершённые handshake'и (`MaxStartups`). Соединение к одному
+и тому же host/user/credential держим открытым и переиспользуем.
+
+- ключ пула задаёт вызывающий код (адрес, пользователь, credential и его версия);
+- на одном соединении не больше `MAX_CHANNELS_PER_CONNECTION` каналов (sshd `MaxSessions`
+  по умолчанию 10), сверх этого открывается ещё одно соединение того же ключа;
+- соединения, простаивающие дольше `IDLE_TIMEOUT_SECONDS`, закрывает фоновая задача;
+- соединение, на котором команда упала, из пула убирается;
+- `run_command` гоняет команды через постоянный `/bin/sh` на соединении: без открытия
+  канала (CHANNEL_OPEN/exec) на каждую команду, конец вывода — по строке-маркеру.
+
+Интерактивный терминал пулом не пользуется: сессия живёт долго и держит собственный
+keepalive, переиспользовать её handshake незачем.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Hashable
+
+import asyncssh
+
+logger = logging.getLogger(__name__)
+
+MAX_CHANNELS_PER_CONNECTION = 8  # + один постоянный shell-канал, в сумме < MaxSessions
+IDLE_TIMEOUT_SECONDS = 120.0
+SWEEP_INTERVAL_SECONDS = 30.0
+_DONE_MARKER = "__itmgr_cmd_done__"
+
+ConnectFactory = Callable[[], Awaitable[asyncssh.SSHClientConnection]]
+
+
+@dataclass(eq=False)
+class _PooledConnection:
+    conn: asyncssh.SSHClientConnection
+    channels: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    shell: asyncssh.SSHClientProcess | None = None
+    shell_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def alive(self) -> bool:
+        return not self.conn.is_closed()
+
+
+_pool: dict[Hashable, list[_PooledConnection]] = {}
+_locks: dict[Hashable, asyncio.Lock] = {}
+_sweeper: asyncio.Task | None = None
+
+
+def _close(entry: _PooledConnection) -> None:
+    try:
+        entry.conn.close()
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def _forget(key: Hashable, entry: _PooledConnection) -> None:
+    entries = _pool.get(key)
+    if entries and entry in entries:
+        entries.remove(entry)
+        if not entries:
+            _pool.pop(key, None)
+            _locks.pop(key, None)
+
+
+def _discard(key: Hashable, entry: _PooledConnection) -> None:
+    _forget(key, entry)
+    _close(entry)
+
+
+def _ensure_sweeper() -> None:
+    global _sweeper  # noqa: PLW0603
+    if _sweeper is None or _sweeper.done():
+        _sweeper = asyncio.create_task(_sweep_idle())
+
+
+async def _sweep_idle() -> None:
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+        deadline = time.monotonic() - IDLE_TIMEOUT_SECONDS
+        for key, entries in list(_pool.items()):
+            for entry in list(entries):
+                if not entry.alive or (entry.channels == 0 and entry.last_used < deadline):
+                    _discard(key, entry)
+
+
+async def _checkout(key: Hashable, connect: ConnectFactory) -> _PooledConnection:
+    lock = _locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        entries = _pool.setdefault(key, [])
+        for entry in list(entries):
+            if not entry.alive:
+                entries.remove(entry)
+                continue
+            if entry.channels < MAX_CHANNELS_PER_CONNECTION:
+                entry.channels += 1
+                return entry
+        # Коннект под локом ключа: параллельные запросы к тому же хосту ждут один handshake,
+        # а не открывают по соединению каждый.
+        entry = _PooledConnection(conn=await connect(), channels=1)
+        entries.append(entry)
+    _ensure_sweeper()
+    return entry
+
+
+@asynccontextmanager
+async def _lease(key: Hashable, connect: ConnectFactory) -> AsyncIterator[_PooledConnection]:
+    """Соединение из пула на время одной команды (`connect` — если свободного живого нет).
+
+    Само по себе исключение внутри блока соединение не закрывает: поломку определяет
+    вызывающий код (`_discard`).
+    """
+    entry = await _checkout(key, connect)
+    try:
+        yield entry
+    finally:
+        entry.channels -= 1
+        entry.last_used = time.monotonic()
+
+
+async def run_command(key: Hashable, connect: ConnectFactory, command: str) -> tuple[int, str]:
+    """Выполнить команду в постоянном shell соединения пула; вернуть (exit status, stdout).
+
+    Shell открывается один раз на соединение; команды в нём идут по очереди (lock).
+    Прерванная команда (ошибка, таймаут/отмена) оставила бы в потоке недочитанный вывод,
+    поэтому такое соединение вместе с shell закрывается. Отмена, пока команда ещё ждёт
+    lock, соединение не трогает: на нём может выполняться чужая команда.
+    """
+    async with _lease(key, connect) as entry:
+        async with entry.shell_lock:
+            try:
+                if entry.shell is None or entry.shell.is_closing():
+                    entry.shell = await entry.conn.create_process("/bin/sh", stderr=asyncssh.DEVNULL)
+                shell = entry.shell
+                shell.stdin.write(f"{command}\nprintf '\\n{_DONE_MARKER} %s\\n' \"$?\"\n")
+                output = await shell.stdout.readuntil(f"\n{_DONE_MARKER} ")
+                exit_status = int((await shell.stdout.readline()).strip())
+            except BaseException:
+                _discard(key, entry)
+                raise
+    return exit_status, output[: -len(_DONE_MARKER) - 2]
+
+
+async def close_pool() -> None:
+    """Закрыть все соединения пула (shutdown приложения)."""
+    global _sweeper  # noqa: PLW0603
+    if _sweeper is not None:
+        _sweeper.cancel()
+        _sweeper = None
+    entries = [entry for group in _pool.values() for entry in group]
+    _pool.clear()
+    _locks.clear()
+    for entry in entries:
+        _close(entry)
+    for entry in entries:
+        try:
+            await entry.conn.wait_closed()
+        except Exception:  # noqa: BLE001
+            pass
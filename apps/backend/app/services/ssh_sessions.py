@@ -0,0 +1,132 @@
+"""Закрытие записей SSH-сессий вне WS-обработчика.
+
+Терминал при отключении должен отпустить клиента сразу, а не ждать UPDATE ssh_sessions
+и INSERT записи терминала. Итог сессии кладётся в очередь процесса; фоновая задача пишет
+накопившиеся итоги пачками (executemany) одной транзакцией — по образцу `enqueue_audit`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+from sqlalchemy import bindparam, insert, update
+
+from app.db import async_session
+from app.db.models import SshSession, SshSessionTranscript
+
+logger = logging.getLogger(__name__)
+
+SESSION_QUEUE_MAXSIZE = 1_000
+SESSION_BATCH_SIZE = 50
+SESSION_FLUSH_INTERVAL_SECONDS = 0.1
+
+# Core-таблица, а не ORM-сущность: ORM-update со списком параметров — это bulk UPDATE по PK,
+# в котором своё WHERE не допускается; здесь нужен обычный executemany.
+_sessions = SshSession.__table__
+_CLOSE_SESSION = (
+    update(_sessions)
+    .where(_sessions.c.id == bindparam("b_id"))
+    .values(
+        finished_at=bindparam("b_finished_at"),
+        duration_seconds=bindparam("b_duration_seconds"),
+        success=bindparam("b_success"),
+        error=bindparam("b_error"),
+    )
+)
+
+_session_queue: asyncio.Queue[dict[str, Any]] | None = None
+_session_flusher: asyncio.Task | None = None
+_session_loop: asyncio.AbstractEventLoop | None = None
+
+
+def enqueue_session_close(
+    *,
+    session_id: int,
+    finished_at,
+    duration_seconds: int,
+    error: Optional[str],
+    transcript: Optional[str] = None,
+    transcript_truncated: bool = False,
+) -> None:
+    """Поставить итог сессии (и запись терминала, если велась) в очередь на запись."""
+    item = {
+        "b_id": session_id,
+        "b_finished_at": finished_at,
+        "b_duration_seconds": duration_seconds,
+        "b_success": error is None,
+        "b_error": error,
+        "transcript": transcript,
+        "transcript_truncated": transcript_truncated,
+    }
+    try:
+        _ensure_session_flusher().put_nowait(item)
+    except asyncio.QueueFull:
+        logger.warning("Очередь SSH-сессий переполнена, итог сессии %s отброшен", session_id)
+
+
+def _ensure_session_flusher() -> asyncio.Queue[dict[str, Any]]:
+    global _session_queue, _session_flusher, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session_queue is None or _session_loop is not loop:
+        _session_queue = asyncio.Queue(maxsize=SESSION_QUEUE_MAXSIZE)
+        _session_flusher = None
+        _session_loop = loop
+    if _session_flusher is None or _session_flusher.done():
+        _session_flusher = loop.create_task(_flush_session_queue(_session_queue))
+    return _session_queue
+
+
+async def _write_batch(batch: list[dict[str, Any]]) -> None:
+    closes = [{key: value for key, value in item.items() if key.startswith("b_")} for item in batch]
+    transcripts = [
+        {
+            "session_id": item["b_id"],
+            "transcript": item["transcript"],
+            "transcript_truncated": item["transcript_truncated"],
+        }
+        for item in batch
+        if item["transcript"] is not None
+    ]
+    async with async_session() as db:
+        await db.execute(_CLOSE_SESSION, closes)
+        if transcripts:
+            await db.execute(insert(SshSessionTranscript), transcripts)
+        await db.commit()
+
+
+async def _flush_session_queue(queue: asyncio.Queue[dict[str, Any]]) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + SESSION_FLUSH_INTERVAL_SECONDS
+        while len(batch) < SESSION_BATCH_SIZE:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        try:
+            await _write_batch(batch)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Не удалось закрыть %s SSH-сессий: %s", len(batch), exc)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def drain_session_queue() -> None:
+    """Дописать накопившиеся итоги сессий и остановить фоновую задачу (shutdown приложения)."""
+    global _session_flusher
+    if _session_queue is None or _session_flusher is None:
+        return
+    if not _session_flusher.done():
+        await _session_queue.join()
+        _session_flusher.cancel()
+    _session_flusher = None
@@ -0,0 +1,70 @@
+"""Системные плейбуки проекта (`_system_facts`, `_remote_actions`).
+
+Строка создаётся один раз на проект при первом запуске и дальше не меняется, поэтому
+её id кэшируем в памяти процесса: сбор фактов и remote actions не ходят за ним в БД.
+Если плейбук удалили или переименовали через API, запись сбрасывается (`forget_playbook`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.ttl_cache import TTLCache
+from app.db.models import Playbook
+
+SYSTEM_PLAYBOOK_CACHE_TTL_SECONDS = 3600.0
+SYSTEM_PLAYBOOK_CACHE_MAXSIZE = 2048
+
+_playbook_ids: TTLCache[tuple[int, str], int] = TTLCache(
+    maxsize=SYSTEM_PLAYBOOK_CACHE_MAXSIZE, ttl=SYSTEM_PLAYBOOK_CACHE_TTL_SECONDS
+)
+_create_locks: dict[tuple[int, str], asyncio.Lock] = {}
+
+
+async def get_system_playbook_id(
+    db: AsyncSession,
+    *,
+    project_id: int,
+    name: str,
+    content: str,
+    description: str,
+    created_by: int | None,
+) -> int:
+    """id системного плейбука проекта; при отсутствии плейбук создаётся (и коммитится)."""
+    key = (int(project_id), name)
+    playbook_id = _playbook_ids.get(key)
+    if playbook_id is not None:
+        return playbook_id
+
+    # Первое обращение из параллельных запросов не должно создать два плейбука.
+    async with _create_locks.setdefault(key, asyncio.Lock()):
+        playbook_id = _playbook_ids.get(key)
+        if playbook_id is not None:
+            return playbook_id
+        playbook_id = await db.scalar(
+            select(Playbook.id).where(Playbook.project_id == project_id).where(Playbook.name == name).limit(1)
+        )
+        if playbook_id is None:
+            playbook = Playbook(
+                project_id=project_id,
+                name=name,
+                description=description,
+                stored_content=content,
+                variables={},
+                inventory_scope=[],
+                created_by=created_by,
+            )
+            db.add(playbook)
+            await db.commit()
+            playbook_id = playbook.id
+        _playbook_ids.set(key, playbook_id)
+        return playbook_id
+
+
+def forget_playbook(playbook_id: int) -> None:
+    """Сбросить кэш, если плейбук с этим id был системным (удаление/переименование)."""
+    for key in [key for key, value in _playbook_ids.items() if value == playbook_id]:
+        _playbook_ids.pop(key)
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import logging
 from typing import Any
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db import async_session
 from app.db.models import ApprovalRequest, ApprovalStatus, Host, JobRun, JobStatus, Playbook, PlaybookTrigger, Secret
 from app.services.audit import audit_log
 from app.services.queue import enqueue_run
 
+logger = logging.getLogger(__name__)
+
 
 def _match_trigger_filters(filters: dict[str, Any], host: Host) -> bool:
     if not filters:
@@ -142,6 +146,17 @@ async def dispatch_host_triggers(db: AsyncSession, host: Host, trigger_type: str
         await _create_run_for_trigger(db, playbook, [host], trigger.extra_vars or {}, trigger_type)
 
 
+async def dispatch_host_triggers_task(host_id: int, trigger_type: str) -> None:
+    """`dispatch_host_triggers` в собственной сессии — для BackgroundTasks (сессия запроса к этому моменту закрыта)."""
+    try:
+        async with async_session() as db:
+            host = await db.get(Host, host_id)
+            if host is not None:
+                await dispatch_host_triggers(db, host, trigger_type)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Host triggers dispatch failed host_id=%s trigger=%s error=%s", host_id, trigger_type, exc)
+
+
 async def dispatch_secret_triggers(db: AsyncSession, secret: Secret, project_id: int) -> None:
     query = await db.execute(
         select(PlaybookTrigger)
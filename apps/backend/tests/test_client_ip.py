@@ -0,0 +1,25 @@
+from app.core.client_ip import resolve_client_ip
+
+
+def test_forwarded_for_ignored_without_trusted_proxy():
+    assert resolve_client_ip("203.0.113.7", "198.51.100.1", "") == "203.0.113.7"
+    assert resolve_client_ip("203.0.113.7", "198.51.100.1", "10.0.0.0/8") == "203.0.113.7"
+
+
+def test_rightmost_untrusted_hop_from_trusted_proxy():
+    # Клиент подставил "1.2.3.4", nginx дописал реальный адрес.
+    assert resolve_client_ip("172.18.0.3", "1.2.3.4, 203.0.113.7", "172.18.0.0/16") == "203.0.113.7"
+    # Цепочка доверенных прокси пропускается.
+    assert resolve_client_ip("10.0.0.2", "203.0.113.7, 10.0.0.1", "10.0.0.0/8") == "203.0.113.7"
+
+
+def test_missing_peer_and_header():
+    assert resolve_client_ip(None, "203.0.113.7", "10.0.0.0/8") is None
+    assert resolve_client_ip("10.0.0.2", None, "10.0.0.0/8") == "10.0.0.2"
+
+
+def test_bundled_nginx_proxy():
+    # nginx (deploy/docker-compose.yml, 172.28.0.10) проксирует с $proxy_add_x_forwarded_for.
+    assert resolve_client_ip("172.28.0.10", "203.0.113.7", "172.28.0.10") == "203.0.113.7"
+    # Прямое подключение к опубликованному порту backend заголовку не доверяет.
+    assert resolve_client_ip("172.28.0.1", "1.2.3.4", "172.28.0.10") == "172.28.0.1"
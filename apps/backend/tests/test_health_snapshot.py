@@ -0,0 +1,47 @@
+from app.services.health_snapshot import parse_health_snapshot
+
+UPTIME = "12345.67 45678.90\n"
+LOADAVG = "0.52 0.41 0.30 2/345 6789\n"
+MEMINFO = "MemTotal:        8000000 kB\nMemFree:          500000 kB\nMemAvailable:    6000000 kB\nBuffers:          100000 kB\n"
+DF_HEADER = "Filesystem     1024-blocks     Used Available Capacity Mounted on\n"
+DF_ROOT = "/dev/sda1         51475068 20580480  28257264      43% /\n"
+
+
+def test_full_output():
+    snapshot = parse_health_snapshot(UPTIME + LOADAVG + MEMINFO + DF_HEADER + DF_ROOT)
+    assert snapshot == {
+        "uptime_seconds": 12345.67,
+        "load1": 0.52,
+        "load5": 0.41,
+        "load15": 0.30,
+        "mem_total_kb": 8000000,
+        "mem_used_kb": 2000000,
+        "disk_total_kb": 51475068,
+        "disk_used_kb": 20580480,
+        "disk_used_percent": 43,
+    }
+
+
+def test_root_line_after_other_mounts():
+    df = DF_HEADER + "/dev/sda2 1014656 180224 834432 18% /boot\n/dev/sdb1 100 50 50 50% /data/\n" + DF_ROOT
+    snapshot = parse_health_snapshot(UPTIME + LOADAVG + MEMINFO + df)
+    assert snapshot["disk_total_kb"] == 51475068
+    assert snapshot["disk_used_kb"] == 20580480
+    assert snapshot["disk_used_percent"] == 43
+
+
+def test_missing_meminfo_and_df():
+    snapshot = parse_health_snapshot(UPTIME + LOADAVG)
+    assert snapshot == {"uptime_seconds": 12345.67, "load1": 0.52, "load5": 0.41, "load15": 0.30}
+
+
+def test_meminfo_without_available():
+    snapshot = parse_health_snapshot(UPTIME + LOADAVG + "MemTotal:        8000000 kB\n" + DF_HEADER + DF_ROOT)
+    assert snapshot["mem_total_kb"] == 8000000
+    assert "mem_used_kb" not in snapshot
+    assert snapshot["disk_used_percent"] == 43
+
+
+def test_garbage_output():
+    assert parse_health_snapshot("") == {}
+    assert parse_health_snapshot("sh: cat: not found\n") == {}
@@ -118,3 +118,13 @@ async def test_resolve_implicit_no_allowlist_falls_back_to_first_project():
 
         pid = await resolve_current_project_id(db, _principal(allowed_project_ids=None), None)
         assert pid == 2
+
+
+async def test_resolve_implicit_prefers_default_over_lower_id():
+    db = await _make_db()
+    async with db:
+        db.add_all([Project(id=2, name="p2"), Project(id=5, name="default")])
+        await db.commit()
+
+        assert await resolve_current_project_id(db, _principal(allowed_project_ids=None), None) == 5
+        assert await resolve_current_project_id(db, _principal(allowed_project_ids=[2, 5]), None) == 5
@@ -0,0 +1,24 @@
+from app.core import rate_limit
+from app.core.rate_limit import TokenBucketLimiter
+
+
+def test_bucket_exhausts_and_refills(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(capacity=3, period=60)
+
+    assert [limiter.hit("ip") for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit("other")
+
+    now[0] += 20  # одна попытка восстановилась
+    assert limiter.hit("ip")
+    assert not limiter.hit("ip")
+
+
+def test_bucket_keys_are_bounded():
+    limiter = TokenBucketLimiter(capacity=1, period=60, maxsize=2)
+    for key in ("a", "b", "c"):
+        assert limiter.hit(key)
+    assert len(limiter._buckets) == 2
+    # "a" вытеснен — считается новым ключом
+    assert limiter.hit("a")
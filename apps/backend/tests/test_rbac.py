@@ -0,0 +1,20 @@
+from app.core.rbac import PERM_BIT, ROLE_MASK, ROLE_PERMISSIONS, Permission, has_any_permission, has_permission
+
+
+def test_role_masks_match_permission_matrix():
+    for role, perms in ROLE_PERMISSIONS.items():
+        for permission in Permission:
+            assert bool(ROLE_MASK[role] & PERM_BIT[permission]) == (permission in perms)
+
+
+def test_has_permission_unknown_role():
+    assert not has_permission(None, Permission.hosts_read)
+    assert not has_permission("ghost", Permission.hosts_read)
+    assert has_permission("viewer", Permission.hosts_read)
+    assert not has_permission("viewer", Permission.hosts_write)
+
+
+def test_has_any_permission():
+    assert has_any_permission("operator", [Permission.secrets_reveal, Permission.hosts_ssh])
+    assert not has_any_permission("viewer", [Permission.secrets_reveal, Permission.hosts_ssh])
+    assert not has_any_permission("admin", [])
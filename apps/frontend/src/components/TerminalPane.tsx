@@ -70,6 +70,8 @@ function TerminalPane({ hostId, token, disabled, height = 360 }: Props) {
     const qs = new URLSearchParams({ token });
     if (projectId) qs.set("project_id", String(projectId));
     const ws = new WebSocket(`${base}/api/v1/hosts/${hostId}/terminal?${qs.toString()}`);
+    // Вывод PTY приходит бинарными фреймами (сырые байты), служебные сообщения — текстом.
+    ws.binaryType = "arraybuffer";
     socketRef.current = ws;
     setConnStatus("connecting");
 
@@ -87,7 +89,12 @@ function TerminalPane({ hostId, token, disabled, height = 360 }: Props) {
       onDataDisposeRef.current = () => disposable?.dispose();
     };
     ws.onmessage = (event) => {
-      termRef.current?.write(event.data);
+      if (typeof event.data === "string") {
+        termRef.current?.write(event.data);
+      } else {
+        // xterm.js сам декодирует UTF-8 потоково, в т.ч. символы на границе фреймов.
+        termRef.current?.write(new Uint8Array(event.data as ArrayBuffer));
+      }
     };
     ws.onerror = () => {
       setError("Ошибка WebSocket/SSH");
@@ -50,10 +50,16 @@ type SshSession = {
   duration_seconds?: number | null;
   success: boolean;
   error?: string | null;
-  transcript?: string | null;
+  has_transcript?: boolean;
   transcript_truncated?: boolean;
 };
 
+type SshSessionTranscript = {
+  session_id: number;
+  transcript: string;
+  transcript_truncated: boolean;
+};
+
 type HostFormState = {
   name: string;
   hostname: string;
@@ -119,7 +125,11 @@ function HostDetailsPage({ hostId }: { hostId: number }) {
   const [secrets, setSecrets] = useState<SecretOption[]>([]);
   const [healthHistory, setHealthHistory] = useState<HostHealthRecord[]>([]);
   const [sshSessions, setSshSessions] = useState<SshSession[]>([]);
-  const [transcript, setTranscript] = useState<{ open: boolean; session: SshSession | null }>({ open: false, session: null });
+  const [transcript, setTranscript] = useState<{ open: boolean; session: SshSession | null; text: string }>({
+    open: false,
+    session: null,
+    text: "",
+  });
   const [loading, setLoading] = useState(false);
   const [saving, setSaving] = useState(false);
   const [factsLoading, setFactsLoading] = useState(false);
@@ -277,6 +287,19 @@ function HostDetailsPage({ hostId }: { hostId: number }) {
     }
   };
 
+  const openTranscript = async (session: SshSession) => {
+    if (!token) return;
+    try {
+      const record = await apiFetch<SshSessionTranscript>(
+        `/api/v1/hosts/${hostId}/ssh-sessions/${session.id}/transcript`,
+        { token }
+      );
+      setTranscript({ open: true, session, text: record.transcript });
+    } catch (err) {
+      pushToast({ title: "Не удалось загрузить запись", description: formatError(err), variant: "error" });
+    }
+  };
+
   const refreshFacts = async () => {
     if (!token) return;
     setError(null);
@@ -627,12 +650,8 @@ function HostDetailsPage({ hostId }: { hostId: number }) {
                             <td>{row.source_ip ?? "—"}</td>
                             <td>{row.success ? "yes" : "no"}</td>
                             <td>
-                              {row.transcript ? (
-                                <button
-                                  type="button"
-                                  className="ghost-button"
-                                  onClick={() => setTranscript({ open: true, session: row })}
-                                >
+                              {row.has_transcript ? (
+                                <button type="button" className="ghost-button" onClick={() => void openTranscript(row)}>
                                   Просмотреть
                                 </button>
                               ) : (
@@ -739,13 +758,13 @@ function HostDetailsPage({ hostId }: { hostId: number }) {
                 </div>
               </div>
               <div className="row-actions">
-                <button type="button" className="ghost-button" onClick={() => setTranscript({ open: false, session: null })}>
+                <button type="button" className="ghost-button" onClick={() => setTranscript({ open: false, session: null, text: "" })}>
                   Закрыть
                 </button>
               </div>
             </div>
             <div className="panel" style={{ flex: 1, overflow: "auto" }}>
-              <pre style={{ whiteSpace: "pre-wrap" }}>{transcript.session.transcript}</pre>
+              <pre style={{ whiteSpace: "pre-wrap" }}>{transcript.text}</pre>
             </div>
           </div>
         </div>